@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Lapangan, JadwalLapangan
+from .closures import apply_closure
+from .models import Lapangan, JadwalLapangan, ScheduleTemplate, Closure, ImportJob
 
 # Register your models here.
 @admin.register(Lapangan)
@@ -40,4 +41,32 @@ class JadwalLapanganAdmin(admin.ModelAdmin):
         ('Timestamp', {
             'fields': ('created_at', 'updated_at')
         }),
-    )
\ No newline at end of file
+    )
+
+@admin.register(ScheduleTemplate)
+class ScheduleTemplateAdmin(admin.ModelAdmin):
+    list_display = ('lapangan', 'weekday', 'open_time', 'close_time', 'slot_minutes', 'is_active')
+    list_filter = ('is_active', 'weekday', 'lapangan')
+    search_fields = ('lapangan__name',)
+    readonly_fields = ('id', 'created_at', 'updated_at')
+    ordering = ('lapangan', 'weekday', 'open_time')
+
+@admin.register(Closure)
+class ClosureAdmin(admin.ModelAdmin):
+    list_display = ('lapangan', 'date_from', 'date_to', 'start_time', 'end_time', 'weekday', 'reason')
+    list_filter = ('weekday', 'lapangan')
+    search_fields = ('lapangan__name', 'reason')
+    readonly_fields = ('id', 'created_at')
+    ordering = ('-date_from',)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # sama seperti closure_api: jadwal yang kena langsung ditutup
+        apply_closure(obj)
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ('source', 'status', 'processed', 'created', 'skipped', 'errors', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = ('id', 'created_at', 'updated_at', 'started_at', 'finished_at')
+    ordering = ('-created_at',)
@@ -0,0 +1,194 @@
+"""
+Cache grid ketersediaan jadwal per (lapangan, tanggal).
+
+Satu entry cache = satu hari di satu lapangan, disimpan ringkas:
+    ids   : list id jadwal (hex) urut start_main
+    times : list int detik-sejak-tengah-malam, berpasangan [start0, end0, start1, end1, ...]
+    free  : bitmap int, bit ke-i nyala kalau jadwal ke-i is_available
+    holds : {i: epoch detik} untuk jadwal ke-i yang lagi ditahan booking pending;
+            begitu lewat dari waktu itu slotnya dianggap tersedia lagi walaupun
+            sweeper belum jalan (dicek waktu baca, jadi cache tidak perlu dibuang)
+
+Entry dihapus setiap ada perubahan jadwal di hari itu (signal save/delete di
+JadwalLapangan, plus panggilan invalidate_grid eksplisit dari kode yang pakai
+QuerySet.update()/bulk_create yang tidak memicu signal).
+
+Dengan JADWAL_STORAGE='bitmap' grid yang tidak ada di cache dibaca dari DaySchedule
+(salinan baca satu baris per hari, lihat bitmap.py) dan baru jatuh ke baris
+JadwalLapangan untuk hari yang belum punya DaySchedule. JadwalLapangan tetap sumber
+datanya: invalidate_grid cuma menghapus DaySchedule hari yang berubah (di transaksi
+yang sama), dan hari itu dibaca dari baris sampai command pack_jadwal berikutnya
+mengisinya lagi. Jadi booking tidak menanggung biaya repack.
+"""
+import uuid
+from datetime import time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .bitmap import load_day_grids, store_day_grids
+from .intervals import lock_lapangan
+from .models import DaySchedule, JadwalLapangan
+from .stats import invalidate_dashboard_stats
+
+GRID_TIMEOUT = 60 * 60 * 24
+
+
+def _grid_key(lapangan_id, tanggal):
+    # lapangan_id bisa UUID atau string dari request, disamakan dulu
+    return f'jadwal_grid:{uuid.UUID(str(lapangan_id)).hex}:{tanggal}'
+
+
+def _seconds(t):
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+
+def _time(seconds):
+    return time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+def bitmap_storage():
+    return getattr(settings, 'JADWAL_STORAGE', 'rows') == 'bitmap'
+
+
+def grid_queryset(lapangan_id, dates):
+    """Query jadwal + hold booking pending yang dipakai untuk membangun grid (juga dicek di HotQueryPlanTest)."""
+    return JadwalLapangan.objects.filter(
+        lapangan_id=lapangan_id, tanggal__in=dates
+    ).annotate(
+        hold=Max('booking__hold_expires_at', filter=Q(booking__status_book='pending'))
+    ).order_by('tanggal', 'start_main').values_list(
+        'tanggal', 'id', 'start_main', 'end_main', 'is_available', 'hold'
+    )
+
+
+def _build_grids(lapangan_id, dates):
+    grids = {tanggal: {'ids': [], 'times': [], 'free': 0, 'holds': {}} for tanggal in dates}
+    for tanggal, jadwal_id, start_main, end_main, is_available, hold in grid_queryset(lapangan_id, dates):
+        grid = grids[tanggal]
+        if is_available:
+            grid['free'] |= 1 << len(grid['ids'])
+        elif hold is not None:
+            grid['holds'][len(grid['ids'])] = int(hold.timestamp())
+        grid['ids'].append(jadwal_id.hex)
+        grid['times'] += [_seconds(start_main), _seconds(end_main)]
+    return grids
+
+
+def get_grids(lapangan_id, dates):
+    """{tanggal: grid} untuk semua tanggal; yang belum ada di cache dibangun dengan satu query."""
+    keys = {_grid_key(lapangan_id, tanggal): tanggal for tanggal in dates}
+    cached = cache.get_many(keys.keys())
+    grids = {keys[key]: grid for key, grid in cached.items()}
+
+    missing = [tanggal for tanggal in dates if tanggal not in grids]
+    if missing:
+        built = load_day_grids(lapangan_id, missing) if bitmap_storage() else {}
+        rest = [tanggal for tanggal in missing if tanggal not in built]
+        if rest:
+            built.update(_build_grids(lapangan_id, rest))
+        cache.set_many({_grid_key(lapangan_id, t): g for t, g in built.items()}, GRID_TIMEOUT)
+        grids.update(built)
+    return grids
+
+
+def available_slots(lapangan_id, date_from, date_to, now=None):
+    """
+    Jadwal yang masih tersedia di rentang tanggal (inklusif), urut tanggal & jam.
+    Bentuknya dict dengan key yang sama seperti field model (id, tanggal, start_main,
+    end_main, is_available), jadi bisa langsung dipakai di template.
+    Jadwal yang hold-nya sudah habis ikut dihitung tersedia.
+    """
+    dates = [date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)]
+    grids = get_grids(lapangan_id, dates)
+    now_ts = (now or timezone.now()).timestamp()
+
+    slots = []
+    for tanggal in dates:
+        grid = grids[tanggal]
+        free, times = grid['free'], grid['times']
+        for hold_index, hold_until in grid['holds'].items():
+            if hold_until <= now_ts:
+                free |= 1 << hold_index
+        for i, jadwal_id in enumerate(grid['ids']):
+            if free >> i & 1:
+                slots.append({
+                    'id': uuid.UUID(jadwal_id),
+                    'tanggal': tanggal,
+                    'start_main': _time(times[2 * i]),
+                    'end_main': _time(times[2 * i + 1]),
+                    'is_available': True,
+                })
+    return slots
+
+
+def grid_rows(lapangan_id, date_from, date_to, after=None, limit=None):
+    """
+    Semua jadwal di rentang tanggal dari grid, bentuknya sama dengan
+    values_list('id', 'tanggal', 'start_main', 'end_main', 'is_available') urut tanggal & jam.
+    after = (tanggal, start_main) terakhir dari halaman sebelumnya.
+    """
+    dates = [date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)]
+    if after:
+        dates = [tanggal for tanggal in dates if tanggal >= after[0]]
+    grids = get_grids(lapangan_id, dates)
+
+    rows = []
+    for tanggal in dates:
+        grid = grids[tanggal]
+        times = grid['times']
+        for i, jadwal_id in enumerate(grid['ids']):
+            start_main = _time(times[2 * i])
+            if after and (tanggal, start_main) <= after:
+                continue
+            rows.append((
+                uuid.UUID(jadwal_id), tanggal, start_main, _time(times[2 * i + 1]), bool(grid['free'] >> i & 1)
+            ))
+            if limit is not None and len(rows) >= limit:
+                return rows
+    return rows
+
+
+def invalidate_grid(lapangan_id, dates):
+    """Buang grid hari-hari yang berubah. Diulang lagi setelah commit supaya
+    reader lain yang sempat nge-cache data sebelum commit tidak nyangkut."""
+    dates = set(dates)
+    keys = [_grid_key(lapangan_id, tanggal) for tanggal in dates]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    invalidate_dashboard_stats([lapangan_id])
+    if bitmap_storage():
+        # DaySchedule lama tidak boleh kebaca lagi; sampai pack_jadwal berikutnya hari ini dibaca dari baris
+        DaySchedule.objects.filter(lapangan_id=lapangan_id, tanggal__in=dates).delete()
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def repack_days(lapangan_id, dates):
+    """
+    Bangun ulang DaySchedule tanggal-tanggal ini dari JadwalLapangan (dipakai pack_jadwal).
+    Lapangan dikunci supaya tidak balapan dengan create/edit jadwal, baris jadwalnya juga
+    dikunci supaya update status booking menunggu repack selesai; delete DaySchedule di
+    transaksi booking itu lalu ikut membuang hasil repack yang sudah basi.
+    """
+    with transaction.atomic():
+        if not lock_lapangan([lapangan_id]):
+            return
+        list(
+            JadwalLapangan.objects.select_for_update()
+            .filter(lapangan_id=lapangan_id, tanggal__in=dates).order_by('pk').values_list('id', flat=True)
+        )
+        store_day_grids(lapangan_id, _build_grids(lapangan_id, dates))
+
+
+def invalidate_grid_for_jadwal(jadwal_ids):
+    """Invalidate berdasarkan id jadwal (untuk kode yang update massal via QuerySet.update)."""
+    per_lapangan = {}
+    rows = JadwalLapangan.objects.filter(id__in=jadwal_ids).values_list('lapangan_id', 'tanggal').distinct()
+    for lapangan_id, tanggal in rows:
+        per_lapangan.setdefault(lapangan_id, set()).add(tanggal)
+    for lapangan_id, dates in per_lapangan.items():
+        invalidate_grid(lapangan_id, dates)
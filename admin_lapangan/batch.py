@@ -0,0 +1,141 @@
+"""
+Operasi massal jadwal: buka, tutup, hapus, atau geser jam banyak jadwal sekaligus.
+
+Semua jadwal target diambil dengan satu query, jadwal yang sudah dibooking dicari
+dengan satu query lagi, lalu perubahan ditulis set-based (satu UPDATE/DELETE, atau
+satu bulk_update untuk geser jam) dalam satu transaksi. Hasil per jadwal dikembalikan
+supaya client tahu mana yang dilewati dan kenapa.
+
+Jadwal yang masih dipegang booking pending/completed tidak pernah disentuh: membuka
+jadwal itu bikin double booking, menghapus/menggeser jamnya bikin booking user
+menunjuk ke slot yang berbeda. Baris jadwal target dikunci (SELECT ... FOR UPDATE)
+sebelum dicek, jadi reserve_slots yang balapan menunggu batch ini selesai atau sudah
+commit duluan dan kelihatan di cek booked. Syarat "tidak dibooking" juga ikut di
+UPDATE/DELETE-nya sendiri untuk DB yang mengabaikan FOR UPDATE (SQLite).
+"""
+from datetime import time
+
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from booking.models import Booking
+
+from .availability import invalidate_grid
+from .intervals import IntervalIndex, lock_lapangan, to_seconds
+from .models import JadwalLapangan
+
+OPERATIONS = ('open', 'close', 'delete', 'retime')
+MAX_BATCH = 1000
+BOOKED_STATUSES = ('pending', 'completed')
+DAY_SECONDS = 24 * 3600
+
+
+def _time(seconds):
+    return time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+def apply_jadwal_batch(jadwal_qs, operation, requested_ids=(), shift_minutes=0):
+    """
+    Jalankan `operation` ke semua jadwal di `jadwal_qs` (sudah difilter pemanggil ke
+    lapangan milik admin). requested_ids: id yang diminta client, yang tidak ketemu di
+    jadwal_qs dilaporkan 'not_found'. Untuk 'retime' semua jadwal digeser shift_minutes.
+
+    Return list {'id', 'result'} dengan result salah satu:
+    ok, booked, not_found, conflict (retime bentrok / lewat tengah malam).
+    """
+    if operation not in OPERATIONS:
+        raise ValueError(f'operation harus salah satu dari {", ".join(OPERATIONS)}')
+
+    with transaction.atomic():
+        rows = list(jadwal_qs.values_list('id', 'lapangan_id', 'tanggal', 'start_main', 'end_main')[:MAX_BATCH + 1])
+        if len(rows) > MAX_BATCH:
+            raise ValueError(f'Maksimal {MAX_BATCH} jadwal per batch')
+        lapangan_ids = lock_lapangan({row[1] for row in rows})
+
+        target_ids = [row[0] for row in rows]
+        # urutan kunci sama dengan jalur lain: lapangan dulu, baru jadwal (urut pk)
+        list(
+            JadwalLapangan.objects.select_for_update().filter(id__in=target_ids)
+            .order_by('pk').values_list('id', flat=True)
+        )
+        booked = set(
+            JadwalLapangan.objects.filter(
+                id__in=target_ids, booking__status_book__in=BOOKED_STATUSES
+            ).values_list('id', flat=True)
+        )
+
+        results = {row[0]: 'booked' if row[0] in booked else 'ok' for row in rows}
+        bebas = [row for row in rows if row[0] not in booked]
+
+        if operation == 'retime' and bebas:
+            bebas = _retime(bebas, lapangan_ids, shift_minutes * 60, results)
+        else:
+            bebas_ids = [row[0] for row in bebas]
+            dipegang = Booking.objects.filter(jadwal=OuterRef('pk'), status_book__in=BOOKED_STATUSES)
+            target = JadwalLapangan.objects.filter(id__in=bebas_ids).exclude(Exists(dipegang))
+            if operation == 'delete':
+                target.delete()
+                tersisa = set(JadwalLapangan.objects.filter(id__in=bebas_ids).values_list('id', flat=True))
+            elif bebas_ids:
+                target.update(is_available=operation == 'open', updated_at=timezone.now())
+                tersisa = set(
+                    JadwalLapangan.objects.filter(id__in=bebas_ids).filter(Exists(dipegang)).values_list('id', flat=True)
+                )
+            else:
+                tersisa = set()
+            # dibooking di antara cek di atas dan UPDATE/DELETE: dilewati
+            for jadwal_id in tersisa:
+                results[jadwal_id] = 'booked'
+            bebas = [row for row in bebas if row[0] not in tersisa]
+
+        # update()/bulk_update tidak memicu signal, grid dibuang manual
+        tanggal_berubah = {}
+        for _, lapangan_id, tanggal, _, _ in bebas:
+            tanggal_berubah.setdefault(lapangan_id, set()).add(tanggal)
+        for lapangan_id, dates in tanggal_berubah.items():
+            invalidate_grid(lapangan_id, dates)
+
+    hasil = [{'id': str(jadwal_id), 'result': result} for jadwal_id, result in results.items()]
+    ketemu = {item['id'] for item in hasil}
+    for jadwal_id in requested_ids:
+        if str(jadwal_id) not in ketemu:
+            hasil.append({'id': str(jadwal_id), 'result': 'not_found'})
+    return hasil
+
+
+def _retime(rows, lapangan_ids, shift, results):
+    """Geser jam `rows`, cek bentrok di memori. Return rows yang benar-benar diubah."""
+    dates = [row[2] for row in rows]
+    index = IntervalIndex.load(lapangan_ids, min(dates), max(dates))
+    # jadwal yang dipindah dikeluarkan dulu dari index, supaya geser 1 jam deretan
+    # slot berurutan tidak dianggap bentrok dengan posisi lamanya sendiri
+    for _, lapangan_id, tanggal, start_main, end_main in rows:
+        index.remove(lapangan_id, tanggal, start_main, end_main)
+
+    pindah = []
+    for row in rows:
+        jadwal_id, lapangan_id, tanggal, start_main, end_main = row
+        start, end = to_seconds(start_main) + shift, to_seconds(end_main) + shift
+        if start < 0 or end >= DAY_SECONDS or not index.add(lapangan_id, tanggal, start, end):
+            results[jadwal_id] = 'conflict'
+            continue
+        pindah.append((row, start, end))
+
+    now = timezone.now()
+    objs = [
+        JadwalLapangan(id=row[0], start_main=_time(start), end_main=_time(end), updated_at=now)
+        for row, start, end in pindah
+    ]
+    try:
+        with transaction.atomic():
+            JadwalLapangan.objects.bulk_update(objs, ['start_main', 'end_main', 'updated_at'])
+    except IntegrityError:
+        # unique (lapangan, tanggal, start_main) dicek per baris, jadi satu UPDATE bisa
+        # sempat nabrak posisi lama jadwal lain yang juga digeser. Ulang satu per satu,
+        # mulai dari ujung arah geser supaya posisi tujuan selalu sudah kosong.
+        for obj in sorted(objs, key=lambda o: o.start_main, reverse=shift > 0):
+            JadwalLapangan.objects.filter(id=obj.id).update(
+                start_main=obj.start_main, end_main=obj.end_main, updated_at=now
+            )
+    return [row for row, _, _ in pindah]
@@ -0,0 +1,97 @@
+"""
+Salinan baca jadwal yang ringkas: satu baris DaySchedule per (lapangan, tanggal).
+Baris JadwalLapangan tetap disimpan (booking merujuk ke sana), DaySchedule hanya
+mempercepat baca window beberapa hari: satu baris per hari, bukan satu per slot.
+
+Bentuk grid di sini sama dengan grid cache di availability.py
+({'ids', 'times', 'free', 'holds'}), jadi pembacanya (available_slots, daftar jadwal
+admin) tidak perlu tahu jadwal datang dari baris JadwalLapangan atau dari bitmap.
+
+Resolusi dipilih per hari: 15 menit kalau semua jam jadwal kelipatan 15, lalu 5,
+lalu 1 menit. Hari yang punya jam dengan detik tidak disimpan sebagai bitmap dan
+tetap dibaca dari baris JadwalLapangan.
+"""
+import uuid
+
+from .models import DaySchedule
+
+RESOLUTIONS = (15, 5, 1)
+BITMAP_BYTES = {res: (24 * 60 // res + 7) // 8 for res in RESOLUTIONS}
+
+
+def _bits(value):
+    """Posisi bit yang nyala, urut dari kecil."""
+    positions = []
+    while value:
+        low = value & -value
+        positions.append(low.bit_length() - 1)
+        value ^= low
+    return positions
+
+
+def _resolution(times):
+    for res in RESOLUTIONS:
+        if all(t % (res * 60) == 0 for t in times):
+            return res
+    return None
+
+
+def encode_grid(lapangan_id, tanggal, grid):
+    """Grid -> DaySchedule (belum disimpan), atau None kalau jamnya tidak pas resolusi mana pun."""
+    times = grid['times']
+    # pasangan start/end cuma bisa dibaca ulang kalau slot urut dan tidak overlap
+    if any(times[i] > times[i + 1] for i in range(len(times) - 1)):
+        return None
+    res = _resolution(times)
+    if res is None:
+        return None
+    step = res * 60
+    starts = ends = free = 0
+    for i in range(len(grid['ids'])):
+        start, end = times[2 * i] // step, times[2 * i + 1] // step
+        starts |= 1 << start
+        ends |= 1 << end
+        if grid['free'] >> i & 1:
+            free |= 1 << start
+    size = BITMAP_BYTES[res]
+    return DaySchedule(
+        lapangan_id=lapangan_id,
+        tanggal=tanggal,
+        resolution=res,
+        starts=starts.to_bytes(size, 'little'),
+        ends=ends.to_bytes(size, 'little'),
+        free=free.to_bytes(size, 'little'),
+        jadwal_ids=b''.join(uuid.UUID(jadwal_id).bytes for jadwal_id in grid['ids']),
+        holds={str(i): until for i, until in grid['holds'].items()},
+    )
+
+
+def decode_day(day):
+    """DaySchedule -> grid."""
+    step = day.resolution * 60
+    starts = _bits(int.from_bytes(bytes(day.starts), 'little'))
+    ends = _bits(int.from_bytes(bytes(day.ends), 'little'))
+    free_bits = int.from_bytes(bytes(day.free), 'little')
+    raw_ids = bytes(day.jadwal_ids)
+
+    grid = {'ids': [], 'times': [], 'free': 0, 'holds': {int(i): until for i, until in day.holds.items()}}
+    # slot tidak saling overlap, jadwal ke-i mulai di start ke-i dan selesai di end ke-i
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        grid['ids'].append(raw_ids[16 * i:16 * i + 16].hex())
+        grid['times'] += [start * step, end * step]
+        if free_bits >> start & 1:
+            grid['free'] |= 1 << i
+    return grid
+
+
+def load_day_grids(lapangan_id, dates):
+    """{tanggal: grid} untuk tanggal yang sudah punya DaySchedule. Satu query."""
+    days = DaySchedule.objects.filter(lapangan_id=lapangan_id, tanggal__in=dates)
+    return {day.tanggal: decode_day(day) for day in days}
+
+
+def store_day_grids(lapangan_id, grids):
+    """Ganti DaySchedule tanggal-tanggal di `grids` dengan isi grid terbaru."""
+    DaySchedule.objects.filter(lapangan_id=lapangan_id, tanggal__in=list(grids)).delete()
+    days = [encode_grid(lapangan_id, tanggal, grid) for tanggal, grid in grids.items()]
+    DaySchedule.objects.bulk_create([day for day in days if day is not None])
@@ -0,0 +1,78 @@
+"""
+Kalender tutup lapangan (Closure).
+
+apply_closure menutup semua jadwal yang kena satu Closure dengan satu UPDATE;
+ClosureCalendar dipakai generator jadwal supaya slot di periode tutup tidak dibuat.
+Jadwal yang sudah dibooking dibiarkan, admin yang memutuskan mau dibatalkan atau tidak.
+"""
+from django.db.models import Q
+from django.utils import timezone
+
+from .availability import invalidate_grid
+from .batch import BOOKED_STATUSES
+from .intervals import to_seconds
+from .models import Closure, JadwalLapangan
+
+DAY_SECONDS = 24 * 3600
+
+
+def closure_jadwal(closure):
+    """QuerySet JadwalLapangan yang kena closure."""
+    jadwal = JadwalLapangan.objects.filter(
+        lapangan_id=closure.lapangan_id,
+        tanggal__range=(closure.date_from, closure.date_to),
+    )
+    if closure.weekday is not None:
+        # iso_week_day: Senin=1 .. Minggu=7, weekday kita Senin=0
+        jadwal = jadwal.filter(tanggal__iso_week_day=closure.weekday + 1)
+    if closure.start_time is not None:
+        jadwal = jadwal.filter(start_main__lt=closure.end_time, end_main__gt=closure.start_time)
+    return jadwal
+
+
+def apply_closure(closure):
+    """Tutup (is_available=False) jadwal yang kena closure, kecuali yang sudah dibooking. Return jumlah jadwal."""
+    target = closure_jadwal(closure).filter(is_available=True).exclude(
+        Q(booking__status_book__in=BOOKED_STATUSES)
+    )
+    dates = set(target.values_list('tanggal', flat=True))
+    if not dates:
+        return 0
+    closed = JadwalLapangan.objects.filter(
+        id__in=target.values('id')
+    ).update(is_available=False, updated_at=timezone.now())
+    # update() tidak memicu signal
+    invalidate_grid(closure.lapangan_id, dates)
+    return closed
+
+
+class ClosureCalendar:
+    """Semua closure beberapa lapangan di satu rentang tanggal, dimuat sekali untuk cek per slot."""
+
+    def __init__(self, closures):
+        self._per_lapangan = {}
+        for closure in closures:
+            if closure.start_time is None:
+                start, end = 0, DAY_SECONDS
+            else:
+                start, end = to_seconds(closure.start_time), to_seconds(closure.end_time)
+            self._per_lapangan.setdefault(closure.lapangan_id, []).append(
+                (closure.date_from, closure.date_to, closure.weekday, start, end)
+            )
+
+    @classmethod
+    def load(cls, lapangan_ids, date_from, date_to):
+        return cls(Closure.objects.filter(
+            lapangan_id__in=lapangan_ids, date_from__lte=date_to, date_to__gte=date_from
+        ))
+
+    def is_closed(self, lapangan_id, tanggal, start, end):
+        """True kalau slot [start, end) (detik) di tanggal itu kena closure."""
+        for date_from, date_to, weekday, closed_start, closed_end in self._per_lapangan.get(lapangan_id, ()):
+            if not date_from <= tanggal <= date_to:
+                continue
+            if weekday is not None and weekday != tanggal.weekday():
+                continue
+            if start < closed_end and end > closed_start:
+                return True
+        return False
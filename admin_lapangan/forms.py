@@ -1,5 +1,6 @@
 from django import forms
-from .models import Lapangan, JadwalLapangan
+from .models import Lapangan, JadwalLapangan, ScheduleTemplate, Closure
+from .intervals import jadwal_bentrok
 from datetime import datetime
 
 class LapanganForm(forms.ModelForm):
@@ -19,6 +20,11 @@ class JadwalLapanganForm(forms.ModelForm):
         model = JadwalLapangan
         fields = ['tanggal', 'start_main', 'end_main', 'is_available']
 
+    def __init__(self, *args, lapangan=None, **kwargs):
+        # lapangan wajib untuk jadwal baru (belum ada di instance) supaya bisa cek bentrok
+        super().__init__(*args, **kwargs)
+        self.lapangan = lapangan
+
     def clean(self):
         cleaned_data = super().clean()
         tanggal = cleaned_data.get('tanggal')
@@ -32,4 +38,60 @@ class JadwalLapanganForm(forms.ModelForm):
             if start_main >= end_main:
                 raise forms.ValidationError('Waktu mulai harus lebih awal dari waktu selesai.')
 
-        return cleaned_data
\ No newline at end of file
+            lapangan_id = self.lapangan.id if self.lapangan else self.instance.lapangan_id
+            exclude_id = None if self.instance._state.adding else self.instance.pk
+            if tanggal and lapangan_id and jadwal_bentrok(lapangan_id, tanggal, start_main, end_main, exclude_id=exclude_id):
+                raise forms.ValidationError('Jadwal bertabrakan dengan jadwal yang sudah ada.')
+
+        return cleaned_data
+
+
+class ScheduleTemplateForm(forms.ModelForm):
+    class Meta:
+        model = ScheduleTemplate
+        fields = ['weekday', 'open_time', 'close_time', 'slot_minutes', 'is_active']
+
+    def clean_slot_minutes(self):
+        slot_minutes = self.cleaned_data.get('slot_minutes')
+        if slot_minutes is not None and not 15 <= slot_minutes <= 24 * 60:
+            raise forms.ValidationError('Durasi slot harus antara 15 menit dan 24 jam.')
+        return slot_minutes
+
+    def clean(self):
+        cleaned_data = super().clean()
+        open_time = cleaned_data.get('open_time')
+        close_time = cleaned_data.get('close_time')
+
+        if open_time and close_time and open_time >= close_time:
+            raise forms.ValidationError('Jam buka harus lebih awal dari jam tutup.')
+
+        return cleaned_data
+
+
+class ClosureForm(forms.ModelForm):
+    # periode tutup maksimal sekitar setahun sekali input
+    MAX_DAYS = 366
+
+    class Meta:
+        model = Closure
+        fields = ['date_from', 'date_to', 'start_time', 'end_time', 'weekday', 'reason']
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from = cleaned_data.get('date_from')
+        date_to = cleaned_data.get('date_to')
+        start_time = cleaned_data.get('start_time')
+        end_time = cleaned_data.get('end_time')
+
+        if date_from and date_to:
+            if date_from > date_to:
+                raise forms.ValidationError('Tanggal mulai harus sebelum atau sama dengan tanggal selesai.')
+            if (date_to - date_from).days >= self.MAX_DAYS:
+                raise forms.ValidationError(f'Periode tutup maksimal {self.MAX_DAYS} hari.')
+
+        if (start_time is None) != (end_time is None):
+            raise forms.ValidationError('Jam mulai dan jam selesai harus diisi keduanya, atau dikosongkan untuk tutup seharian.')
+        if start_time and end_time and start_time >= end_time:
+            raise forms.ValidationError('Jam mulai harus lebih awal dari jam selesai.')
+
+        return cleaned_data
@@ -0,0 +1,371 @@
+"""
+Import data lapangan dari file JSON (format badminton_final.json) secara bertahap.
+
+File dibaca per potongan dan di-parse satu record per satu record (tidak
+json.load seluruh file), nama lapangan yang sudah ada diambil sekali di awal ke
+dictionary, record baru disimpan dengan bulk_create dan record yang berubah
+dengan bulk_update per batch. Record yang isinya sama (dicek lewat content_hash)
+tidak ditulis sama sekali. Progres ditulis ke ImportJob setiap batch supaya bisa
+dipolling dari UI admin.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.utils import timezone
+
+from .models import ImportJob, Lapangan
+from .signals import lapangan_bulk_changed
+from .stats import invalidate_admin_stats
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOURCE = os.path.join(os.path.dirname(__file__), 'badminton_final.json')
+BATCH_SIZE = 1000
+READ_SIZE = 64 * 1024
+MAX_ERROR_SAMPLES = 20
+# job 'running' yang tidak ada progres selama ini dianggap mati (proses di-restart dll)
+STALE_AFTER = timedelta(minutes=10)
+DEFAULT_DESCRIPTION = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut "
+    "labore et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud exercitation ullamco "
+    "laboris nisi ut aliquip ex ea commodo consequat. Duis aute irure dolor in reprehenderit in "
+    "voluptate velit esse cillum dolore eu fugiat nulla pariatur."
+)
+_name_max = Lapangan._meta.get_field('name').max_length
+_location_max = Lapangan._meta.get_field('location').max_length
+_source_url_max = Lapangan._meta.get_field('source_url').max_length
+
+
+def iter_records(file, read_size=READ_SIZE):
+    """Yield elemen array JSON top-level satu per satu dari file teks yang dibaca per potongan."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    started = False
+    eof = False
+
+    while True:
+        # buang whitespace & pemisah sebelum elemen berikutnya
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            chunk = file.read(read_size)
+            buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+
+        if pos >= len(buffer):
+            raise ValueError('File JSON berakhir sebelum array ditutup')
+        if not started:
+            if buffer[pos] != '[':
+                raise ValueError('File JSON harus berupa array')
+            started = True
+            pos += 1
+            continue
+        if buffer[pos] == ']':
+            return
+        if buffer[pos] == ',':
+            pos += 1
+            continue
+
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # kemungkinan record kepotong di batas chunk, tambah data dulu
+            chunk = file.read(read_size)
+            if not chunk:
+                raise
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        if end == len(buffer) and not eof:
+            # angka/literal di ujung buffer bisa saja belum lengkap
+            chunk = file.read(read_size)
+            if chunk:
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            eof = True
+        yield record
+        pos = end
+
+
+IMPORT_FIELDS = ('name', 'location', 'price', 'image')
+_CENT = Decimal('0.01')
+
+
+class _Existing:
+    """Ringkasan satu Lapangan yang sudah ada di DB, cukup untuk cek perubahan tanpa query lagi."""
+    __slots__ = ('id', 'source_url', 'content_hash', 'admin_id', 'legacy') + IMPORT_FIELDS
+
+    def __init__(self, id, source_url, content_hash, admin_id, legacy, name, location, price, image):
+        self.id = id
+        self.source_url = source_url
+        self.content_hash = content_hash
+        self.admin_id = admin_id
+        # hasil import versi lama: belum punya source_url dan deskripsinya masih placeholder import
+        self.legacy = legacy
+        self.name = name
+        self.location = location
+        self.price = price
+        self.image = image
+
+
+def _parse_record(item):
+    """Validasi satu record feed. Return (values, source_url) dengan values berisi IMPORT_FIELDS."""
+    name = str(item['nama_tempat']).strip()
+    location = str(item['lokasi_tempat']).strip()
+    if not name:
+        raise ValueError('nama_tempat kosong')
+    if len(name) > _name_max or len(location) > _location_max:
+        raise ValueError('nama_tempat/lokasi_tempat terlalu panjang')
+    try:
+        price = Decimal(str(item['harga_tempat'])).quantize(_CENT)
+    except InvalidOperation:
+        raise ValueError(f"harga_tempat tidak valid: {item['harga_tempat']!r}")
+    source_url = str(item.get('url_detail') or '').strip() or None
+    if source_url and len(source_url) > _source_url_max:
+        raise ValueError('url_detail terlalu panjang')
+    values = {
+        'name': name,
+        'location': location,
+        'price': price,
+        'image': item.get('link_gambar') or None,
+    }
+    return values, source_url
+
+
+def content_hash(values):
+    raw = json.dumps([str(values[field]) for field in IMPORT_FIELDS], ensure_ascii=False)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _load_existing():
+    """
+    Semua lapangan yang ada, diindeks per source_url, per nama, dan hasil import versi
+    lama (tanpa source_url) per (admin, nama) untuk diadopsi. Satu query.
+    """
+    by_url, by_name, legacy_rows = {}, {}, {}
+    legacy = ExpressionWrapper(
+        Q(source_url__isnull=True, description=DEFAULT_DESCRIPTION), output_field=BooleanField()
+    )
+    rows = Lapangan.objects.annotate(legacy=legacy).values_list(
+        'id', 'source_url', 'content_hash', 'admin_lapangan_id', 'legacy', *IMPORT_FIELDS
+    )
+    for row in rows.iterator(chunk_size=5000):
+        existing = _Existing(*row)
+        if existing.source_url:
+            by_url[existing.source_url] = existing
+        by_name.setdefault(existing.name, existing)
+        if existing.legacy:
+            legacy_rows.setdefault((existing.admin_id, existing.name), existing)
+    return by_url, by_name, legacy_rows
+
+
+def _flush_creates(batch, job):
+    """Simpan satu batch. Kalau batch gagal (misal constraint DB), ulang satu-satu biar record lain tetap masuk."""
+    try:
+        with transaction.atomic():
+            Lapangan.objects.bulk_create(batch)
+        job.created += len(batch)
+        return
+    except DatabaseError:
+        logger.warning('bulk_create batch import gagal, diulang per record', exc_info=True)
+
+    for lapangan in batch:
+        try:
+            with transaction.atomic():
+                lapangan.save(force_insert=True)
+            job.created += 1
+        except DatabaseError as e:
+            _record_error(job, lapangan.name, e)
+
+
+def _flush_updates(batch, job):
+    """batch = list (lapangan, fields). Dikelompokkan per kombinasi field supaya tiap bulk_update cuma nulis field yang berubah."""
+    per_fields = {}
+    for lapangan, fields in batch:
+        per_fields.setdefault(fields, []).append(lapangan)
+
+    for fields, objs in per_fields.items():
+        try:
+            with transaction.atomic():
+                Lapangan.objects.bulk_update(objs, fields, batch_size=BATCH_SIZE)
+            job.updated += len(objs)
+            continue
+        except DatabaseError:
+            logger.warning('bulk_update batch import gagal, diulang per record', exc_info=True)
+
+        for lapangan in objs:
+            try:
+                with transaction.atomic():
+                    lapangan.save(update_fields=fields)
+                job.updated += 1
+            except DatabaseError as e:
+                _record_error(job, lapangan.name, e)
+
+
+def _record_error(job, name, error):
+    job.errors += 1
+    if len(job.error_samples) < MAX_ERROR_SAMPLES:
+        job.error_samples.append({'nama_tempat': name, 'error': str(error)})
+
+
+def run_import(job, admin_profile, path=None, batch_size=BATCH_SIZE):
+    """
+    Jalankan import untuk `job` sampai selesai. Dipanggil langsung (command) atau dari thread.
+
+    Upsert berdasarkan url_detail (Lapangan.source_url):
+      - url belum ada -> dibuat, walaupun namanya sama dengan lapangan lain (venue
+        berbeda bisa bernama sama). Satu-satunya pengecualian: hasil import versi dulu
+        milik admin yang sama dengan nama itu (belum punya source_url, deskripsinya masih
+        DEFAULT_DESCRIPTION) diadopsi: source_url-nya diisi, isinya diupdate. Lapangan
+        yang dibuat manual atau milik admin lain tidak pernah ditimpa.
+      - record tanpa url tidak bisa di-upsert: dibuat kalau namanya belum ada, selain itu dilewati.
+      - url sudah ada & content_hash sama -> dilewati tanpa nulis apa pun.
+      - url sudah ada & isi berubah -> bulk_update hanya field yang berubah.
+    """
+    path = path or job.source
+    job.status = 'running'
+    job.started_at = timezone.now()
+    job.save(update_fields=['status', 'started_at', 'updated_at'])
+
+    progress_fields = ['processed', 'created', 'updated', 'skipped', 'errors', 'error_samples', 'updated_at']
+    try:
+        by_url, by_name, legacy_rows = _load_existing()
+        creates, updates = [], []
+        with open(path, 'r', encoding='utf-8') as file:
+            for item in iter_records(file):
+                job.processed += 1
+                try:
+                    values, source_url = _parse_record(item)
+                except (KeyError, TypeError, ValueError) as e:
+                    name = item.get('nama_tempat', 'Unknown') if isinstance(item, dict) else 'Unknown'
+                    _record_error(job, name, e)
+                    continue
+                digest = content_hash(values)
+
+                if source_url:
+                    existing = by_url.get(source_url)
+                    if existing is None:
+                        existing = legacy_rows.pop((admin_profile.pk, values['name']), None)
+                elif values['name'] in by_name:
+                    job.skipped += 1
+                    continue
+                else:
+                    existing = None
+
+                if existing is None:
+                    lapangan = Lapangan(
+                        admin_lapangan=admin_profile,
+                        description=DEFAULT_DESCRIPTION,
+                        source_url=source_url,
+                        content_hash=digest,
+                        **values,
+                    )
+                    creates.append(lapangan)
+                    existing = _Existing(
+                        lapangan.id, source_url, digest, admin_profile.pk, source_url is None,
+                        *(values[f] for f in IMPORT_FIELDS)
+                    )
+                    if source_url:
+                        by_url[source_url] = existing
+                    else:
+                        legacy_rows.setdefault((admin_profile.pk, values['name']), existing)
+                    by_name.setdefault(values['name'], existing)
+                elif existing.content_hash == digest and existing.source_url == source_url:
+                    job.skipped += 1
+                    continue
+                else:
+                    fields = [f for f in IMPORT_FIELDS if getattr(existing, f) != values[f]]
+                    if existing.source_url != source_url:
+                        fields.append('source_url')
+                    fields += ['content_hash', 'updated_at']
+                    updates.append((
+                        Lapangan(
+                            id=existing.id,
+                            source_url=source_url,
+                            content_hash=digest,
+                            updated_at=timezone.now(),
+                            **values,
+                        ),
+                        tuple(fields),
+                    ))
+                    # record yang sama muncul lagi di file -> dianggap tidak berubah
+                    existing.source_url, existing.content_hash = source_url, digest
+                    for field in IMPORT_FIELDS:
+                        setattr(existing, field, values[field])
+                    if source_url:
+                        by_url[source_url] = existing
+
+                if len(creates) >= batch_size or len(updates) >= batch_size:
+                    if creates:
+                        _flush_creates(creates, job)
+                    if updates:
+                        _flush_updates(updates, job)
+                    creates, updates = [], []
+                    job.save(update_fields=progress_fields)
+
+        if creates:
+            _flush_creates(creates, job)
+        if updates:
+            _flush_updates(updates, job)
+        job.status = 'done'
+        job.message = 'Import completed successfully'
+    except FileNotFoundError:
+        job.status = 'failed'
+        job.message = 'JSON file not found. Please ensure badminton_final.json is in the correct location.'
+    except ValueError as e:
+        job.status = 'failed'
+        job.message = f'Invalid JSON format: {e}'
+    except Exception as e:
+        logger.exception('Import lapangan gagal')
+        job.status = 'failed'
+        job.message = f'Unexpected error: {e}'
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=progress_fields + ['status', 'message', 'finished_at'])
+    # bulk_create/bulk_update tidak memicu signal Lapangan
+    invalidate_admin_stats([admin_profile.pk])
+    if job.created or job.updated:
+        lapangan_bulk_changed.send(sender=Lapangan)
+    return job
+
+
+def _run_in_thread(job_id, admin_profile, path):
+    try:
+        job = ImportJob.objects.get(id=job_id)
+        run_import(job, admin_profile, path)
+    finally:
+        # koneksi DB milik thread ini tidak dipakai lagi
+        connections.close_all()
+
+
+def start_import(admin_profile, path=None):
+    """
+    Bikin ImportJob dan jalankan di background thread (atau langsung kalau
+    IMPORT_RUN_ASYNC=False, dipakai di test). Kalau masih ada import yang jalan,
+    job itu yang dikembalikan supaya data tidak diimport dua kali.
+    """
+    active = ImportJob.objects.filter(
+        status__in=['queued', 'running'], updated_at__gte=timezone.now() - STALE_AFTER
+    ).first()
+    if active:
+        return active, False
+
+    path = path or DEFAULT_SOURCE
+    job = ImportJob.objects.create(created_by=admin_profile, source=path)
+    if getattr(settings, 'IMPORT_RUN_ASYNC', True):
+        # thread baru pakai koneksi DB sendiri, jadi job harus sudah ke-commit dulu
+        transaction.on_commit(lambda: threading.Thread(
+            target=_run_in_thread, args=(job.id, admin_profile, path), daemon=True
+        ).start())
+    else:
+        run_import(job, admin_profile, path)
+    return job, True
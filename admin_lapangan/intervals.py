@@ -0,0 +1,102 @@
+"""
+Cek bentrok jadwal di memori.
+
+IntervalIndex menyimpan interval (start, end) jadwal per (lapangan, tanggal) dalam
+list yang urut start. Selama interval di satu hari tidak saling overlap, cek bentrok
+cukup bisect + lihat tetangga kiri/kanan (O(log n)). Data lama yang dibuat sebelum ada
+cek bentrok bisa saja sudah overlap; hari seperti itu ditandai waktu load dan dicek
+dengan membandingkan semua interval sebelum posisi bisect. Dipakai untuk satu jadwal
+(create/edit) maupun ribuan kandidat slot sekaligus (generate dari template).
+
+Supaya dua admin yang menyimpan bersamaan tidak lolos cek yang sama, pemanggil
+mengunci baris Lapangan dulu (lock_lapangan) di dalam transaction.atomic sebelum
+memuat index dan menulis jadwal.
+"""
+from bisect import bisect_left, insort
+
+from .models import JadwalLapangan, Lapangan
+
+
+def to_seconds(t):
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+
+class IntervalIndex:
+
+    def __init__(self):
+        self._days = {}
+        # hari yang isinya sudah overlap dari awal (data lama)
+        self._overlapping = set()
+
+    @classmethod
+    def load(cls, lapangan_ids, date_from, date_to=None, exclude_id=None):
+        """Index semua jadwal lapangan_ids di rentang tanggal (inklusif), satu query."""
+        index = cls()
+        rows = JadwalLapangan.objects.filter(
+            lapangan_id__in=lapangan_ids,
+            tanggal__range=(date_from, date_to or date_from),
+        )
+        if exclude_id is not None:
+            rows = rows.exclude(id=exclude_id)
+        for lapangan_id, tanggal, start_main, end_main in rows.values_list('lapangan_id', 'tanggal', 'start_main', 'end_main'):
+            index._days.setdefault((lapangan_id, tanggal), []).append((to_seconds(start_main), to_seconds(end_main)))
+        for key, day in index._days.items():
+            day.sort()
+            if any(day[i][1] > day[i + 1][0] for i in range(len(day) - 1)):
+                index._overlapping.add(key)
+        return index
+
+    def day(self, lapangan_id, tanggal):
+        """List interval (start_detik, end_detik) satu hari, urut start."""
+        return self._days.setdefault((lapangan_id, tanggal), [])
+
+    def overlaps(self, lapangan_id, tanggal, start, end):
+        """True kalau [start, end) tumpang tindih dengan interval yang ada. start/end boleh time atau detik."""
+        if not isinstance(start, int):
+            start, end = to_seconds(start), to_seconds(end)
+        day = self.day(lapangan_id, tanggal)
+        i = bisect_left(day, (start, end))
+        if (lapangan_id, tanggal) in self._overlapping:
+            # interval panjang di kiri bisa melewati tetangga terdekat yang lebih pendek
+            if any(existing_end > start for _, existing_end in day[:i]):
+                return True
+        # selain itu cukup cek tetangga kiri & kanan karena isi day tidak overlap satu sama lain
+        elif i > 0 and day[i - 1][1] > start:
+            return True
+        return i < len(day) and day[i][0] < end
+
+    def add(self, lapangan_id, tanggal, start, end):
+        """Masukkan interval kalau tidak bentrok. Return False (dan tidak menambah) kalau bentrok."""
+        if not isinstance(start, int):
+            start, end = to_seconds(start), to_seconds(end)
+        if self.overlaps(lapangan_id, tanggal, start, end):
+            return False
+        insort(self.day(lapangan_id, tanggal), (start, end))
+        return True
+
+    def remove(self, lapangan_id, tanggal, start, end):
+        """Buang interval yang persis (start, end) dari index (misal jadwal yang mau dipindah jamnya)."""
+        if not isinstance(start, int):
+            start, end = to_seconds(start), to_seconds(end)
+        day = self.day(lapangan_id, tanggal)
+        i = bisect_left(day, (start, end))
+        if i < len(day) and day[i] == (start, end):
+            del day[i]
+
+
+def lock_lapangan(lapangan_ids):
+    """
+    Kunci baris Lapangan (SELECT ... FOR UPDATE) sampai transaksi selesai, jadi cek bentrok
+    + insert jadwal untuk lapangan yang sama berjalan bergiliran. Harus di dalam atomic.
+    Di SQLite FOR UPDATE diabaikan, tapi SQLite memang hanya mengizinkan satu writer.
+    """
+    # urut pk supaya dua proses yang mengunci beberapa lapangan sekaligus tidak saling deadlock
+    return list(
+        Lapangan.objects.select_for_update().filter(id__in=lapangan_ids).order_by('pk').values_list('id', flat=True)
+    )
+
+
+def jadwal_bentrok(lapangan_id, tanggal, start_main, end_main, exclude_id=None):
+    """Cek satu jadwal terhadap jadwal lain di hari yang sama (untuk create/edit)."""
+    index = IntervalIndex.load([lapangan_id], tanggal, exclude_id=exclude_id)
+    return index.overlaps(lapangan_id, tanggal, start_main, end_main)
@@ -0,0 +1,134 @@
+import random
+import time
+import uuid
+from datetime import time as dtime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from admin_lapangan.availability import _build_grids
+from admin_lapangan.bitmap import load_day_grids, store_day_grids
+from admin_lapangan.models import DaySchedule, JadwalLapangan, Lapangan
+from authentication_user.models import UserProfile
+
+
+def table_bytes(model):
+    """Ukuran tabel + semua index-nya dalam byte, atau None kalau DB tidak menyediakan info itu."""
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_total_relation_size(%s)', [table])
+            return cursor.fetchone()[0]
+        if connection.vendor == 'sqlite':
+            try:
+                cursor.execute(
+                    "SELECT SUM(pgsize) FROM dbstat WHERE name = %s OR name IN "
+                    "(SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = %s)",
+                    [table, table],
+                )
+            except Exception:
+                # SQLite tanpa SQLITE_ENABLE_DBSTAT_VTAB
+                return None
+            return cursor.fetchone()[0] or 0
+    return None
+
+
+def fmt_bytes(value):
+    return 'n/a' if value is None else f'{value / 1024 / 1024:8.2f} MiB'
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark mode JADWAL_STORAGE: 'rows' (hanya baris JadwalLapangan per slot) vs 'bitmap' "
+        "(baris yang sama + salinan DaySchedule per hari). Ukuran yang dilaporkan untuk bitmap adalah "
+        "total keduanya, karena DaySchedule disimpan di samping baris, bukan menggantikannya. "
+        "Juga latency baca ketersediaan per mode. Data di-rollback."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--courts', type=int, default=10)
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--hours', type=int, default=16, help='Jumlah slot 1 jam per hari (mulai 06:00)')
+        parser.add_argument('--queries', type=int, default=200, help='Jumlah baca window 3 hari per mode')
+
+    def handle(self, *args, **options):
+        courts, days, hours = options['courts'], options['days'], min(options['hours'], 18)
+
+        with transaction.atomic():
+            rows_before, days_before = table_bytes(JadwalLapangan), table_bytes(DaySchedule)
+            court_ids, start = self.seed(courts, days, hours)
+            with connection.cursor() as cursor:
+                if connection.vendor in ('sqlite', 'postgresql'):
+                    cursor.execute('ANALYZE')
+
+            started = time.perf_counter()
+            dates = [start + timedelta(days=i) for i in range(days)]
+            for court_id in court_ids:
+                store_day_grids(court_id, _build_grids(court_id, dates))
+            pack_elapsed = time.perf_counter() - started
+
+            rows_after, days_after = table_bytes(JadwalLapangan), table_bytes(DaySchedule)
+            rows_size = self.delta(rows_before, rows_after)
+            days_size = self.delta(days_before, days_after)
+            combined = None if rows_size is None or days_size is None else rows_size + days_size
+            n_rows = courts * days * hours
+            n_days = DaySchedule.objects.filter(lapangan_id__in=court_ids).count()
+            self.stdout.write(f"{'mode':12} {'rows':>10} {'size':>14}")
+            self.stdout.write(f"{'rows':12} {n_rows:10} {fmt_bytes(rows_size):>14}")
+            self.stdout.write(
+                f"{'bitmap':12} {n_rows + n_days:10} {fmt_bytes(combined):>14}"
+                f"  (JadwalLapangan + {n_days} DaySchedule {fmt_bytes(days_size).strip()})"
+            )
+            self.stdout.write(f"pack {n_days} hari: {pack_elapsed:.2f}s")
+
+            rng = random.Random(42)
+            windows = [
+                (rng.choice(court_ids), start + timedelta(days=rng.randrange(days - 2)))
+                for _ in range(options['queries'])
+            ]
+            for label, load in (('rows', _build_grids), ('bitmap', load_day_grids)):
+                started = time.perf_counter()
+                slots = 0
+                for court_id, day in windows:
+                    grids = load(court_id, [day, day + timedelta(days=1), day + timedelta(days=2)])
+                    slots += sum(len(grid['ids']) for grid in grids.values())
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{label:12} {elapsed / len(windows) * 1000:8.3f} ms/window  ({slots} slot dibaca)"
+                )
+
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def delta(before, after):
+        return None if before is None or after is None else after - before
+
+    def seed(self, n_courts, n_days, hours):
+        tag = uuid.uuid4().hex[:8]
+        admin = UserProfile.objects.create(
+            user=User.objects.create(username=f'bench_admin_{tag}'), fullname='Bench Admin', role='admin'
+        )
+        courts = Lapangan.objects.bulk_create([
+            Lapangan(admin_lapangan=admin, name=f'Bench {tag} {i}', location='Bench', description='-', price=50000)
+            for i in range(n_courts)
+        ])
+        start = timezone.localdate()
+        rng = random.Random(7)
+        batch = []
+        for court in courts:
+            for offset in range(n_days):
+                for hour in range(hours):
+                    batch.append(JadwalLapangan(
+                        lapangan=court,
+                        tanggal=start + timedelta(days=offset),
+                        start_main=dtime(6 + hour),
+                        end_main=dtime(7 + hour),
+                        is_available=rng.random() < 0.7,
+                    ))
+                if len(batch) >= 5000:
+                    JadwalLapangan.objects.bulk_create(batch, batch_size=1000)
+                    batch = []
+        JadwalLapangan.objects.bulk_create(batch, batch_size=1000)
+        return [court.id for court in courts], start
@@ -0,0 +1,43 @@
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from admin_lapangan.models import ScheduleTemplate
+from admin_lapangan.scheduling import generate_jadwal
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate jadwal dari template mingguan (ScheduleTemplate) untuk semua lapangan "
+        "yang punya template aktif, atau hanya --lapangan tertentu. Slot yang sudah ada dilewati."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--weeks', type=int, default=4, help='Jumlah minggu yang digenerate (default 4)')
+        parser.add_argument('--days', type=int, help='Jumlah hari, menggantikan --weeks')
+        parser.add_argument('--start', help='Tanggal mulai YYYY-MM-DD (default hari ini)')
+        parser.add_argument('--lapangan', action='append', help='ID lapangan, boleh diulang')
+
+    def handle(self, *args, **options):
+        try:
+            date_from = datetime.strptime(options['start'], '%Y-%m-%d').date() if options['start'] else timezone.localdate()
+        except ValueError:
+            raise CommandError('--start harus berformat YYYY-MM-DD')
+        days = options['days'] or options['weeks'] * 7
+        if days < 1:
+            raise CommandError('Jumlah hari minimal 1')
+        date_to = date_from + timedelta(days=days - 1)
+
+        lapangan_ids = options['lapangan'] or list(
+            ScheduleTemplate.objects.filter(is_active=True).values_list('lapangan_id', flat=True).distinct()
+        )
+
+        started = time.perf_counter()
+        created, skipped = generate_jadwal(lapangan_ids, date_from, date_to)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{created} jadwal dibuat, {skipped} dilewati ({len(lapangan_ids)} lapangan, "
+            f"{date_from} s/d {date_to}) dalam {elapsed:.2f}s"
+        ))
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from admin_lapangan.importer import BATCH_SIZE, DEFAULT_SOURCE, run_import
+from admin_lapangan.models import ImportJob
+from authentication_user.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Import data lapangan dari file JSON (default badminton_final.json) secara streaming "
+        "dan bulk. Upsert berdasarkan url_detail; record yang tidak berubah dilewati."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--admin', required=True, help='Username admin pemilik lapangan hasil import')
+        parser.add_argument('--file', default=DEFAULT_SOURCE, help='Path file JSON')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            admin_profile = UserProfile.objects.get(user__username=options['admin'])
+        except UserProfile.DoesNotExist:
+            raise CommandError(f"User '{options['admin']}' tidak punya profile")
+
+        job = ImportJob.objects.create(created_by=admin_profile, source=options['file'])
+        started = time.perf_counter()
+        run_import(job, admin_profile, batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+
+        summary = (
+            f"{job.processed} record diproses: {job.created} dibuat, {job.updated} diupdate, {job.skipped} dilewati, "
+            f"{job.errors} error dalam {elapsed:.2f}s"
+        )
+        if job.status != 'done':
+            raise CommandError(f"{job.message} ({summary})")
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from admin_lapangan.availability import invalidate_grid_for_jadwal
+from admin_lapangan.models import JadwalLapangan, ScheduleTemplate
+from admin_lapangan.scheduling import generate_jadwal
+from booking.models import Booking
+
+CHUNK = 200
+PRUNE_CHUNK = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Jaga supaya jadwal N hari ke depan (JADWAL_WINDOW_DAYS) selalu ada untuk setiap "
+        "lapangan yang punya template aktif. Hanya hari yang belum punya jadwal sama sekali "
+        "yang diisi; jadwal lama/yang sudah dibooking tidak disentuh. Jadwal yang sudah lewat "
+        "(lebih lama dari --retain-days / JADWAL_RETAIN_DAYS) dan tidak pernah dibooking dihapus "
+        "supaya tabel jadwal tidak terus membesar. "
+        "Jalankan berkala (cron / scheduler), misal sekali sehari."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Panjang window dalam hari (default JADWAL_WINDOW_DAYS)')
+        parser.add_argument(
+            '--retain-days', type=int,
+            help='Jadwal lewat yang disimpan berapa hari ke belakang sebelum dihapus (default JADWAL_RETAIN_DAYS)'
+        )
+
+    def handle(self, *args, **options):
+        days = options['days'] or getattr(settings, 'JADWAL_WINDOW_DAYS', 30)
+        if days < 1:
+            raise CommandError('--days minimal 1')
+        # sama dengan batas hari di booking/services (hold & expire)
+        date_from = timezone.localdate()
+        date_to = date_from + timedelta(days=days - 1)
+
+        retain_days = options['retain_days']
+        if retain_days is None:
+            retain_days = getattr(settings, 'JADWAL_RETAIN_DAYS', 0)
+        if retain_days < 0:
+            raise CommandError('--retain-days tidak boleh negatif')
+        total_pruned = self._prune(date_from - timedelta(days=retain_days))
+
+        lapangan_ids = list(
+            ScheduleTemplate.objects.filter(is_active=True)
+            .order_by('lapangan_id').values_list('lapangan_id', flat=True).distinct()
+        )
+
+        total_created = total_skipped = 0
+        # per potongan supaya jadwal yang di-load ke memori tidak ikut membengkak
+        for i in range(0, len(lapangan_ids), CHUNK):
+            created, skipped = generate_jadwal(
+                lapangan_ids[i:i + CHUNK], date_from, date_to, missing_days_only=True
+            )
+            total_created += created
+            total_skipped += skipped
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{total_created} jadwal dibuat untuk {len(lapangan_ids)} lapangan "
+            f"({date_from} s/d {date_to}), {total_skipped} slot dilewati, "
+            f"{total_pruned} jadwal lewat dihapus"
+        ))
+
+    def _prune(self, cutoff):
+        """Hapus jadwal sebelum cutoff yang tidak pernah dipakai booking apa pun.
+        Booking gagal/selesai tetap menunjuk jadwalnya sebagai riwayat, jadi ikut dipertahankan."""
+        pernah_dibooking = Booking.objects.filter(jadwal=OuterRef('pk'))
+        stale = (
+            JadwalLapangan.objects.filter(tanggal__lt=cutoff)
+            .exclude(Exists(pernah_dibooking)).order_by('pk')
+        )
+        total = 0
+        while True:
+            ids = list(stale.values_list('pk', flat=True)[:PRUNE_CHUNK])
+            if not ids:
+                return total
+            with transaction.atomic():
+                # grid/DaySchedule hari itu ikut dibuang supaya tidak menunjuk id yang sudah hilang
+                invalidate_grid_for_jadwal(ids)
+                _, per_model = stale.filter(id__in=ids).delete()
+            total += per_model.get(JadwalLapangan._meta.label, 0)
+            if len(ids) < PRUNE_CHUNK:
+                return total
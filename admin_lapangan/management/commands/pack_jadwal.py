@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from admin_lapangan.availability import repack_days
+from admin_lapangan.models import DaySchedule, JadwalLapangan
+
+
+class Command(BaseCommand):
+    help = (
+        "Isi DaySchedule (mode JADWAL_STORAGE='bitmap') dari JadwalLapangan untuk N hari ke depan. "
+        "Hanya hari yang belum punya DaySchedule (baru, atau dihapus karena jadwalnya berubah) yang "
+        "dibangun, jadi aman dijalankan berkala lewat cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Panjang window dalam hari (default JADWAL_WINDOW_DAYS)')
+
+    def handle(self, *args, **options):
+        days = options['days'] or getattr(settings, 'JADWAL_WINDOW_DAYS', 30)
+        if days < 1:
+            raise CommandError('--days minimal 1')
+        date_from = timezone.localdate()
+        dates = [date_from + timedelta(days=i) for i in range(days)]
+
+        lapangan_ids = list(
+            JadwalLapangan.objects.filter(tanggal__range=(dates[0], dates[-1]))
+            .order_by('lapangan_id').values_list('lapangan_id', flat=True).distinct()
+        )
+        packed = set(
+            DaySchedule.objects.filter(lapangan_id__in=lapangan_ids, tanggal__range=(dates[0], dates[-1]))
+            .values_list('lapangan_id', 'tanggal')
+        )
+        total = 0
+        for lapangan_id in lapangan_ids:
+            # hari kosong juga dapat DaySchedule, supaya bacanya tidak jatuh ke baris
+            missing = [tanggal for tanggal in dates if (lapangan_id, tanggal) not in packed]
+            if missing:
+                repack_days(lapangan_id, missing)
+                total += len(missing)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"DaySchedule {total} hari di {len(lapangan_ids)} lapangan ({dates[0]} s/d {dates[-1]}) diperbarui"
+        ))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:56
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_lapangan', '0003_alter_lapangan_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleTemplate',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Senin'), (1, 'Selasa'), (2, 'Rabu'), (3, 'Kamis'), (4, 'Jumat'), (5, 'Sabtu'), (6, 'Minggu')])),
+                ('open_time', models.TimeField()),
+                ('close_time', models.TimeField()),
+                ('slot_minutes', models.PositiveSmallIntegerField(default=60)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('lapangan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule_templates', to='admin_lapangan.lapangan')),
+            ],
+            options={
+                'ordering': ['weekday', 'open_time'],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_lapangan', '0006_lapangan_source_url'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='jadwallapangan',
+            constraint=models.CheckConstraint(condition=models.Q(('start_main__lt', models.F('end_main'))), name='jadwal_start_before_end'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_lapangan', '0007_jadwal_start_before_end'),
+        ('authentication_user', '0002_alter_userprofile_role'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jadwallapangan',
+            index=models.Index(fields=['lapangan', 'is_available', 'tanggal'], name='jadwal_lap_avail_tgl_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lapangan',
+            index=models.Index(fields=['admin_lapangan', 'created_at'], name='lapangan_admin_created_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_lapangan', '0009_closure'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DaySchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tanggal', models.DateField()),
+                ('resolution', models.PositiveSmallIntegerField()),
+                ('starts', models.BinaryField()),
+                ('ends', models.BinaryField()),
+                ('free', models.BinaryField()),
+                ('jadwal_ids', models.BinaryField()),
+                ('holds', models.JSONField(blank=True, default=dict)),
+                ('lapangan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='day_schedules', to='admin_lapangan.lapangan')),
+            ],
+            options={
+                'unique_together': {('lapangan', 'tanggal')},
+            },
+        ),
+    ]
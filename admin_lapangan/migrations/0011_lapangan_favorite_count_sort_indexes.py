@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:21
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def isi_favorite_count(apps, schema_editor):
+    Lapangan = apps.get_model('admin_lapangan', 'Lapangan')
+    LapanganFavorit = apps.get_model('homepage', 'LapanganFavorit')
+    jumlah = LapanganFavorit.objects.filter(lapangan=OuterRef('pk')).order_by().values('lapangan').annotate(
+        n=Count('id')
+    ).values('n')
+    Lapangan.objects.update(favorite_count=Coalesce(Subquery(jumlah), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_lapangan', '0010_dayschedule'),
+        ('authentication_user', '0002_alter_userprofile_role'),
+        ('homepage', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lapangan',
+            name='favorite_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='lapangan',
+            index=models.Index(fields=['created_at', 'id'], name='lapangan_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lapangan',
+            index=models.Index(fields=['price', 'id'], name='lapangan_price_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lapangan',
+            index=models.Index(fields=['favorite_count', 'id'], name='lapangan_favorite_id_idx'),
+        ),
+        migrations.RunPython(isi_favorite_count, migrations.RunPython.noop),
+    ]
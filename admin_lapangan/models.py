@@ -16,6 +16,11 @@ class Lapangan(models.Model):
     description = models.TextField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
     image = models.URLField(blank=True, null=True)
+    # diisi oleh importer: url_detail dari feed venue & hash isi record terakhir yang diimport
+    source_url = models.URLField(max_length=500, unique=True, null=True, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True, default='')
+    # jumlah LapanganFavorit, dijaga signal di homepage (dipakai sort=popular)
+    favorite_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -24,6 +29,13 @@ class Lapangan(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['admin_lapangan', 'created_at'], name='lapangan_admin_created_idx'),
+            # keyset pagination katalog homepage, satu index per pilihan sort (dibaca maju/mundur)
+            models.Index(fields=['created_at', 'id'], name='lapangan_created_id_idx'),
+            models.Index(fields=['price', 'id'], name='lapangan_price_id_idx'),
+            models.Index(fields=['favorite_count', 'id'], name='lapangan_favorite_id_idx'),
+        ]
 
 
 class JadwalLapangan(models.Model):
@@ -41,4 +53,142 @@ class JadwalLapangan(models.Model):
 
     class Meta:
         ordering = ['tanggal', 'start_main']
-        unique_together = ['lapangan', 'tanggal', 'start_main']
\ No newline at end of file
+        unique_together = ['lapangan', 'tanggal', 'start_main']
+        indexes = [
+            # jadwal tersedia per lapangan dalam rentang tanggal (halaman booking)
+            models.Index(fields=['lapangan', 'is_available', 'tanggal'], name='jadwal_lap_avail_tgl_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(start_main__lt=models.F('end_main')),
+                name='jadwal_start_before_end',
+            ),
+        ]
+
+class ScheduleTemplate(models.Model):
+    """Pola jadwal mingguan satu lapangan: tiap hari X buka jam sekian, dipotong per slot_minutes."""
+    HARI_CHOICES = [
+        (0, 'Senin'),
+        (1, 'Selasa'),
+        (2, 'Rabu'),
+        (3, 'Kamis'),
+        (4, 'Jumat'),
+        (5, 'Sabtu'),
+        (6, 'Minggu'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    lapangan = models.ForeignKey(Lapangan, on_delete=models.CASCADE, related_name='schedule_templates')
+    weekday = models.PositiveSmallIntegerField(choices=HARI_CHOICES)
+    open_time = models.TimeField()
+    close_time = models.TimeField()
+    slot_minutes = models.PositiveSmallIntegerField(default=60)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.lapangan.name} - {self.get_weekday_display()} ({self.open_time} - {self.close_time})"
+
+    class Meta:
+        ordering = ['weekday', 'open_time']
+
+
+class DaySchedule(models.Model):
+    """
+    Semua jadwal satu lapangan di satu tanggal dalam satu baris (mode JADWAL_STORAGE='bitmap').
+
+    Jam dibagi per `resolution` menit; starts/ends/free adalah bitmap little-endian dengan
+    bit ke-k = menit k*resolution. Slot ke-i = bit nyala ke-i di starts s/d bit nyala ke-i
+    di ends, free menandai slot yang is_available. jadwal_ids = id JadwalLapangan tiap
+    slot (16 byte, urut jam) supaya booking tetap bisa merujuk jadwal; holds = referensi
+    booking pending yang menahan slot {urutan_slot: epoch habis hold}.
+    Salinan baca turunan JadwalLapangan (baris jadwal tetap disimpan dan tetap sumber datanya):
+    dihapus setiap jadwal hari itu berubah, diisi lagi oleh command pack_jadwal.
+    Lihat admin_lapangan/bitmap.py.
+    """
+    lapangan = models.ForeignKey(Lapangan, on_delete=models.CASCADE, related_name='day_schedules')
+    tanggal = models.DateField()
+    resolution = models.PositiveSmallIntegerField()
+    starts = models.BinaryField()
+    ends = models.BinaryField()
+    free = models.BinaryField()
+    jadwal_ids = models.BinaryField()
+    holds = models.JSONField(default=dict, blank=True)
+
+    def __str__(self):
+        return f"{self.lapangan_id} {self.tanggal}"
+
+    class Meta:
+        unique_together = ['lapangan', 'tanggal']
+
+
+class Closure(models.Model):
+    """
+    Lapangan tutup (libur, renovasi, acara) di rentang tanggal.
+    start_time/end_time kosong = tutup seharian; weekday diisi = hanya hari itu tiap minggu
+    (misal tiap Jumat 11:00-13:00). Jadwal yang kena ditutup massal dan tidak digenerate lagi.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    lapangan = models.ForeignKey(Lapangan, on_delete=models.CASCADE, related_name='closures')
+    date_from = models.DateField()
+    date_to = models.DateField()
+    start_time = models.TimeField(null=True, blank=True)
+    end_time = models.TimeField(null=True, blank=True)
+    weekday = models.PositiveSmallIntegerField(choices=ScheduleTemplate.HARI_CHOICES, null=True, blank=True)
+    reason = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.lapangan.name} tutup {self.date_from} s/d {self.date_to}"
+
+    class Meta:
+        ordering = ['date_from', 'start_time']
+        indexes = [
+            models.Index(fields=['lapangan', 'date_to'], name='closure_lap_date_to_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(date_from__lte=models.F('date_to')),
+                name='closure_date_from_before_to',
+            ),
+            models.CheckConstraint(
+                condition=(
+                    models.Q(start_time__isnull=True, end_time__isnull=True)
+                    | models.Q(start_time__lt=models.F('end_time'))
+                ),
+                name='closure_start_before_end',
+            ),
+        ]
+
+
+class ImportJob(models.Model):
+    """Status import data lapangan dari file JSON, dipolling oleh UI admin."""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    created_by = models.ForeignKey(UserProfile, on_delete=models.SET_NULL, null=True, blank=True, related_name='import_jobs')
+    source = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    processed = models.PositiveIntegerField(default=0)
+    created = models.PositiveIntegerField(default=0)
+    updated = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+    error_samples = models.JSONField(default=list, blank=True)
+    message = models.TextField(blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Import {self.source} ({self.status})"
+
+    class Meta:
+        ordering = ['-created_at']
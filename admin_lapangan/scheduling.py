@@ -0,0 +1,87 @@
+"""
+Generate JadwalLapangan massal dari ScheduleTemplate.
+
+Semua jadwal lama di rentang tanggal diambil dengan satu query ke IntervalIndex,
+cek bentrok dilakukan di memori, lalu jadwal baru disimpan pakai bulk_create. Jadi
+biayanya kira-kira dua query + beberapa INSERT per batch, bukan satu query per slot
+seperti create_jadwal_ajax/create_jadwal_flutter.
+"""
+from datetime import time, timedelta
+
+from django.db import transaction
+
+from .availability import invalidate_grid
+from .closures import ClosureCalendar
+from .intervals import IntervalIndex, lock_lapangan, to_seconds
+from .models import JadwalLapangan, ScheduleTemplate
+
+BATCH_SIZE = 1000
+
+
+def _time(seconds):
+    return time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+def template_slots(template):
+    """List (start_detik, end_detik) slot utuh dari jam buka sampai jam tutup template."""
+    start, close = to_seconds(template.open_time), to_seconds(template.close_time)
+    step = template.slot_minutes * 60
+    slots = []
+    while step and start + step <= close:
+        slots.append((start, start + step))
+        start += step
+    return slots
+
+
+def generate_jadwal(lapangan_ids, date_from, date_to, missing_days_only=False):
+    """
+    Bikin jadwal dari template aktif untuk lapangan_ids di rentang tanggal (inklusif).
+    Slot yang bentrok dengan jadwal yang sudah ada (atau slot template lain) dilewati,
+    jadi aman dijalankan berulang kali. Return (jumlah_dibuat, jumlah_dilewati).
+
+    missing_days_only=True: hari yang sudah punya jadwal apa pun dilewati seluruhnya,
+    jadi hari yang sudah diatur manual oleh admin tidak ditambah-tambahi.
+
+    Slot yang kena Closure (lapangan tutup) juga dilewati.
+    """
+    per_hari = {}
+    for template in ScheduleTemplate.objects.filter(lapangan_id__in=lapangan_ids, is_active=True):
+        per_hari.setdefault((template.lapangan_id, template.weekday), []).extend(template_slots(template))
+    if not per_hari:
+        return 0, 0
+
+    with transaction.atomic():
+        lapangan_dipakai = lock_lapangan({lapangan_id for lapangan_id, _ in per_hari})
+        index = IntervalIndex.load(lapangan_dipakai, date_from, date_to)
+        tutup = ClosureCalendar.load(lapangan_dipakai, date_from, date_to)
+
+        baru, dilewati = [], 0
+        tanggal_berubah = {}
+        jumlah_hari = (date_to - date_from).days + 1
+        for offset in range(jumlah_hari):
+            tanggal = date_from + timedelta(days=offset)
+            for (lapangan_id, weekday), slots in per_hari.items():
+                if weekday != tanggal.weekday():
+                    continue
+                if missing_days_only and index.day(lapangan_id, tanggal):
+                    dilewati += len(slots)
+                    continue
+                for start, end in slots:
+                    if tutup.is_closed(lapangan_id, tanggal, start, end) or not index.add(lapangan_id, tanggal, start, end):
+                        dilewati += 1
+                        continue
+                    baru.append(JadwalLapangan(
+                        lapangan_id=lapangan_id,
+                        tanggal=tanggal,
+                        start_main=_time(start),
+                        end_main=_time(end),
+                    ))
+                    tanggal_berubah.setdefault(lapangan_id, set()).add(tanggal)
+
+        # ignore_conflicts: jaga-jaga di SQLite (FOR UPDATE diabaikan) kalau ada generate
+        # lain yang jalan barengan, slot yang sama dilewati, bukan error.
+        # bulk_create tidak memicu signal, jadi grid ketersediaan dibuang manual
+        JadwalLapangan.objects.bulk_create(baru, batch_size=BATCH_SIZE, ignore_conflicts=True)
+        for lapangan_id, dates in tanggal_berubah.items():
+            invalidate_grid(lapangan_id, dates)
+    return len(baru), dilewati
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import Signal, receiver
+
+from .availability import invalidate_grid
+from .models import JadwalLapangan, Lapangan
+from .stats import invalidate_admin_stats, invalidate_dashboard_stats
+
+# dikirim setelah Lapangan ditulis massal (bulk_create/bulk_update) tanpa signal per baris
+lapangan_bulk_changed = Signal()
+
+
+@receiver(post_init, sender=JadwalLapangan)
+def simpan_posisi_awal_jadwal(sender, instance, **kwargs):
+    # dicatat supaya kalau jadwal dipindah tanggal/lapangan, grid hari lamanya juga dibuang.
+    # baca lewat __dict__ biar field yang di-defer (.only()) tidak memicu query
+    instance._grid_awal = (instance.__dict__.get('lapangan_id'), instance.__dict__.get('tanggal'))
+
+
+@receiver(post_save, sender=JadwalLapangan)
+@receiver(post_delete, sender=JadwalLapangan)
+def invalidate_grid_jadwal(sender, instance, **kwargs):
+    invalidate_grid(instance.lapangan_id, [instance.tanggal])
+
+    lapangan_awal, tanggal_awal = getattr(instance, '_grid_awal', (None, None))
+    if tanggal_awal and (lapangan_awal, tanggal_awal) != (instance.lapangan_id, instance.tanggal):
+        invalidate_grid(lapangan_awal, [tanggal_awal])
+    instance._grid_awal = (instance.lapangan_id, instance.tanggal)
+
+
+@receiver(post_save, sender=Lapangan)
+@receiver(post_delete, sender=Lapangan)
+def invalidate_stats_lapangan(sender, instance, **kwargs):
+    # jumlah lapangan di dashboard admin pemiliknya berubah (termasuk pemilik lama kalau pindah admin)
+    invalidate_admin_stats([instance.admin_lapangan_id])
+    invalidate_dashboard_stats([instance.id])
@@ -0,0 +1,133 @@
+"""
+Ringkasan angka untuk dashboard admin, dihitung dengan beberapa query agregat dan
+di-cache per admin.
+
+Cache admin dibuang setiap ada perubahan jadwal/booking di lapangannya: semua jalur
+tulis jadwal & booking sudah lewat invalidate_grid (availability.py), dan dari sana
+invalidate_dashboard_stats dipanggil. Pemilik lapangan dicari dari cache
+(lapangan -> admin, diisi waktu stats dihitung), jadi invalidasi tidak menambah query;
+lapangan yang tidak ada di cache berarti admin-nya juga belum punya stats ter-cache.
+
+"Membuang" berarti mengganti token versi admin itu (perubahan massal lintas admin seperti
+sweeper expire_bookings mengganti token generasi global), dan key stats memuat kedua
+token. Token dibaca sebelum stats dihitung, jadi hasil hitungan yang keduluan tulisan
+tersimpan di key lama yang tidak akan dibaca lagi, bukan menimpa key yang baru.
+"""
+import uuid
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q, Sum
+from django.utils import timezone
+
+from booking.models import Booking
+
+from .models import JadwalLapangan, Lapangan
+
+STATS_TIMEOUT = 60 * 5
+OCCUPANCY_DAYS = 7
+_GENERATION_KEY = 'dashboard_stats:gen'
+BOOKED_STATUSES = ('pending', 'completed')
+
+
+def _token():
+    # acak, bukan counter: token yang ter-evict tidak akan balik ke nilai lama
+    return uuid.uuid4().hex
+
+
+def _version_key(profile_id):
+    return f'dashboard_stats:ver:{profile_id}'
+
+
+def _key(profile_id):
+    generation = cache.get_or_set(_GENERATION_KEY, _token, None)
+    version = cache.get_or_set(_version_key(profile_id), _token, None)
+    return f'dashboard_stats:{generation}:{version}:{profile_id}'
+
+
+def _owner_key(lapangan_id):
+    # lapangan_id bisa UUID atau string, disamakan dulu
+    return f'dashboard_stats:owner:{uuid.UUID(str(lapangan_id)).hex}'
+
+
+def compute_dashboard_stats(profile, now=None, lapangan_ids=None):
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    week_start = today - timedelta(days=today.weekday())
+    occupancy_end = today + timedelta(days=OCCUPANCY_DAYS - 1)
+
+    if lapangan_ids is None:
+        lapangan_ids = list(Lapangan.objects.filter(admin_lapangan=profile).values_list('id', flat=True))
+
+    dibooking = Exists(JadwalLapangan.objects.filter(pk=OuterRef('pk'), booking__status_book__in=BOOKED_STATUSES))
+    jadwal = JadwalLapangan.objects.filter(
+        lapangan__admin_lapangan=profile, tanggal__gte=today
+    ).aggregate(
+        upcoming=Count('id'),
+        upcoming_available=Count('id', filter=Q(is_available=True)),
+        window=Count('id', filter=Q(tanggal__lte=occupancy_end)),
+        window_booked=Count('id', filter=Q(dibooking, tanggal__lte=occupancy_end)),
+    )
+
+    # pending yang hold-nya sudah habis ditampilkan failed, sama seperti Booking.display_status
+    # (status yang dikirim serialize_booking)
+    hold_habis = Q(status_book='pending', hold_expires_at__lte=now)
+    bookings = Booking.objects.filter(lapangan_id__admin_lapangan=profile).aggregate(
+        pending=Count('id', filter=Q(status_book='pending') & ~hold_habis),
+        completed=Count('id', filter=Q(status_book='completed')),
+        failed=Count('id', filter=Q(status_book='failed') | hold_habis),
+    )
+
+    # satu baris through = satu jadwal yang dibayar seharga lapangan per jam
+    revenue = Booking.jadwal.through.objects.filter(
+        booking__lapangan_id__admin_lapangan=profile,
+        booking__status_book='completed',
+        jadwallapangan__tanggal__range=(week_start, week_start + timedelta(days=6)),
+    ).aggregate(total=Sum('booking__lapangan_id__price'))['total']
+
+    return {
+        'courts': len(lapangan_ids),
+        'upcoming_slots': jadwal['upcoming'],
+        'upcoming_available': jadwal['upcoming_available'],
+        'occupancy_rate': round(jadwal['window_booked'] / jadwal['window'], 4) if jadwal['window'] else 0,
+        'bookings': bookings,
+        'revenue_week': float(revenue or 0),
+        'week_start': week_start.strftime('%Y-%m-%d'),
+        'generated_at': now.isoformat(),
+    }
+
+
+def dashboard_stats(profile):
+    # key (token generasi + versi) diambil sebelum menghitung; tulisan di tengah jalan mengganti
+    # tokennya, jadi stats yang sudah basi ini tersimpan di key yang tidak dibaca lagi
+    key = _key(profile.pk)
+    stats = cache.get(key)
+    if stats is None:
+        lapangan_ids = list(Lapangan.objects.filter(admin_lapangan=profile).values_list('id', flat=True))
+        cache.set_many({_owner_key(lapangan_id): profile.pk for lapangan_id in lapangan_ids}, STATS_TIMEOUT * 2)
+        stats = compute_dashboard_stats(profile, lapangan_ids=lapangan_ids)
+        cache.set(key, stats, STATS_TIMEOUT)
+    return stats
+
+
+def _bump_versions(profile_ids):
+    cache.set_many({_version_key(pk): _token() for pk in profile_ids}, None)
+
+
+def invalidate_admin_stats(profile_ids):
+    profile_ids = {pk for pk in profile_ids if pk is not None}
+    if profile_ids:
+        # sekali sekarang, sekali lagi setelah commit untuk stats yang dihitung dari data sebelum commit
+        _bump_versions(profile_ids)
+        transaction.on_commit(lambda: _bump_versions(profile_ids))
+
+
+def invalidate_dashboard_stats(lapangan_ids):
+    """Buang stats admin pemilik lapangan_ids (lewat pemetaan di cache, tanpa query)."""
+    owners = cache.get_many([_owner_key(lapangan_id) for lapangan_id in set(lapangan_ids)])
+    invalidate_admin_stats(owners.values())
+
+
+def invalidate_all_dashboard_stats():
+    cache.set(_GENERATION_KEY, _token(), None)
@@ -2,10 +2,33 @@ from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth.models import User
 from authentication_user.models import UserProfile
-from admin_lapangan.models import Lapangan, JadwalLapangan
+from admin_lapangan.models import Lapangan, JadwalLapangan, ScheduleTemplate, Closure, DaySchedule, ImportJob
+from admin_lapangan.importer import DEFAULT_DESCRIPTION, iter_records, run_import
+from admin_lapangan.scheduling import generate_jadwal
+from admin_lapangan.intervals import IntervalIndex
+from admin_lapangan.bitmap import encode_grid, decode_day
+from admin_lapangan.availability import _build_grids, get_grids
+from admin_lapangan import stats as stats_module
+from admin_lapangan.stats import dashboard_stats, invalidate_all_dashboard_stats
+from booking.services import reserve_slots
+from django.utils import timezone
+from django.core.cache import cache
+from admin_lapangan.forms import JadwalLapanganForm
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
 from datetime import date, time, timedelta
+import base64
 import json
+from io import StringIO
 from decimal import Decimal
+from django.core.management import call_command
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from booking.models import Booking
+import os
+import tempfile
+from unittest.mock import patch
 
 # Create your tests here.
 class AdminLapanganTestCase(TestCase):
@@ -554,6 +577,42 @@ class FetchLapanganListAjaxTest(AdminLapanganTestCase):
         self.assertEqual(len(result['data']), 1)
         self.assertEqual(result['data'][0]['name'], 'Lapangan B')
 
+    def test_fetch_lapangan_list_fields(self):
+        """Test ?fields= hanya mengambil kolom yang diminta"""
+        self.client.login(username='admin_test', password='testpass123')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('admin_lapangan:fetch_lapangan_list_ajax'),
+                {'fields': 'name,admin_name'}
+            )
+
+        result = json.loads(response.content)
+        self.assertEqual(result['data'][0], {
+            'id': str(self.lapangan2.id), 'name': 'Lapangan B', 'admin_name': 'Admin Test'
+        })
+        self.assertNotIn('description', queries.captured_queries[-1]['sql'])
+
+        response = self.client.get(
+            reverse('admin_lapangan:fetch_lapangan_list_ajax'), {'fields': 'name,password'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_all_lapangan_json_no_n_plus_one(self):
+        """Test api/lapangan: nama admin di-join, jumlah query tetap"""
+        for i in range(5):
+            Lapangan.objects.create(
+                admin_lapangan=self.admin_profile, name=f'Lapangan X{i}', location='Bogor',
+                description='-', price=Decimal('50000.00')
+            )
+        self.client.login(username='admin_test', password='testpass123')
+        with self.assertNumQueries(4):  # session, user, profile, lapangan
+            response = self.client.get(reverse('admin_lapangan:get_all_lapangan_json'))
+
+        result = json.loads(response.content)
+        self.assertEqual(len(result['data']), 7)
+        self.assertEqual(result['data'][-1]['admin_name'], 'Admin Test')
+        self.assertEqual(result['data'][-1]['description'], 'Lapangan bagus')
+
 class FetchJadwalListAjaxTest(AdminLapanganTestCase):
     """Test untuk fetch_jadwal_list_ajax view"""
     
@@ -578,6 +637,110 @@ class FetchJadwalListAjaxTest(AdminLapanganTestCase):
         
         self.assertEqual(response.status_code, 404)
 
+    def _fetch(self, **params):
+        return self.client.get(
+            reverse('admin_lapangan:fetch_jadwal_list_ajax', args=[self.lapangan1.id]), params
+        )
+
+    def test_default_window_excludes_past_and_far_future(self):
+        """Tanpa from/to cuma jadwal hari ini s/d 14 hari ke depan yang dikirim"""
+        JadwalLapangan.objects.create(
+            lapangan=self.lapangan1, tanggal=date.today() - timedelta(days=30),
+            start_main=time(8, 0), end_main=time(9, 0)
+        )
+        JadwalLapangan.objects.create(
+            lapangan=self.lapangan1, tanggal=date.today() + timedelta(days=60),
+            start_main=time(8, 0), end_main=time(9, 0)
+        )
+        self.client.login(username='admin_test', password='testpass123')
+        result = json.loads(self._fetch().content)
+
+        self.assertEqual(
+            [j['id'] for j in result['data']], [str(self.jadwal1.id), str(self.jadwal2.id)]
+        )
+        self.assertEqual(result['from'], date.today().strftime('%Y-%m-%d'))
+        self.assertEqual(result['to'], (date.today() + timedelta(days=13)).strftime('%Y-%m-%d'))
+        self.assertIsNone(result['next_cursor'])
+
+    def test_from_to_window(self):
+        """Jadwal lama tetap bisa dilihat lewat from/to"""
+        past = date.today() - timedelta(days=30)
+        old = JadwalLapangan.objects.create(
+            lapangan=self.lapangan1, tanggal=past, start_main=time(8, 0), end_main=time(9, 0)
+        )
+        self.client.login(username='admin_test', password='testpass123')
+        result = json.loads(self._fetch(**{'from': past.isoformat(), 'to': past.isoformat()}).content)
+
+        self.assertEqual([j['id'] for j in result['data']], [str(old.id)])
+
+    def test_cursor_pagination(self):
+        """Halaman lanjut lewat next_cursor tanpa slot dobel atau terlewat"""
+        tomorrow = date.today() + timedelta(days=1)
+        for hour in range(12, 17):
+            JadwalLapangan.objects.create(
+                lapangan=self.lapangan1, tanggal=tomorrow, start_main=time(hour, 0), end_main=time(hour + 1, 0)
+            )
+        self.client.login(username='admin_test', password='testpass123')
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            params = {'limit': 3}
+            if cursor:
+                params['cursor'] = cursor
+            result = json.loads(self._fetch(**params).content)
+            seen += [j['start_main'] for j in result['data']]
+            pages += 1
+            cursor = result['next_cursor']
+            if not cursor:
+                break
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(seen, ['08:00', '10:00', '12:00', '13:00', '14:00', '15:00', '16:00'])
+
+    def test_compact_format(self):
+        """format=compact: satu entry per hari dengan array slot"""
+        day_after = date.today() + timedelta(days=2)
+        JadwalLapangan.objects.create(
+            lapangan=self.lapangan1, tanggal=day_after, start_main=time(9, 0), end_main=time(10, 0),
+            is_available=False
+        )
+        self.client.login(username='admin_test', password='testpass123')
+        result = json.loads(self._fetch(format='compact').content)
+
+        self.assertEqual(len(result['data']), 2)
+        first, second = result['data']
+        self.assertEqual(first['id'], [str(self.jadwal1.id), str(self.jadwal2.id)])
+        self.assertEqual(first['start_main'], ['08:00', '10:00'])
+        self.assertEqual(first['end_main'], ['10:00', '12:00'])
+        self.assertEqual(second['tanggal'], day_after.strftime('%Y-%m-%d'))
+        self.assertEqual(second['is_available'], [False])
+
+    def test_invalid_params(self):
+        """Tanggal/cursor ngaco -> 400"""
+        self.client.login(username='admin_test', password='testpass123')
+        self.assertEqual(self._fetch(**{'from': '2024-13-01'}).status_code, 400)
+        self.assertEqual(self._fetch(**{'from': '2024-02-10', 'to': '2024-02-01'}).status_code, 400)
+        self.assertEqual(self._fetch(cursor='bukan-cursor').status_code, 400)
+
+    def test_wrongly_typed_cursor(self):
+        """Cursor buatan sendiri yang isinya bukan string -> 400, bukan 500"""
+        self.client.login(username='admin_test', password='testpass123')
+        for values in ([1, None], [['2024-02-01'], {'jam': '08:00:00'}]):
+            cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+            self.assertEqual(self._fetch(cursor=cursor).status_code, 400)
+
+    def test_get_jadwal_by_lapangan_date_filter(self):
+        """get_jadwal_by_lapangan: ?date= tetap jalan sebagai jendela satu hari"""
+        self.client.login(username='admin_test', password='testpass123')
+        tomorrow = date.today() + timedelta(days=1)
+        response = self.client.get(
+            reverse('admin_lapangan:get_jadwal_by_lapangan', args=[self.lapangan1.id]),
+            {'date': tomorrow.isoformat()}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.content)['data']), 2)
+
 class LapanganModelTest(TestCase):
     """Test untuk Lapangan model"""
     
@@ -658,4 +821,815 @@ class JadwalLapanganModelTest(TestCase):
                 tanggal=tomorrow,
                 start_main=time(8, 0),  # Same time
                 end_main=time(10, 0)
-            )
\ No newline at end of file
+            )
+
+
+class ScheduleTemplateTest(AdminLapanganTestCase):
+    """Test untuk template jadwal mingguan dan generate massal"""
+
+    def setUp(self):
+        super().setUp()
+        # mulai dari Senin depan supaya weekday gampang dihitung
+        today = date.today()
+        self.monday = today + timedelta(days=7 - today.weekday())
+        ScheduleTemplate.objects.create(
+            lapangan=self.lapangan2, weekday=0, open_time=time(8, 0), close_time=time(12, 0), slot_minutes=60
+        )
+        ScheduleTemplate.objects.create(
+            lapangan=self.lapangan2, weekday=2, open_time=time(18, 0), close_time=time(21, 0), slot_minutes=90
+        )
+
+    def test_generate_from_templates(self):
+        created, skipped = generate_jadwal([self.lapangan2.id], self.monday, self.monday + timedelta(days=13))
+
+        # 2 minggu x (4 slot Senin + 2 slot Rabu)
+        self.assertEqual((created, skipped), (12, 0))
+        rabu = self.lapangan2.jadwal.filter(tanggal=self.monday + timedelta(days=2))
+        self.assertEqual(
+            list(rabu.values_list('start_main', 'end_main')),
+            [(time(18, 0), time(19, 30)), (time(19, 30), time(21, 0))]
+        )
+
+    def test_generate_skips_overlap_and_is_idempotent(self):
+        JadwalLapangan.objects.create(
+            lapangan=self.lapangan2, tanggal=self.monday, start_main=time(9, 30), end_main=time(10, 30)
+        )
+
+        created, skipped = generate_jadwal([self.lapangan2.id], self.monday, self.monday)
+        self.assertEqual((created, skipped), (2, 2))
+        self.assertEqual(generate_jadwal([self.lapangan2.id], self.monday, self.monday), (0, 4))
+
+    def test_generate_missing_days_only(self):
+        # Senin minggu ini sudah diatur manual, Senin minggu depan dan Rabu masih kosong
+        manual = JadwalLapangan.objects.create(
+            lapangan=self.lapangan2, tanggal=self.monday, start_main=time(15, 0), end_main=time(16, 0)
+        )
+        created, skipped = generate_jadwal(
+            [self.lapangan2.id], self.monday, self.monday + timedelta(days=13), missing_days_only=True
+        )
+
+        # 4 slot Senin pertama dilewati utuh walaupun tidak bentrok dengan jadwal manual
+        self.assertEqual((created, skipped), (8, 4))
+        self.assertEqual(list(self.lapangan2.jadwal.filter(tanggal=self.monday)), [manual])
+        self.assertEqual(self.lapangan2.jadwal.filter(tanggal=self.monday + timedelta(days=7)).count(), 4)
+        self.assertEqual(self.lapangan2.jadwal.filter(tanggal=self.monday + timedelta(days=2)).count(), 2)
+
+    def test_generate_query_count_does_not_grow_with_range(self):
+        # template, lock lapangan, load jadwal, load closure, savepoint, insert, release
+        with self.assertNumQueries(7):
+            generate_jadwal([self.lapangan2.id], self.monday, self.monday + timedelta(weeks=8) - timedelta(days=1))
+        self.assertEqual(self.lapangan2.jadwal.count(), 8 * 6)
+
+    def test_save_templates_api(self):
+        self.client.login(username='admin_test', password='testpass123')
+        url = reverse('admin_lapangan:schedule_template_api', args=[self.lapangan1.id])
+        response = self.client.post(url, data=json.dumps({'templates': [
+            {'weekday': 5, 'open_time': '07:00', 'close_time': '09:00', 'slot_minutes': 60},
+        ]}), content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['data']), 1)
+        self.assertEqual(self.lapangan1.schedule_templates.get().weekday, 5)
+
+    def test_save_templates_api_rejects_invalid_hours(self):
+        self.client.login(username='admin_test', password='testpass123')
+        url = reverse('admin_lapangan:schedule_template_api', args=[self.lapangan1.id])
+        response = self.client.post(url, data=json.dumps({'templates': [
+            {'weekday': 5, 'open_time': '10:00', 'close_time': '09:00', 'slot_minutes': 60},
+        ]}), content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.lapangan1.schedule_templates.exists())
+
+    def test_generate_api(self):
+        self.client.login(username='admin_test', password='testpass123')
+        url = reverse('admin_lapangan:generate_jadwal_api', args=[self.lapangan2.id])
+        response = self.client.post(url, data=json.dumps({
+            'weeks': 1, 'start': self.monday.strftime('%Y-%m-%d')
+        }), content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 6)
+
+    def test_generate_api_other_admin_forbidden(self):
+        self.client.login(username='other_admin', password='testpass123')
+        url = reverse('admin_lapangan:generate_jadwal_api', args=[self.lapangan2.id])
+        response = self.client.post(url, {'weeks': 1})
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(self.lapangan2.jadwal.exists())
+
+    def test_generate_command(self):
+        out = StringIO()
+        call_command('generate_jadwal', '--days', '7', '--start', self.monday.strftime('%Y-%m-%d'), stdout=out)
+
+        self.assertIn('6 jadwal dibuat', out.getvalue())
+        self.assertEqual(self.lapangan2.jadwal.count(), 6)
+
+
+class MaterializeJadwalTest(AdminLapanganTestCase):
+    """Test untuk job rolling-window materialize_jadwal"""
+
+    def setUp(self):
+        super().setUp()
+        for weekday in range(7):
+            ScheduleTemplate.objects.create(
+                lapangan=self.lapangan2, weekday=weekday, open_time=time(8, 0), close_time=time(10, 0)
+            )
+
+    def test_fills_window(self):
+        call_command('materialize_jadwal', '--days', '5', stdout=StringIO())
+
+        self.assertEqual(self.lapangan2.jadwal.count(), 10)
+        self.assertEqual(
+            set(self.lapangan2.jadwal.values_list('tanggal', flat=True)),
+            {date.today() + timedelta(days=i) for i in range(5)}
+        )
+
+    def test_only_missing_days_are_filled(self):
+        tomorrow = date.today() + timedelta(days=1)
+        manual = JadwalLapangan.objects.create(
+            lapangan=self.lapangan2, tanggal=tomorrow, start_main=time(15, 0), end_main=time(16, 0), is_available=False
+        )
+
+        call_command('materialize_jadwal', '--days', '3', stdout=StringIO())
+
+        # hari yang sudah diatur manual dibiarkan apa adanya
+        self.assertEqual(list(self.lapangan2.jadwal.filter(tanggal=tomorrow)), [manual])
+        self.assertEqual(self.lapangan2.jadwal.count(), 5)
+
+    def test_rerun_and_window_slide(self):
+        call_command('materialize_jadwal', '--days', '3', stdout=StringIO())
+        call_command('materialize_jadwal', '--days', '3', stdout=StringIO())
+        self.assertEqual(self.lapangan2.jadwal.count(), 6)
+
+        call_command('materialize_jadwal', '--days', '4', stdout=StringIO())
+        self.assertEqual(self.lapangan2.jadwal.count(), 8)
+
+    def test_prunes_past_unbooked_jadwal(self):
+        today = timezone.localdate()
+        lalu = {}
+        for days_ago in (1, 3, 10):
+            lalu[days_ago] = JadwalLapangan.objects.create(
+                lapangan=self.lapangan2, tanggal=today - timedelta(days=days_ago),
+                start_main=time(8, 0), end_main=time(9, 0)
+            )
+        dibooking = JadwalLapangan.objects.create(
+            lapangan=self.lapangan2, tanggal=today - timedelta(days=10),
+            start_main=time(9, 0), end_main=time(10, 0), is_available=False
+        )
+        booking = Booking.objects.create(lapangan_id=self.lapangan2, user_id=self.regular_profile, status_book='failed')
+        booking.jadwal.add(dibooking)
+
+        out = StringIO()
+        call_command('materialize_jadwal', '--days', '2', '--retain-days', '3', stdout=out)
+
+        # masih di dalam retensi: disimpan; lebih lama: dihapus kecuali pernah dibooking
+        self.assertTrue(JadwalLapangan.objects.filter(pk=lalu[1].pk).exists())
+        self.assertTrue(JadwalLapangan.objects.filter(pk=lalu[3].pk).exists())
+        self.assertFalse(JadwalLapangan.objects.filter(pk=lalu[10].pk).exists())
+        self.assertEqual(list(booking.jadwal.all()), [dibooking])
+        self.assertIn('1 jadwal lewat dihapus', out.getvalue())
+
+        call_command('materialize_jadwal', '--days', '2', stdout=StringIO())
+
+        self.assertEqual(
+            set(self.lapangan2.jadwal.filter(tanggal__lt=today).values_list('pk', flat=True)), {dibooking.pk}
+        )
+        self.assertEqual(self.lapangan2.jadwal.filter(tanggal__gte=today).count(), 4)
+
+
+class ImportLapanganTest(AdminLapanganTestCase):
+    """Test untuk import data lapangan streaming + bulk"""
+
+    def write_json(self, records):
+        handle, path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(handle, 'w', encoding='utf-8') as file:
+            json.dump(records, file, indent=2)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def record(self, name, price=50000, url=None):
+        return {
+            'nama_tempat': name,
+            'lokasi_tempat': 'Depok',
+            'harga_tempat': price,
+            'link_gambar': 'https://example.com/x.jpg',
+            'url_detail': url,
+        }
+
+    def test_iter_records_across_small_chunks(self):
+        records = [self.record(f'Venue {i}') for i in range(50)] + [1, 'dua', None]
+        with open(self.write_json(records), encoding='utf-8') as file:
+            self.assertEqual(list(iter_records(file, read_size=7)), records)
+
+    def test_import_skips_existing_and_duplicates(self):
+        path = self.write_json([
+            self.record('Lapangan A'),  # sudah ada dari setUp
+            self.record('Venue Baru'),
+            self.record('Venue Baru'),
+            self.record('Venue Rusak', price='mahal'),
+            {'lokasi_tempat': 'tanpa nama'},
+        ])
+        job = ImportJob.objects.create(source=path)
+        run_import(job, self.admin_profile, batch_size=2)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        self.assertEqual((job.processed, job.created, job.skipped, job.errors), (5, 1, 2, 2))
+        self.assertEqual(Lapangan.objects.filter(name='Venue Baru').count(), 1)
+
+    def test_import_query_count_is_per_batch(self):
+        path = self.write_json([self.record(f'Venue {i}') for i in range(100)])
+        job = ImportJob.objects.create(source=path)
+        # status + load nama + 4 batch x (savepoint, insert, release, progress) + akhir
+        with self.assertNumQueries(2 + 4 * 4 + 1):
+            run_import(job, self.admin_profile, batch_size=25)
+        self.assertEqual(Lapangan.objects.filter(name__startswith='Venue ').count(), 100)
+
+    def test_import_invalid_json_fails_job(self):
+        handle, path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(handle, 'w') as file:
+            file.write('{"bukan": "array"}')
+        self.addCleanup(os.remove, path)
+
+        job = run_import(ImportJob.objects.create(source=path), self.admin_profile)
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('Invalid JSON format', job.message)
+
+    @override_settings(IMPORT_RUN_ASYNC=False)
+    def test_import_endpoint_and_status(self):
+        self.client.login(username='admin_test', password='testpass123')
+        response = self.client.post(reverse('admin_lapangan:import_lapangan_data'))
+
+        self.assertEqual(response.status_code, 202)
+        data = response.json()
+        self.assertEqual(data['job']['status'], 'done')
+        self.assertGreater(data['job']['stats']['created'], 0)
+
+        status = self.client.get(data['status_url']).json()
+        self.assertEqual(status['job']['id'], data['job']['id'])
+        self.assertEqual(status['job']['stats']['created'], Lapangan.objects.count() - 2)
+
+    def test_import_command(self):
+        path = self.write_json([self.record('Venue Command')])
+        out = StringIO()
+        call_command('import_lapangan', '--admin', 'admin_test', '--file', path, stdout=out)
+
+        self.assertIn('1 dibuat', out.getvalue())
+        self.assertTrue(Lapangan.objects.filter(name='Venue Command', admin_lapangan=self.admin_profile).exists())
+
+    def test_upsert_by_source_url(self):
+        first = self.write_json([
+            self.record('Venue Satu', url='https://ayo.co.id/v/satu'),
+            self.record('Venue Dua', url='https://ayo.co.id/v/dua'),
+        ])
+        run_import(ImportJob.objects.create(source=first), self.admin_profile)
+        dua_sebelum = Lapangan.objects.get(source_url='https://ayo.co.id/v/dua')
+
+        # nama & harga Venue Satu berubah di feed, Venue Dua tetap
+        second = self.write_json([
+            self.record('Venue Satu Baru', price=75000, url='https://ayo.co.id/v/satu'),
+            self.record('Venue Dua', url='https://ayo.co.id/v/dua'),
+        ])
+        job = run_import(ImportJob.objects.create(source=second), self.admin_profile)
+
+        self.assertEqual((job.created, job.updated, job.skipped), (0, 1, 1))
+        satu = Lapangan.objects.get(source_url='https://ayo.co.id/v/satu')
+        self.assertEqual((satu.name, satu.price), ('Venue Satu Baru', Decimal('75000.00')))
+        dua = Lapangan.objects.get(source_url='https://ayo.co.id/v/dua')
+        self.assertEqual(dua.updated_at, dua_sebelum.updated_at)
+
+    def test_unchanged_reimport_writes_nothing(self):
+        path = self.write_json([self.record(f'Venue {i}', url=f'https://ayo.co.id/v/{i}') for i in range(30)])
+        run_import(ImportJob.objects.create(source=path), self.admin_profile)
+
+        job = ImportJob.objects.create(source=path)
+        # status + load lapangan + akhir, tanpa INSERT/UPDATE lapangan
+        with self.assertNumQueries(3):
+            run_import(job, self.admin_profile, batch_size=10)
+        self.assertEqual((job.created, job.updated, job.skipped), (0, 0, 30))
+
+    def test_legacy_row_is_adopted_by_url(self):
+        # hasil import versi lama: tanpa source_url, deskripsi placeholder import
+        legacy = Lapangan.objects.create(
+            admin_lapangan=self.admin_profile, name='Venue Lama', location='Bogor',
+            description=DEFAULT_DESCRIPTION, price=Decimal('50000'),
+        )
+        path = self.write_json([self.record('Venue Lama', price=100000, url='https://ayo.co.id/v/lama')])
+        job = run_import(ImportJob.objects.create(source=path), self.admin_profile)
+
+        self.assertEqual((job.created, job.updated), (0, 1))
+        legacy.refresh_from_db()
+        self.assertEqual(legacy.source_url, 'https://ayo.co.id/v/lama')
+        self.assertEqual(legacy.price, Decimal('100000.00'))
+
+    def test_manual_or_foreign_same_name_court_is_left_alone(self):
+        other_user = User.objects.create_user(username='admin_lain', password='testpass123')
+        other_admin = UserProfile.objects.create(user=other_user, fullname='Admin Lain', role='admin')
+        foreign = Lapangan.objects.create(
+            admin_lapangan=other_admin, name='Venue Lain', location='Bogor',
+            description=DEFAULT_DESCRIPTION, price=Decimal('50000'),
+        )
+        path = self.write_json([
+            # lapangan1 dibuat manual lewat UI admin
+            self.record('Lapangan A', price=100000, url='https://ayo.co.id/v/a'),
+            self.record('Venue Lain', price=100000, url='https://ayo.co.id/v/lain'),
+        ])
+        job = run_import(ImportJob.objects.create(source=path), self.admin_profile)
+
+        # venue feed dengan url sendiri dibuat baru, lapangan yang ada tidak diadopsi
+        self.assertEqual((job.created, job.updated, job.skipped), (2, 0, 0))
+        self.assertEqual(Lapangan.objects.get(source_url='https://ayo.co.id/v/a').name, 'Lapangan A')
+        self.lapangan1.refresh_from_db()
+        self.assertIsNone(self.lapangan1.source_url)
+        self.assertEqual((self.lapangan1.location, self.lapangan1.description), ('Jakarta Selatan', 'Lapangan bagus'))
+        foreign.refresh_from_db()
+        self.assertIsNone(foreign.source_url)
+        self.assertEqual(foreign.price, Decimal('50000.00'))
+
+    def test_same_name_different_urls_are_separate_venues(self):
+        path = self.write_json([
+            self.record('GOR Badminton', url='https://ayo.co.id/v/1'),
+            self.record('GOR Badminton', price=60000, url='https://ayo.co.id/v/2'),
+        ])
+        job = run_import(ImportJob.objects.create(source=path), self.admin_profile)
+        self.assertEqual((job.created, job.skipped), (2, 0))
+
+        # import ulang: dua-duanya dikenali lewat url, tidak ada yang dibuat lagi
+        job = run_import(ImportJob.objects.create(source=path), self.admin_profile)
+        self.assertEqual((job.created, job.updated, job.skipped), (0, 0, 2))
+        self.assertEqual(
+            sorted(Lapangan.objects.filter(name='GOR Badminton').values_list('source_url', flat=True)),
+            ['https://ayo.co.id/v/1', 'https://ayo.co.id/v/2'],
+        )
+
+
+class IntervalIndexTest(AdminLapanganTestCase):
+    """Test untuk cek bentrok jadwal berbasis IntervalIndex"""
+
+    def test_overlap_rules(self):
+        tomorrow = date.today() + timedelta(days=1)
+        index = IntervalIndex.load([self.lapangan1.id], tomorrow)
+        lapangan_id = self.lapangan1.id
+
+        # jadwal1 08:00-10:00, jadwal2 10:00-12:00
+        self.assertTrue(index.overlaps(lapangan_id, tomorrow, time(9, 0), time(9, 30)))
+        self.assertTrue(index.overlaps(lapangan_id, tomorrow, time(7, 0), time(13, 0)))
+        self.assertTrue(index.overlaps(lapangan_id, tomorrow, time(11, 59), time(12, 30)))
+        self.assertFalse(index.overlaps(lapangan_id, tomorrow, time(12, 0), time(13, 0)))
+        self.assertFalse(index.overlaps(lapangan_id, tomorrow, time(6, 0), time(8, 0)))
+        self.assertFalse(index.overlaps(lapangan_id, tomorrow + timedelta(days=1), time(9, 0), time(10, 0)))
+
+    def test_overlapping_seed_rows(self):
+        # data lama: 08:00-18:00 dan 09:00-10:00 sudah overlap sebelum ada cek bentrok
+        day = date.today() + timedelta(days=3)
+        JadwalLapangan.objects.create(lapangan=self.lapangan1, tanggal=day, start_main=time(8, 0), end_main=time(18, 0))
+        JadwalLapangan.objects.create(lapangan=self.lapangan1, tanggal=day, start_main=time(9, 0), end_main=time(10, 0))
+        index = IntervalIndex.load([self.lapangan1.id], day)
+
+        # tetangga kiri 09:00-10:00 sudah selesai, tapi 08:00-18:00 masih jalan
+        self.assertTrue(index.overlaps(self.lapangan1.id, day, time(12, 0), time(13, 0)))
+        self.assertFalse(index.add(self.lapangan1.id, day, time(15, 0), time(16, 0)))
+        self.assertTrue(index.add(self.lapangan1.id, day, time(18, 0), time(19, 0)))
+
+    def test_add_rejects_overlap(self):
+        tomorrow = date.today() + timedelta(days=1)
+        index = IntervalIndex.load([self.lapangan1.id], tomorrow)
+
+        self.assertTrue(index.add(self.lapangan1.id, tomorrow, time(12, 0), time(13, 0)))
+        self.assertFalse(index.add(self.lapangan1.id, tomorrow, time(12, 30), time(13, 30)))
+        self.assertEqual(len(index.day(self.lapangan1.id, tomorrow)), 3)
+
+    def test_form_rejects_overlap(self):
+        form = JadwalLapanganForm({
+            'tanggal': self.jadwal1.tanggal,
+            'start_main': '09:00',
+            'end_main': '11:00',
+            'is_available': True,
+        }, lapangan=self.lapangan1)
+        self.assertFalse(form.is_valid())
+
+    def test_form_edit_ignores_itself(self):
+        form = JadwalLapanganForm({
+            'tanggal': self.jadwal1.tanggal,
+            'start_main': '08:30',
+            'end_main': '10:00',
+            'is_available': True,
+        }, instance=self.jadwal1)
+        self.assertTrue(form.is_valid())
+
+    def test_create_ajax_rejects_overlap(self):
+        self.client.login(username='admin_test', password='testpass123')
+        response = self.client.post(
+            reverse('admin_lapangan:create_jadwal_ajax', args=[self.lapangan1.id]),
+            {'tanggal': self.jadwal1.tanggal, 'start_main': '09:00', 'end_main': '09:30', 'is_available': True}
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.lapangan1.jadwal.count(), 2)
+
+    def test_db_rejects_end_before_start(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            JadwalLapangan.objects.create(
+                lapangan=self.lapangan1, tanggal=date.today() + timedelta(days=3),
+                start_main=time(10, 0), end_main=time(9, 0)
+            )
+
+
+class BatchJadwalTest(AdminLapanganTestCase):
+    """Test untuk batch_jadwal_flutter (operasi massal jadwal)"""
+
+    def setUp(self):
+        super().setUp()
+        self.tomorrow = date.today() + timedelta(days=1)
+        self.slots = [
+            JadwalLapangan.objects.create(
+                lapangan=self.lapangan1, tanggal=self.tomorrow, start_main=time(hour, 0), end_main=time(hour + 1, 0)
+            )
+            for hour in range(14, 20)
+        ]
+        # jadwal 14:00 sudah dibooking
+        booking = Booking.objects.create(
+            lapangan_id=self.lapangan1, user_id=self.regular_profile, status_book='completed'
+        )
+        booking.jadwal.add(self.slots[0])
+        self.client.login(username='admin_test', password='testpass123')
+
+    def _batch(self, payload):
+        response = self.client.post(
+            reverse('admin_lapangan:batch_jadwal_flutter'), json.dumps(payload), content_type='application/json'
+        )
+        return response, json.loads(response.content)
+
+    def test_close_by_ids_skips_booked_and_foreign(self):
+        foreign = JadwalLapangan.objects.create(
+            lapangan=Lapangan.objects.create(
+                admin_lapangan=self.other_admin_profile, name='Lapangan Lain', location='Depok',
+                description='-', price=Decimal('50000.00')
+            ),
+            tanggal=self.tomorrow, start_main=time(8, 0), end_main=time(9, 0)
+        )
+        ids = [str(j.id) for j in self.slots] + [str(foreign.id)]
+        with CaptureQueriesContext(connection) as queries:
+            response, result = self._batch({'operation': 'close', 'ids': ids})
+
+        self.assertEqual(response.status_code, 200)
+        per_id = {item['id']: item['result'] for item in result['results']}
+        self.assertEqual(per_id[str(self.slots[0].id)], 'booked')
+        self.assertEqual(per_id[str(foreign.id)], 'not_found')
+        self.assertEqual(result['processed'], 5)
+        self.assertFalse(JadwalLapangan.objects.filter(id__in=ids[1:6], is_available=True).exists())
+        self.assertTrue(JadwalLapangan.objects.get(id=foreign.id).is_available)
+        # set-based: jumlah query tidak tergantung jumlah jadwal
+        self.assertLessEqual(len(queries), 12)
+
+    def test_delete_by_date_range(self):
+        response, result = self._batch({
+            'operation': 'delete',
+            'lapangan_id': str(self.lapangan1.id),
+            'from': self.tomorrow.isoformat(),
+            'to': self.tomorrow.isoformat(),
+        })
+
+        self.assertEqual(response.status_code, 200)
+        # jadwal1, jadwal2 + 5 slot bebas terhapus, yang dibooking tetap ada
+        self.assertEqual(result['processed'], 7)
+        self.assertEqual(list(self.lapangan1.jadwal.values_list('id', flat=True)), [self.slots[0].id])
+
+    def test_retime_consecutive_slots(self):
+        """Geser deretan slot berurutan 1 jam; slot yang nabrak jadwal lain ditolak"""
+        moved = self.slots[3:]  # 17-18, 18-19, 19-20
+        response, result = self._batch({
+            'operation': 'retime', 'ids': [str(j.id) for j in moved], 'shift_minutes': 60
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted(JadwalLapangan.objects.filter(id__in=[j.id for j in moved]).values_list('start_main', flat=True)),
+            [time(18, 0), time(19, 0), time(20, 0)]
+        )
+
+        response, result = self._batch({
+            'operation': 'retime', 'ids': [str(self.slots[1].id)], 'shift_minutes': 60
+        })
+        self.assertEqual(result['results'][0]['result'], 'conflict')
+        self.slots[1].refresh_from_db()
+        self.assertEqual(self.slots[1].start_main, time(15, 0))
+
+    def test_slot_reserved_during_batch_is_left_alone(self):
+        for operation, method in (('open', 'update'), ('delete', 'delete')):
+            slot = self.slots[1 if operation == 'open' else 2]
+            real = getattr(QuerySet, method)
+            state = {}
+
+            def write(queryset, *args, real=real, state=state, slot=slot, **kwargs):
+                if queryset.model is JadwalLapangan and not state:
+                    # reservasi commit di antara cek booked dan UPDATE/DELETE batch
+                    state['busy'] = True
+                    state['booking'] = reserve_slots(self.regular_profile, self.lapangan1, [slot.id])
+                return real(queryset, *args, **kwargs)
+
+            with patch.object(QuerySet, method, autospec=True, side_effect=write):
+                response, result = self._batch({'operation': operation, 'ids': [str(slot.id)]})
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(result['results'], [{'id': str(slot.id), 'result': 'booked'}])
+            slot.refresh_from_db()
+            self.assertFalse(slot.is_available)
+            self.assertEqual(list(slot.booking_set.all()), [state['booking']])
+
+    def test_invalid_requests(self):
+        response, _ = self._batch({'operation': 'explode', 'ids': [str(self.slots[1].id)]})
+        self.assertEqual(response.status_code, 400)
+        response, _ = self._batch({'operation': 'retime', 'ids': [str(self.slots[1].id)]})
+        self.assertEqual(response.status_code, 400)
+        response, _ = self._batch({'operation': 'open'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ClosureTest(AdminLapanganTestCase):
+    """Test untuk kalender tutup lapangan (Closure)"""
+
+    def setUp(self):
+        super().setUp()
+        today = date.today()
+        self.monday = today + timedelta(days=7 - today.weekday())
+        ScheduleTemplate.objects.create(
+            lapangan=self.lapangan2, weekday=0, open_time=time(8, 0), close_time=time(14, 0), slot_minutes=60
+        )
+        self.client.login(username='admin_test', password='testpass123')
+        self.url = reverse('admin_lapangan:closure_api', args=[self.lapangan2.id])
+
+    def test_whole_day_closure_closes_slots_except_booked(self):
+        generate_jadwal([self.lapangan2.id], self.monday, self.monday + timedelta(days=7))
+        booked = self.lapangan2.jadwal.get(tanggal=self.monday, start_main=time(8, 0))
+        booking = Booking.objects.create(lapangan_id=self.lapangan2, user_id=self.regular_profile, status_book='completed')
+        booking.jadwal.add(booked)
+
+        response = self.client.post(self.url, json.dumps({
+            'date_from': self.monday.isoformat(), 'date_to': self.monday.isoformat(), 'reason': 'Libur nasional',
+        }), content_type='application/json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(json.loads(response.content)['closed'], 5)
+        self.assertEqual(
+            list(self.lapangan2.jadwal.filter(tanggal=self.monday, is_available=True).values_list('id', flat=True)),
+            [booked.id]
+        )
+        # minggu depannya tidak kena
+        self.assertEqual(self.lapangan2.jadwal.filter(tanggal=self.monday + timedelta(days=7), is_available=True).count(), 6)
+
+    def test_recurring_time_range_closure(self):
+        """Tiap Senin 11:00-13:00 tutup: slot yang overlap ditutup & tidak digenerate"""
+        generate_jadwal([self.lapangan2.id], self.monday, self.monday)
+        response = self.client.post(self.url, {
+            'date_from': self.monday.isoformat(),
+            'date_to': (self.monday + timedelta(weeks=4)).isoformat(),
+            'start_time': '11:30', 'end_time': '13:00', 'weekday': 0,
+        })
+
+        self.assertEqual(response.status_code, 201)
+        closed = self.lapangan2.jadwal.filter(tanggal=self.monday, is_available=False)
+        self.assertEqual(sorted(closed.values_list('start_main', flat=True)), [time(11, 0), time(12, 0)])
+
+        created, skipped = generate_jadwal(
+            [self.lapangan2.id], self.monday + timedelta(weeks=1), self.monday + timedelta(weeks=1)
+        )
+        self.assertEqual((created, skipped), (4, 2))
+
+    def test_generator_skips_closed_days(self):
+        Closure.objects.create(lapangan=self.lapangan2, date_from=self.monday, date_to=self.monday)
+        created, skipped = generate_jadwal([self.lapangan2.id], self.monday, self.monday + timedelta(weeks=1))
+        self.assertEqual((created, skipped), (6, 6))
+        self.assertFalse(self.lapangan2.jadwal.filter(tanggal=self.monday).exists())
+
+    def test_invalid_closure_and_other_admin(self):
+        response = self.client.post(self.url, {
+            'date_from': self.monday.isoformat(), 'date_to': self.monday.isoformat(), 'start_time': '10:00',
+        })
+        self.assertEqual(response.status_code, 400)
+
+        closure = Closure.objects.create(lapangan=self.lapangan2, date_from=self.monday, date_to=self.monday)
+        self.client.login(username='other_admin', password='testpass123')
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        response = self.client.post(reverse('admin_lapangan:delete_closure_api', args=[closure.id]))
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(Closure.objects.filter(id=closure.id).exists())
+
+
+class BitmapStorageTest(AdminLapanganTestCase):
+    """Test untuk penyimpanan jadwal satu DaySchedule per hari (JADWAL_STORAGE='bitmap')"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.tomorrow = date.today() + timedelta(days=1)
+        # jam tidak kelipatan 15 menit + ada celah antar slot
+        JadwalLapangan.objects.create(
+            lapangan=self.lapangan1, tanggal=self.tomorrow, start_main=time(13, 5), end_main=time(14, 0),
+            is_available=False
+        )
+        JadwalLapangan.objects.create(
+            lapangan=self.lapangan1, tanggal=self.tomorrow, start_main=time(20, 0), end_main=time(23, 55)
+        )
+
+    def test_encode_decode_roundtrip(self):
+        grid = _build_grids(self.lapangan1.id, [self.tomorrow])[self.tomorrow]
+        day = encode_grid(self.lapangan1.id, self.tomorrow, grid)
+
+        self.assertEqual(day.resolution, 5)
+        self.assertEqual(len(bytes(day.starts)), 36)
+        self.assertEqual(decode_day(day), grid)
+
+    def test_unaligned_times_stay_in_rows(self):
+        JadwalLapangan.objects.create(
+            lapangan=self.lapangan1, tanggal=self.tomorrow, start_main=time(15, 0, 30), end_main=time(16, 0)
+        )
+        grid = _build_grids(self.lapangan1.id, [self.tomorrow])[self.tomorrow]
+        self.assertIsNone(encode_grid(self.lapangan1.id, self.tomorrow, grid))
+
+    def test_views_keep_json_shape(self):
+        self.client.login(username='admin_test', password='testpass123')
+        list_url = reverse('admin_lapangan:fetch_jadwal_list_ajax', args=[self.lapangan1.id])
+        booking_url = reverse('booking:get_booking_data_flutter', args=[self.lapangan1.id])
+        rows_list = json.loads(self.client.get(list_url, {'limit': 3}).content)
+        rows_booking = json.loads(self.client.get(booking_url).content)['jadwal_list']
+
+        cache.clear()
+        with override_settings(JADWAL_STORAGE='bitmap'):
+            # window default daftar jadwal 14 hari, semuanya sudah punya DaySchedule
+            call_command('pack_jadwal', days=14, stdout=StringIO())
+            self.assertEqual(DaySchedule.objects.filter(lapangan=self.lapangan1).count(), 14)
+            # session, user, profile, lapangan, DaySchedule -- tanpa baca JadwalLapangan
+            with self.assertNumQueries(5):
+                bitmap_list = json.loads(self.client.get(list_url, {'limit': 3}).content)
+            cache.clear()
+            bitmap_booking = json.loads(self.client.get(booking_url).content)['jadwal_list']
+
+            page2 = json.loads(self.client.get(list_url, {'limit': 3, 'cursor': bitmap_list['next_cursor']}).content)
+
+        self.assertEqual(bitmap_list, rows_list)
+        self.assertEqual(bitmap_booking, rows_booking)
+        self.assertEqual([j['start_main'] for j in page2['data']], ['20:00'])
+
+    @override_settings(JADWAL_STORAGE='bitmap')
+    def test_changes_drop_day_until_next_pack(self):
+        call_command('pack_jadwal', days=3, stdout=StringIO())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.jadwal1.is_available = False
+            self.jadwal1.save()
+
+        # tidak ada repack di jalur booking/edit: hari itu dibaca dari baris
+        self.assertFalse(DaySchedule.objects.filter(lapangan=self.lapangan1, tanggal=self.tomorrow).exists())
+        grid = get_grids(self.lapangan1.id, [self.tomorrow])[self.tomorrow]
+        self.assertEqual(grid['ids'][0], self.jadwal1.id.hex)
+        self.assertFalse(grid['free'] & 1)
+
+        out = StringIO()
+        call_command('pack_jadwal', days=3, stdout=out)
+        self.assertIn('DaySchedule 1 hari di 1 lapangan', out.getvalue())
+        day = DaySchedule.objects.get(lapangan=self.lapangan1, tanggal=self.tomorrow)
+        self.assertEqual(decode_day(day), grid)
+
+
+class OccupancyMatrixTest(AdminLapanganTestCase):
+    """Test untuk occupancy_matrix_api"""
+
+    def setUp(self):
+        super().setUp()
+        today = timezone.localdate()
+        self.monday = today - timedelta(days=today.weekday()) + timedelta(weeks=2)
+        self.wednesday = self.monday + timedelta(days=2)
+        JadwalLapangan.objects.create(
+            lapangan=self.lapangan2, tanggal=self.wednesday, start_main=time(9, 0), end_main=time(10, 30)
+        )
+        self.closed = JadwalLapangan.objects.create(
+            lapangan=self.lapangan2, tanggal=self.wednesday, start_main=time(12, 0), end_main=time(13, 0),
+            is_available=False
+        )
+        booked = JadwalLapangan.objects.create(
+            lapangan=self.lapangan2, tanggal=self.wednesday, start_main=time(13, 0), end_main=time(14, 0),
+            is_available=False
+        )
+        Booking.objects.create(
+            lapangan_id=self.lapangan2, user_id=self.regular_profile, status_book='pending'
+        ).jadwal.add(booked)
+        self.client.login(username='admin_test', password='testpass123')
+        self.url = reverse('admin_lapangan:occupancy_matrix_api')
+
+    def test_matrix_for_week(self):
+        with self.assertNumQueries(4):  # session, user, profile, matrix
+            response = self.client.get(self.url, {'week': self.wednesday.isoformat()})
+
+        self.assertEqual(response.status_code, 200)
+        result = json.loads(response.content)
+        self.assertEqual(result['week_start'], self.monday.isoformat())
+        self.assertEqual([c['name'] for c in result['courts']], ['Lapangan A', 'Lapangan B'])
+
+        # Lapangan A tidak punya jadwal di minggu itu
+        self.assertEqual(result['matrix'][0], [[0] * 24] * 7)
+        rabu = result['matrix'][1][2]
+        # 09:00-10:30 menutupi kolom jam 9 dan 10
+        self.assertEqual(rabu[8:15], [0, 1, 1, 0, 2, 3, 0])
+        # slot yang ditutup admin (bukan karena booking) = 2
+        self.assertEqual(rabu[self.closed.start_main.hour], 2)
+        self.assertEqual(result['courts'][1]['occupancy'], round(1 / 4, 4))
+
+    def test_resolution_and_other_admin(self):
+        result = json.loads(self.client.get(self.url, {'week': self.monday.isoformat(), 'resolution': 30}).content)
+        self.assertEqual(result['matrix'][1][2][18:21], [1, 1, 1])
+
+        self.assertEqual(self.client.get(self.url, {'resolution': 7}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'week': 'minggu-depan'}).status_code, 400)
+
+        self.client.login(username='other_admin', password='testpass123')
+        result = json.loads(self.client.get(self.url, {'week': self.monday.isoformat()}).content)
+        self.assertEqual(result['courts'], [])
+
+
+class DashboardStatsTest(AdminLapanganTestCase):
+    """Test untuk stats ringkasan di dashboard admin"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        today = timezone.localdate()
+        self.booked = JadwalLapangan.objects.create(
+            lapangan=self.lapangan2, tanggal=today, start_main=time(23, 0), end_main=time(23, 59),
+            is_available=False
+        )
+        Booking.objects.create(
+            lapangan_id=self.lapangan2, user_id=self.regular_profile, status_book='completed'
+        ).jadwal.add(self.booked)
+        Booking.objects.create(lapangan_id=self.lapangan1, user_id=self.regular_profile, status_book='pending')
+        Booking.objects.create(
+            lapangan_id=self.lapangan1, user_id=self.regular_profile, status_book='pending',
+            hold_expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+    def test_stats_values(self):
+        stats = dashboard_stats(self.admin_profile)
+
+        self.assertEqual(stats['courts'], 2)
+        self.assertEqual(stats['upcoming_slots'], 3)
+        self.assertEqual(stats['upcoming_available'], 2)
+        self.assertEqual(stats['occupancy_rate'], round(1 / 3, 4))
+        # pending yang hold-nya habis dihitung failed
+        self.assertEqual(stats['bookings'], {'pending': 1, 'completed': 1, 'failed': 1})
+        self.assertEqual(stats['revenue_week'], 150000.0)
+
+        self.assertEqual(dashboard_stats(self.other_admin_profile)['courts'], 0)
+
+    def test_cached_until_write(self):
+        dashboard_stats(self.admin_profile)
+        with self.assertNumQueries(0):
+            stats = dashboard_stats(self.admin_profile)
+        self.assertEqual(stats['upcoming_available'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reserve_slots(self.regular_profile, self.lapangan1, [self.jadwal1.id])
+        stats = dashboard_stats(self.admin_profile)
+        self.assertEqual(stats['upcoming_available'], 1)
+        self.assertEqual(stats['bookings']['pending'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.jadwal2.is_available = False
+            self.jadwal2.save()
+        self.assertEqual(dashboard_stats(self.admin_profile)['upcoming_available'], 0)
+
+    def test_write_during_compute_is_not_cached_as_fresh(self):
+        original = stats_module.compute_dashboard_stats
+
+        def compute_then_write(*args, **kwargs):
+            # tulisan lain masuk setelah stats dihitung tapi sebelum disimpan ke cache
+            stats = original(*args, **kwargs)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.jadwal2.is_available = False
+                self.jadwal2.save()
+            return stats
+
+        with patch.object(stats_module, 'compute_dashboard_stats', compute_then_write):
+            self.assertEqual(dashboard_stats(self.admin_profile)['upcoming_available'], 2)
+        self.assertEqual(dashboard_stats(self.admin_profile)['upcoming_available'], 1)
+
+    def test_new_lapangan_and_sweeper(self):
+        dashboard_stats(self.admin_profile)
+        Lapangan.objects.create(
+            admin_lapangan=self.admin_profile, name='Lapangan C', location='Depok',
+            description='-', price=Decimal('50000.00')
+        )
+        self.assertEqual(dashboard_stats(self.admin_profile)['courts'], 3)
+
+        # update massal tanpa signal: stats lama dipakai sampai generasi dinaikkan
+        JadwalLapangan.objects.filter(pk=self.jadwal1.pk).update(is_available=False)
+        self.assertEqual(dashboard_stats(self.admin_profile)['upcoming_available'], 2)
+        invalidate_all_dashboard_stats()
+        self.assertEqual(dashboard_stats(self.admin_profile)['upcoming_available'], 1)
+
+    def test_dashboard_shows_stats(self):
+        self.client.login(username='admin_test', password='testpass123')
+        response = self.client.get(reverse('admin_lapangan:dashboard'))
+
+        self.assertEqual(response.context['stats']['courts'], 2)
+        self.assertContains(response, 'Pendapatan Minggu Ini')
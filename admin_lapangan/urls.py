@@ -15,6 +15,7 @@ from admin_lapangan.views import (
     fetch_lapangan_list_ajax,  
     fetch_jadwal_list_ajax, 
     import_lapangan_data,
+    import_status,
     get_all_lapangan_json,
     get_lapangan_detail_json,
     create_lapangan_flutter,
@@ -28,6 +29,13 @@ from admin_lapangan.views import (
     edit_jadwal_flutter,
     delete_jadwal_flutter,
     toggle_availability_flutter,
+    batch_jadwal_flutter,
+    # Template jadwal
+    schedule_template_api,
+    generate_jadwal_api,
+    closure_api,
+    occupancy_matrix_api,
+    delete_closure_api,
 
 )
 
@@ -36,6 +44,7 @@ app_name = 'admin_lapangan'
 urlpatterns = [
     # Dashboard
     path('', admin_dashboard, name='dashboard'),
+    path('api/occupancy/', occupancy_matrix_api, name='occupancy_matrix_api'),
     
     # Lapangan URLs
     path('lapangan/', show_lapangan_list, name='lapangan_list'),
@@ -55,6 +64,7 @@ urlpatterns = [
     path('jadwal/ajax/delete/<uuid:pk>/', delete_jadwal_ajax, name='delete_jadwal_ajax'),
 
     path('import-data/', import_lapangan_data, name="import_lapangan_data"),
+    path('import-data/<uuid:job_id>/', import_status, name="import_status"),
     path('api/lapangan/', get_all_lapangan_json, name='get_all_lapangan_json'),
     path('api/lapangan/<uuid:pk>/', get_lapangan_detail_json, name='get_lapangan_detail_json'),
     path('create-flutter/', create_lapangan_flutter, name='create_lapangan_flutter'),
@@ -70,5 +80,12 @@ urlpatterns = [
     path('jadwal/edit-flutter/<uuid:jadwal_id>/', edit_jadwal_flutter, name='edit_jadwal_flutter'),
     path('jadwal/delete-flutter/<uuid:jadwal_id>/', delete_jadwal_flutter, name='delete_jadwal_flutter'),
     path('jadwal/toggle-availability/<uuid:jadwal_id>/', toggle_availability_flutter, name='toggle_availability_flutter'),
+    path('jadwal/batch/', batch_jadwal_flutter, name='batch_jadwal_flutter'),
+
+    # Template jadwal mingguan & generate massal
+    path('api/lapangan/<uuid:lapangan_id>/templates/', schedule_template_api, name='schedule_template_api'),
+    path('api/lapangan/<uuid:lapangan_id>/generate-jadwal/', generate_jadwal_api, name='generate_jadwal_api'),
+    path('api/lapangan/<uuid:lapangan_id>/closures/', closure_api, name='closure_api'),
+    path('api/closures/<uuid:closure_id>/delete/', delete_closure_api, name='delete_closure_api'),
     path('api/my-lapangan/', get_all_lapangan_json, name='get_my_lapangan_json'),
 ]
\ No newline at end of file
@@ -1,18 +1,59 @@
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.http import JsonResponse, HttpResponseForbidden
 from django.views.decorators.http import require_http_methods
 from django.core.paginator import Paginator
-from django.db.models import Q
-from .models import Lapangan, JadwalLapangan
-from .forms import LapanganForm, JadwalLapanganForm
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import Case, Exists, F, FilteredRelation, IntegerField, OuterRef, Q, Value, When
+from .models import Lapangan, JadwalLapangan, ScheduleTemplate, Closure, ImportJob
+from .forms import LapanganForm, JadwalLapanganForm, ScheduleTemplateForm, ClosureForm
+from .scheduling import generate_jadwal
+from .intervals import jadwal_bentrok, lock_lapangan
+from netly.pagination import encode_cursor, decode_cursor, parse_limit
+from .importer import start_import
+from .batch import BOOKED_STATUSES, OPERATIONS as BATCH_OPERATIONS, apply_jadwal_batch
+from .closures import apply_closure
+from .availability import bitmap_storage, grid_rows
+from .stats import dashboard_stats
 from django.contrib.auth.decorators import login_required
 from decimal import Decimal
-import os, json
+import json, uuid
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.html import strip_tags
 from django.views.decorators.http import require_POST
 
+MAX_GENERATE_WEEKS = 26
+# jendela default & maksimum daftar jadwal admin (hari)
+JADWAL_LIST_DEFAULT_DAYS = 14
+JADWAL_LIST_MAX_DAYS = 92
+
+
+def _text(value):
+    return value or ''
+
+
+def _timestamp(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S') if value else None
+
+
+# field yang bisa diminta lewat ?fields= di daftar lapangan: (kolom/ekspresi, serializer)
+LAPANGAN_FIELDS = {
+    'id': ('id', str),
+    'name': ('name', _text),
+    'location': ('location', _text),
+    'description': ('description', _text),
+    'price': ('price', float),
+    'image': ('image', _text),
+    'admin_name': (F('admin_lapangan__fullname'), _text),
+    'created_at': ('created_at', _timestamp),
+    'updated_at': ('updated_at', _timestamp),
+}
+# field default: list admin (web) vs api/lapangan (Flutter)
+LAPANGAN_LIST_FIELDS = ['id', 'name', 'location', 'price', 'image']
+LAPANGAN_JSON_FIELDS = ['id', 'name', 'location', 'description', 'price', 'image', 'admin_name']
+
 def is_admin(user):
     return hasattr(user, 'profile') and user.profile.role == 'admin'
 
@@ -35,9 +76,97 @@ def admin_dashboard(request):
     
     context = {
         'recent_lapangan': recent_lapangan,
+        'stats': dashboard_stats(request.user.profile),
     }
     return render(request, 'dashboard.html', context)
 
+# status sel matriks okupansi, urut prioritas (yang lebih besar menimpa)
+OCCUPANCY_EMPTY, OCCUPANCY_FREE, OCCUPANCY_CLOSED, OCCUPANCY_BOOKED = 0, 1, 2, 3
+OCCUPANCY_RESOLUTIONS = (15, 30, 60)
+
+
+@login_required(login_url='/login/')
+@admin_required
+def occupancy_matrix_api(request):
+    """
+    Matriks okupansi semua lapangan milik admin untuk satu minggu (Senin-Minggu).
+
+    Query string: week=YYYY-MM-DD (tanggal mana pun di minggu itu, default minggu ini),
+    resolution=15/30/60 menit per kolom (default 60).
+    matrix[lapangan][hari][kolom] = 0 kosong, 1 tersedia, 2 ditutup, 3 dibooking.
+    Semua lapangan + jadwalnya diambil dengan satu query (LEFT JOIN jadwal minggu itu).
+    """
+    try:
+        week = datetime.strptime(request.GET['week'], '%Y-%m-%d').date() if request.GET.get('week') else timezone.localdate()
+    except ValueError:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Format tanggal tidak valid. Gunakan YYYY-MM-DD'
+        }, status=400)
+    try:
+        resolution = int(request.GET.get('resolution', 60))
+    except ValueError:
+        resolution = 0
+    if resolution not in OCCUPANCY_RESOLUTIONS:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'resolution harus salah satu dari {OCCUPANCY_RESOLUTIONS}'
+        }, status=400)
+
+    week_start = week - timedelta(days=week.weekday())
+    week_end = week_start + timedelta(days=6)
+    step = resolution * 60
+    columns = 24 * 60 // resolution
+    row_size = 7 * columns
+
+    rows = Lapangan.objects.filter(
+        admin_lapangan=request.user.profile
+    ).annotate(
+        minggu=FilteredRelation('jadwal', condition=Q(jadwal__tanggal__range=(week_start, week_end))),
+    ).annotate(
+        state=Case(
+            When(minggu__id__isnull=True, then=Value(OCCUPANCY_EMPTY)),
+            When(Exists(JadwalLapangan.objects.filter(
+                pk=OuterRef('minggu__id'), booking__status_book__in=BOOKED_STATUSES
+            )), then=Value(OCCUPANCY_BOOKED)),
+            When(minggu__is_available=True, then=Value(OCCUPANCY_FREE)),
+            default=Value(OCCUPANCY_CLOSED),
+            output_field=IntegerField(),
+        ),
+    ).order_by('name', 'id', 'state').values_list(
+        'id', 'name', 'minggu__tanggal', 'minggu__start_main', 'minggu__end_main', 'state'
+    )
+
+    courts = []
+    cells = bytearray()
+    for lapangan_id, name, tanggal, start_main, end_main, state in rows:
+        if not courts or courts[-1]['id'] != str(lapangan_id):
+            courts.append({'id': str(lapangan_id), 'name': name})
+            cells.extend(bytes(row_size))
+        if tanggal is None:
+            continue
+        # urut state naik, jadi slot yang dibooking selalu menimpa yang tersedia di sel yang sama
+        base = (len(courts) - 1) * row_size + (tanggal - week_start).days * columns
+        first = (start_main.hour * 3600 + start_main.minute * 60 + start_main.second) // step
+        last = -(-(end_main.hour * 3600 + end_main.minute * 60 + end_main.second) // step)
+        cells[base + first:base + last] = bytes([state]) * (last - first)
+
+    matrix = []
+    for i, court in enumerate(courts):
+        court_cells = cells[i * row_size:(i + 1) * row_size]
+        filled = row_size - court_cells.count(OCCUPANCY_EMPTY)
+        court['occupancy'] = round(court_cells.count(OCCUPANCY_BOOKED) / filled, 4) if filled else 0
+        matrix.append([list(court_cells[d * columns:(d + 1) * columns]) for d in range(7)])
+
+    return JsonResponse({
+        'status': 'success',
+        'week_start': week_start.strftime('%Y-%m-%d'),
+        'days': [(week_start + timedelta(days=d)).strftime('%Y-%m-%d') for d in range(7)],
+        'resolution': resolution,
+        'courts': courts,
+        'matrix': matrix,
+    })
+
 # Lapangan CRUD
 @login_required(login_url='/login/')
 @admin_required
@@ -222,12 +351,15 @@ def create_jadwal_ajax(request, lapangan_id):
             pk=lapangan_id, 
             admin_lapangan=request.user.profile
         )
-        form = JadwalLapanganForm(request.POST)
-        
+        with transaction.atomic():
+            lock_lapangan([lapangan.id])
+            form = JadwalLapanganForm(request.POST, lapangan=lapangan)
+            if form.is_valid():
+                jadwal = form.save(commit=False)
+                jadwal.lapangan = lapangan
+                jadwal.save()
+
         if form.is_valid():
-            jadwal = form.save(commit=False)
-            jadwal.lapangan = lapangan
-            jadwal.save()
             return JsonResponse({
                 'status': 'success',
                 'message': 'Jadwal berhasil ditambahkan!'
@@ -280,10 +412,13 @@ def edit_jadwal_ajax(request, pk):
             pk=pk, 
             lapangan__admin_lapangan=request.user.profile
         )
-        form = JadwalLapanganForm(request.POST, instance=jadwal)
-        
+        with transaction.atomic():
+            lock_lapangan([jadwal.lapangan_id])
+            form = JadwalLapanganForm(request.POST, instance=jadwal)
+            if form.is_valid():
+                form.save()
+
         if form.is_valid():
-            form.save()
             return JsonResponse({
                 'status': 'success',
                 'message': 'Jadwal berhasil diperbarui!'
@@ -324,29 +459,49 @@ def delete_jadwal_ajax(request, pk):
 @login_required(login_url='/login/')
 @admin_required
 def fetch_lapangan_list_ajax(request):
+    return lapangan_list_response(request, LAPANGAN_LIST_FIELDS)
+
+
+def lapangan_list_response(request, default_fields):
+    """
+    Daftar lapangan milik admin yang login, dipakai halaman list admin & Flutter.
+
+    ?fields=name,price,... memilih kolom yang dikirim (id selalu ikut); hanya kolom itu
+    yang di-SELECT lewat values(), nama admin di-join di SQL. ?search= menyaring
+    nama/lokasi.
+    """
+    fields = default_fields
+    if request.GET.get('fields'):
+        fields = ['id'] + [f.strip() for f in request.GET['fields'].split(',') if f.strip() and f.strip() != 'id']
+        unknown = [f for f in fields if f not in LAPANGAN_FIELDS]
+        if unknown:
+            return JsonResponse({
+                'status': 'error',
+                'message': f"Field tidak dikenal: {', '.join(unknown)}"
+            }, status=400)
+
+    lapangan_list = Lapangan.objects.filter(admin_lapangan=request.user.profile)
+
     search_query = request.GET.get('search', '').strip()
-    
-    lapangan_list = Lapangan.objects.filter(
-        admin_lapangan=request.user.profile
-    )
-    
     if search_query:
         lapangan_list = lapangan_list.filter(
             Q(name__icontains=search_query) | Q(location__icontains=search_query)
         )
-    
-    lapangan_list = lapangan_list.order_by('-created_at')
-    
+
+    columns = {field: LAPANGAN_FIELDS[field][0] for field in fields}
+    rows = lapangan_list.order_by('-created_at').values(
+        *[c for c in columns.values() if isinstance(c, str)],
+        **{field: c for field, c in columns.items() if not isinstance(c, str)},
+    )
+
     data = []
-    for lapangan in lapangan_list:
-        data.append({
-            'id': str(lapangan.id),
-            'name': lapangan.name,
-            'location': lapangan.location,
-            'price': float(lapangan.price),
-            'image': lapangan.image or '',
-        })
-    
+    for row in rows:
+        item = {}
+        for field, column in columns.items():
+            value = row[column if isinstance(column, str) else field]
+            item[field] = LAPANGAN_FIELDS[field][1](value)
+        data.append(item)
+
     return JsonResponse({'status': 'success', 'data': data})
 
 @login_required(login_url='/login/')
@@ -357,126 +512,158 @@ def fetch_jadwal_list_ajax(request, lapangan_id):
             pk=lapangan_id, 
             admin_lapangan=request.user.profile
         )
-        jadwals = lapangan.jadwal.all().order_by('tanggal', 'start_main')
-        
-        data = []
-        for jadwal in jadwals:
-            data.append({
-                'id': str(jadwal.id),
-                'tanggal': jadwal.tanggal.strftime('%Y-%m-%d'),
-                'start_main': jadwal.start_main.strftime('%H:%M'),
-                'end_main': jadwal.end_main.strftime('%H:%M'),
-                'is_available': jadwal.is_available,
-            })
-        
-        return JsonResponse({'status': 'success', 'data': data})
     except Lapangan.DoesNotExist:
         return JsonResponse({
             'status': 'error',
             'message': 'Lapangan tidak ditemukan'
         }, status=404)
 
+    return jadwal_window_response(request, lapangan)
+
+
+def jadwal_window_response(request, lapangan):
+    """
+    Daftar jadwal satu lapangan dalam jendela tanggal, dipakai halaman jadwal admin & Flutter.
+
+    Query string:
+      from, to   : YYYY-MM-DD, default hari ini s/d JADWAL_LIST_DEFAULT_DAYS hari ke depan,
+                   maksimal JADWAL_LIST_MAX_DAYS hari
+      date       : satu tanggal saja (sama dengan from=to=date)
+      limit      : jumlah slot per halaman (default 500, maks 1000)
+      cursor     : next_cursor dari halaman sebelumnya
+      format     : 'compact' -> satu entry per hari dengan array slot
+    Jadi kerja per request dibatasi jendela & limit, tidak ikut membesar dengan riwayat jadwal.
+    """
+    try:
+        if request.GET.get('date'):
+            date_from = date_to = datetime.strptime(request.GET['date'], '%Y-%m-%d').date()
+        else:
+            date_from = datetime.strptime(request.GET['from'], '%Y-%m-%d').date() if request.GET.get('from') else timezone.localdate()
+            date_to = (
+                datetime.strptime(request.GET['to'], '%Y-%m-%d').date() if request.GET.get('to')
+                else date_from + timedelta(days=JADWAL_LIST_DEFAULT_DAYS - 1)
+            )
+    except ValueError:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Format tanggal tidak valid. Gunakan YYYY-MM-DD'
+        }, status=400)
+
+    if date_to < date_from:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Tanggal akhir tidak boleh sebelum tanggal awal'
+        }, status=400)
+    date_to = min(date_to, date_from + timedelta(days=JADWAL_LIST_MAX_DAYS - 1))
+
+    last = None
+    cursor = request.GET.get('cursor')
+    if cursor:
+        # (tanggal, start_main) unik per lapangan, jadi cukup itu untuk keyset
+        try:
+            last_tanggal, last_start = decode_cursor(cursor, 2)
+            last = (
+                datetime.strptime(last_tanggal, '%Y-%m-%d').date(),
+                datetime.strptime(last_start, '%H:%M:%S').time(),
+            )
+        except ValueError:
+            return JsonResponse({'status': 'error', 'message': 'Cursor tidak valid'}, status=400)
+
+    limit = parse_limit(request.GET.get('limit'), default=500, maximum=1000)
+    if bitmap_storage():
+        # satu DaySchedule per hari di jendela, bukan satu baris per slot
+        rows = grid_rows(lapangan.id, date_from, date_to, after=last, limit=limit + 1)
+    else:
+        jadwal_queryset = JadwalLapangan.objects.filter(
+            lapangan=lapangan, tanggal__range=(date_from, date_to)
+        ).order_by('tanggal', 'start_main')
+        if last:
+            jadwal_queryset = jadwal_queryset.filter(
+                Q(tanggal__gt=last[0]) | Q(tanggal=last[0], start_main__gt=last[1])
+            )
+        rows = list(jadwal_queryset.values_list('id', 'tanggal', 'start_main', 'end_main', 'is_available')[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if request.GET.get('format') == 'compact':
+        data = []
+        for jadwal_id, tanggal, start_main, end_main, is_available in rows:
+            if not data or data[-1]['tanggal'] != tanggal.strftime('%Y-%m-%d'):
+                data.append({'tanggal': tanggal.strftime('%Y-%m-%d'), 'id': [], 'start_main': [], 'end_main': [], 'is_available': []})
+            day = data[-1]
+            day['id'].append(str(jadwal_id))
+            day['start_main'].append(start_main.strftime('%H:%M'))
+            day['end_main'].append(end_main.strftime('%H:%M'))
+            day['is_available'].append(is_available)
+    else:
+        data = [{
+            'id': str(jadwal_id),
+            'tanggal': tanggal.strftime('%Y-%m-%d'),
+            'start_main': start_main.strftime('%H:%M'),
+            'end_main': end_main.strftime('%H:%M'),
+            'is_available': is_available,
+        } for jadwal_id, tanggal, start_main, end_main, is_available in rows]
+
+    next_cursor = None
+    if has_more:
+        _, last_tanggal, last_start, _, _ = rows[-1]
+        next_cursor = encode_cursor(last_tanggal.strftime('%Y-%m-%d'), last_start.strftime('%H:%M:%S'))
+
+    return JsonResponse({
+        'status': 'success',
+        'data': data,
+        'from': date_from.strftime('%Y-%m-%d'),
+        'to': date_to.strftime('%Y-%m-%d'),
+        'next_cursor': next_cursor,
+    })
+
 
 @login_required(login_url='/login/')
 @admin_required
 def import_lapangan_data(request):
-    
-    try:
-        json_file_path = os.path.join(os.path.dirname(__file__), 'badminton_final.json')
-        
-        with open(json_file_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-        
-        default_admin = request.user.profile
-        
-        created_count = 0
-        skipped_count = 0
-        error_count = 0
-        errors = []
-        
+    """
+    Mulai import badminton_final.json di background. Progres dipolling lewat import_status.
+    Endpoint ini API-only (dipanggil script/ops, belum ada tombolnya di halaman admin);
+    response 202 berisi status_url untuk polling.
+    """
+    job, started = start_import(request.user.profile)
+    return JsonResponse({
+        'success': True,
+        'message': 'Import started' if started else 'Import is already running',
+        'job': serialize_import_job(job),
+        'status_url': reverse('admin_lapangan:import_status', args=[job.id]),
+    }, status=202)
+
+
+@login_required(login_url='/login/')
+@admin_required
+def import_status(request, job_id):
+    """Status ImportJob untuk client yang memanggil import_lapangan_data (API-only)."""
+    job = get_object_or_404(ImportJob, pk=job_id)
+    return JsonResponse({'success': True, 'job': serialize_import_job(job)})
+
+
+def serialize_import_job(job):
+    return {
+        'id': str(job.id),
+        'status': job.status,
+        'message': job.message,
+        'stats': {
+            'processed': job.processed,
+            'created': job.created,
+            'updated': job.updated,
+            'skipped': job.skipped,
+            'errors': job.errors,
+        },
+        'errors': job.error_samples or None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
 
-        for item in data:
-            try:
-                if Lapangan.objects.filter(name=item['nama_tempat']).exists():
-                    skipped_count += 1
-                    continue
-                
-                lapangan = Lapangan.objects.create(
-                    admin_lapangan=default_admin,
-                    name=item['nama_tempat'],
-                    location=item['lokasi_tempat'],
-                    description=f"Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut labore et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud exercitation ullamco laboris nisi ut aliquip ex ea commodo consequat. Duis aute irure dolor in reprehenderit in voluptate velit esse cillum dolore eu fugiat nulla pariatur.",
-                    price=Decimal(item['harga_tempat']),
-                    image=item['link_gambar']
-                )
-                
-                created_count += 1
-                
-            except Exception as e:
-                error_count += 1
-                errors.append({
-                    'nama_tempat': item.get('nama_tempat', 'Unknown'),
-                    'error': str(e)
-                })
-        
-        return JsonResponse({
-            'success': True,
-            'message': 'Import completed successfully',
-            'stats': {
-                'total_records': len(data),
-                'created': created_count,
-                'skipped': skipped_count,
-                'errors': error_count
-            },
-            'errors': errors if errors else None
-        })
-        
-    except FileNotFoundError:
-        return JsonResponse({
-            'success': False,
-            'message': 'JSON file not found. Please ensure badminton_final.json is in the correct location.'
-        })
-    except json.JSONDecodeError as e:
-        return JsonResponse({
-            'success': False,
-            'message': f'Invalid JSON format: {str(e)}'
-        })
-    except Exception as e:
-        return JsonResponse({
-            'success': False,
-            'message': f'Unexpected error: {str(e)}'
-        })
-    
 @csrf_exempt
 @admin_required
 def get_all_lapangan_json(request):
-    search_query = request.GET.get('search', '').strip()
-    
-    lapangan_list = Lapangan.objects.filter(
-        admin_lapangan=request.user.profile
-    )
-    
-    # Apply search filter
-    if search_query:
-        lapangan_list = lapangan_list.filter(
-            Q(name__icontains=search_query) | Q(location__icontains=search_query)
-        )
-    
-    lapangan_list = lapangan_list.order_by('-created_at')
-    
-    data = []
-    for lapangan in lapangan_list:
-        data.append({
-            'id': str(lapangan.id),
-            'name': lapangan.name,
-            'location': lapangan.location,
-            'description': lapangan.description,
-            'price': float(lapangan.price),
-            'image': lapangan.image or '',
-            'admin_name': lapangan.admin_lapangan.fullname,
-        })
-    
-    return JsonResponse({'status': 'success', 'data': data})
+    return lapangan_list_response(request, LAPANGAN_JSON_FIELDS)
 
 @login_required(login_url='/login/')
 @admin_required
@@ -720,51 +907,13 @@ def get_jadwal_by_lapangan(request, lapangan_id):
     try:
         # Check if lapangan exists
         lapangan = Lapangan.objects.get(id=lapangan_id)
-        
-        # Get date filter from query params
-        filter_date = request.GET.get('date')
-        
-        jadwal_queryset = JadwalLapangan.objects.filter(
-            lapangan_id=lapangan
-        ).order_by('tanggal', 'start_main')
-        
-        # Apply date filter if provided
-        if filter_date:
-            try:
-                date_obj = datetime.strptime(filter_date, '%Y-%m-%d').date()
-                jadwal_queryset = jadwal_queryset.filter(tanggal=date_obj)
-            except ValueError:
-                return JsonResponse({
-                    'status': 'error',
-                    'message': 'Format tanggal tidak valid. Gunakan YYYY-MM-DD'
-                }, status=400)
-        
-        # Serialize data
-        jadwal_list = []
-        for jadwal in jadwal_queryset:
-            jadwal_list.append({
-                'id': str(jadwal.id),
-                'tanggal': jadwal.tanggal.strftime('%Y-%m-%d'),
-                'start_main': jadwal.start_main.strftime('%H:%M'),
-                'end_main': jadwal.end_main.strftime('%H:%M'),
-                'is_available': jadwal.is_available,
-            })
-        
-        return JsonResponse({
-            'status': 'success',
-            'data': jadwal_list
-        })
-    
     except Lapangan.DoesNotExist:
         return JsonResponse({
             'status': 'error',
             'message': 'Lapangan tidak ditemukan'
         }, status=404)
-    except Exception as e:
-        return JsonResponse({
-            'status': 'error',
-            'message': f'Terjadi kesalahan: {str(e)}'
-        }, status=500)
+
+    return jadwal_window_response(request, lapangan)
 
 @admin_required
 def get_jadwal_detail(request, jadwal_id):
@@ -847,28 +996,24 @@ def create_jadwal_flutter(request):
                 'message': 'Waktu mulai harus lebih awal dari waktu selesai'
             }, status=400)
         
-        # Check for overlapping schedules
-        overlapping = JadwalLapangan.objects.filter(
-            lapangan_id=lapangan,
-            tanggal=tanggal,
-            start_main__lt=end_main,
-            end_main__gt=start_main
-        ).exists()
-        
-        if overlapping:
-            return JsonResponse({
-                'status': 'error',
-                'message': 'Jadwal bertabrakan dengan jadwal yang sudah ada'
-            }, status=400)
-        
-        # Create jadwal
-        jadwal = JadwalLapangan.objects.create(
-            lapangan_id=lapangan_id,
-            tanggal=tanggal,
-            start_main=start_main,
-            end_main=end_main,
-            is_available=True
-        )
+        # Check for overlapping schedules + create, lapangan dikunci supaya admin lain
+        # yang menyimpan bersamaan tidak lolos cek yang sama
+        with transaction.atomic():
+            lock_lapangan([lapangan.id])
+            if jadwal_bentrok(lapangan.id, tanggal, start_main, end_main):
+                return JsonResponse({
+                    'status': 'error',
+                    'message': 'Jadwal bertabrakan dengan jadwal yang sudah ada'
+                }, status=400)
+
+            # Create jadwal
+            jadwal = JadwalLapangan.objects.create(
+                lapangan_id=lapangan.id,
+                tanggal=tanggal,
+                start_main=start_main,
+                end_main=end_main,
+                is_available=True
+            )
         
         return JsonResponse({
             'status': 'success',
@@ -928,29 +1073,24 @@ def edit_jadwal_flutter(request, jadwal_id):
                 'message': 'Waktu mulai harus lebih awal dari waktu selesai'
             }, status=400)
         
-        # Check for overlapping schedules (exclude current jadwal)
-        overlapping = JadwalLapangan.objects.filter(
-            lapangan_id=jadwal.lapangan_id,
-            tanggal=tanggal,
-            start_main__lt=end_main,
-            end_main__gt=start_main
-        ).exclude(id=jadwal_id).exists()
-        
-        if overlapping:
-            return JsonResponse({
-                'status': 'error',
-                'message': 'Jadwal bertabrakan dengan jadwal yang sudah ada'
-            }, status=400)
-        
-        # Update jadwal
-        jadwal.tanggal = tanggal
-        jadwal.start_main = start_main
-        jadwal.end_main = end_main
-        
-        if is_available_str is not None:
-            jadwal.is_available = is_available_str.lower() == 'true'
-        
-        jadwal.save()
+        # Check for overlapping schedules (exclude current jadwal) + update
+        with transaction.atomic():
+            lock_lapangan([jadwal.lapangan_id])
+            if jadwal_bentrok(jadwal.lapangan_id, tanggal, start_main, end_main, exclude_id=jadwal.id):
+                return JsonResponse({
+                    'status': 'error',
+                    'message': 'Jadwal bertabrakan dengan jadwal yang sudah ada'
+                }, status=400)
+
+            # Update jadwal
+            jadwal.tanggal = tanggal
+            jadwal.start_main = start_main
+            jadwal.end_main = end_main
+
+            if is_available_str is not None:
+                jadwal.is_available = is_available_str.lower() == 'true'
+
+            jadwal.save()
         
         return JsonResponse({
             'status': 'success',
@@ -1040,4 +1180,294 @@ def toggle_availability_flutter(request, jadwal_id):
         return JsonResponse({
             'status': 'error',
             'message': f'Terjadi kesalahan: {str(e)}'
-        }, status=500)
\ No newline at end of file
+        }, status=500)
+
+@csrf_exempt
+@admin_required
+@require_POST
+def batch_jadwal_flutter(request):
+    """
+    Buka/tutup/hapus/geser jam banyak jadwal dalam satu request & satu transaksi.
+
+    Body (JSON atau form):
+      operation     : open | close | delete | retime
+      ids           : list id jadwal, atau
+      lapangan_id + from + to (YYYY-MM-DD): semua jadwal lapangan itu di rentang tanggal
+      shift_minutes : untuk retime, boleh negatif
+    Jadwal yang sudah dibooking dilewati (result 'booked'), hasil per jadwal ada di 'results'.
+    """
+    params = request.POST
+    ids = request.POST.getlist('ids')
+    if request.content_type == 'application/json' and request.body:
+        try:
+            params = json.loads(request.body)
+            ids = params.get('ids') or []
+        except (ValueError, AttributeError):
+            return JsonResponse({'status': 'error', 'message': 'Body JSON tidak valid'}, status=400)
+
+    operation = params.get('operation')
+    if operation not in BATCH_OPERATIONS:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'operation harus salah satu dari {", ".join(BATCH_OPERATIONS)}'
+        }, status=400)
+
+    shift_minutes = 0
+    if operation == 'retime':
+        try:
+            shift_minutes = int(params.get('shift_minutes'))
+        except (TypeError, ValueError):
+            shift_minutes = 0
+        if not shift_minutes:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'shift_minutes wajib diisi (bukan 0) untuk retime'
+            }, status=400)
+
+    # hanya jadwal di lapangan milik admin ini yang bisa diubah
+    jadwal_qs = JadwalLapangan.objects.filter(lapangan__admin_lapangan=request.user.profile)
+    if ids:
+        if not isinstance(ids, list):
+            return JsonResponse({'status': 'error', 'message': 'ids harus berupa list'}, status=400)
+        valid_ids = []
+        for jadwal_id in ids:
+            try:
+                valid_ids.append(uuid.UUID(str(jadwal_id)))
+            except ValueError:
+                pass
+        jadwal_qs = jadwal_qs.filter(id__in=valid_ids)
+    elif params.get('lapangan_id'):
+        try:
+            date_from = datetime.strptime(params.get('from') or '', '%Y-%m-%d').date()
+            date_to = datetime.strptime(params.get('to') or '', '%Y-%m-%d').date()
+        except ValueError:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'from dan to wajib diisi dengan format YYYY-MM-DD'
+            }, status=400)
+        try:
+            lapangan = Lapangan.objects.get(
+                id=uuid.UUID(str(params['lapangan_id'])), admin_lapangan=request.user.profile
+            )
+        except (ValueError, Lapangan.DoesNotExist):
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Lapangan tidak ditemukan'
+            }, status=404)
+        jadwal_qs = jadwal_qs.filter(lapangan=lapangan, tanggal__range=(date_from, date_to))
+    else:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Isi ids atau lapangan_id + from + to'
+        }, status=400)
+
+    try:
+        results = apply_jadwal_batch(jadwal_qs, operation, requested_ids=ids, shift_minutes=shift_minutes)
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    ok = sum(1 for item in results if item['result'] == 'ok')
+    return JsonResponse({
+        'status': 'success',
+        'message': f'{ok} dari {len(results)} jadwal berhasil diproses',
+        'processed': ok,
+        'skipped': len(results) - ok,
+        'results': results,
+    })
+
+def _serialize_template(template):
+    return {
+        'id': str(template.id),
+        'weekday': template.weekday,
+        'weekday_display': template.get_weekday_display(),
+        'open_time': template.open_time.strftime('%H:%M'),
+        'close_time': template.close_time.strftime('%H:%M'),
+        'slot_minutes': template.slot_minutes,
+        'is_active': template.is_active,
+    }
+
+
+@csrf_exempt
+@admin_required
+@require_http_methods(["GET", "POST"])
+def schedule_template_api(request, lapangan_id):
+    """
+    GET  -> daftar template jadwal mingguan lapangan.
+    POST -> ganti semua template dengan {"templates": [{weekday, open_time, close_time, slot_minutes}, ...]}.
+    """
+    try:
+        lapangan = Lapangan.objects.get(pk=lapangan_id, admin_lapangan=request.user.profile)
+    except Lapangan.DoesNotExist:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Lapangan tidak ditemukan'
+        }, status=404)
+
+    if request.method == 'POST':
+        try:
+            rows = json.loads(request.body).get('templates', [])
+        except (ValueError, AttributeError):
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Body harus JSON {"templates": [...]}'
+            }, status=400)
+
+        forms_valid = [ScheduleTemplateForm(row) for row in rows if isinstance(row, dict)]
+        errors = {i: form.errors for i, form in enumerate(forms_valid) if not form.is_valid()}
+        if errors or len(forms_valid) != len(rows):
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Validasi gagal',
+                'errors': errors
+            }, status=400)
+
+        with transaction.atomic():
+            lapangan.schedule_templates.all().delete()
+            templates = [form.save(commit=False) for form in forms_valid]
+            for template in templates:
+                template.lapangan = lapangan
+            ScheduleTemplate.objects.bulk_create(templates)
+
+    templates = lapangan.schedule_templates.all()
+    return JsonResponse({
+        'status': 'success',
+        'data': [_serialize_template(t) for t in templates]
+    })
+
+
+@csrf_exempt
+@admin_required
+@require_POST
+def generate_jadwal_api(request, lapangan_id):
+    """Generate jadwal dari template untuk `weeks` minggu (default 4, maks 26) mulai `start` (default hari ini)."""
+    try:
+        lapangan = Lapangan.objects.get(pk=lapangan_id, admin_lapangan=request.user.profile)
+    except Lapangan.DoesNotExist:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Lapangan tidak ditemukan'
+        }, status=404)
+
+    params = request.POST
+    if request.content_type == 'application/json' and request.body:
+        try:
+            params = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({'status': 'error', 'message': 'Body JSON tidak valid'}, status=400)
+
+    try:
+        weeks = int(params.get('weeks', 4))
+        start = params.get('start')
+        date_from = datetime.strptime(start, '%Y-%m-%d').date() if start else timezone.localdate()
+    except (TypeError, ValueError):
+        return JsonResponse({
+            'status': 'error',
+            'message': 'weeks harus angka dan start berformat YYYY-MM-DD'
+        }, status=400)
+
+    if not 1 <= weeks <= MAX_GENERATE_WEEKS:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'weeks harus antara 1 dan {MAX_GENERATE_WEEKS}'
+        }, status=400)
+    if date_from < timezone.localdate():
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Tanggal tidak boleh di masa lalu'
+        }, status=400)
+
+    date_to = date_from + timedelta(weeks=weeks) - timedelta(days=1)
+    created, skipped = generate_jadwal([lapangan.id], date_from, date_to)
+    return JsonResponse({
+        'status': 'success',
+        'message': f'{created} jadwal berhasil dibuat',
+        'created': created,
+        'skipped': skipped,
+        'date_from': date_from.strftime('%Y-%m-%d'),
+        'date_to': date_to.strftime('%Y-%m-%d'),
+    })
+
+
+def _serialize_closure(closure):
+    return {
+        'id': str(closure.id),
+        'date_from': closure.date_from.strftime('%Y-%m-%d'),
+        'date_to': closure.date_to.strftime('%Y-%m-%d'),
+        'start_time': closure.start_time.strftime('%H:%M') if closure.start_time else None,
+        'end_time': closure.end_time.strftime('%H:%M') if closure.end_time else None,
+        'weekday': closure.weekday,
+        'weekday_display': closure.get_weekday_display() if closure.weekday is not None else None,
+        'reason': closure.reason,
+    }
+
+
+@csrf_exempt
+@admin_required
+@require_http_methods(["GET", "POST"])
+def closure_api(request, lapangan_id):
+    """
+    GET  -> daftar closure lapangan yang belum lewat.
+    POST -> tambah closure {date_from, date_to, start_time?, end_time?, weekday?, reason?};
+            jadwal yang kena langsung ditutup dengan satu UPDATE.
+    """
+    try:
+        lapangan = Lapangan.objects.get(pk=lapangan_id, admin_lapangan=request.user.profile)
+    except Lapangan.DoesNotExist:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Lapangan tidak ditemukan'
+        }, status=404)
+
+    if request.method == 'POST':
+        params = request.POST
+        if request.content_type == 'application/json' and request.body:
+            try:
+                params = json.loads(request.body)
+            except ValueError:
+                return JsonResponse({'status': 'error', 'message': 'Body JSON tidak valid'}, status=400)
+
+        form = ClosureForm(params)
+        if not form.is_valid():
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Validasi gagal',
+                'errors': form.errors
+            }, status=400)
+
+        with transaction.atomic():
+            closure = form.save(commit=False)
+            closure.lapangan = lapangan
+            closure.save()
+            closed = apply_closure(closure)
+
+        return JsonResponse({
+            'status': 'success',
+            'message': f'Closure disimpan, {closed} jadwal ditutup',
+            'closed': closed,
+            'data': _serialize_closure(closure),
+        }, status=201)
+
+    closures = lapangan.closures.filter(date_to__gte=timezone.localdate())
+    return JsonResponse({
+        'status': 'success',
+        'data': [_serialize_closure(c) for c in closures]
+    })
+
+
+@csrf_exempt
+@admin_required
+@require_POST
+def delete_closure_api(request, closure_id):
+    """Hapus closure. Jadwal yang sudah ditutup tidak dibuka otomatis (buka lewat jadwal/batch/)."""
+    deleted, _ = Closure.objects.filter(
+        pk=closure_id, lapangan__admin_lapangan=request.user.profile
+    ).delete()
+    if not deleted:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Closure tidak ditemukan'
+        }, status=404)
+    return JsonResponse({
+        'status': 'success',
+        'message': 'Closure berhasil dihapus'
+    })
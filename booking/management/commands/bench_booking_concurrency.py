@@ -0,0 +1,102 @@
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import time as dtime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, OperationalError
+from django.db.models import Count
+from django.utils import timezone
+
+from admin_lapangan.models import Lapangan, JadwalLapangan as Jadwal
+from authentication_user.models import UserProfile
+from booking.models import Booking
+from booking.services import reserve_slots, SlotUnavailable
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark reserve_slots: tembak ratusan booking paralel ke jadwal yang sama, "
+        "laporkan throughput dan pastikan tidak ada double booking."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--attempts', type=int, default=400)
+        parser.add_argument('--workers', type=int, default=32)
+        parser.add_argument('--slots', type=int, default=16, help='jumlah jadwal yang diperebutkan')
+        parser.add_argument('--per-booking', type=int, default=2, help='jadwal per booking')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        tag = uuid.uuid4().hex[:8]
+
+        admin_user = User.objects.create_user(username=f'bench_admin_{tag}')
+        admin = UserProfile.objects.create(user=admin_user, fullname='Bench Admin', role='admin')
+        lapangan = Lapangan.objects.create(
+            admin_lapangan=admin, name=f'Bench Court {tag}', location='Bench',
+            description='-', price=50000,
+        )
+        players = []
+        for i in range(options['workers']):
+            user = User.objects.create_user(username=f'bench_player_{tag}_{i}')
+            players.append(UserProfile.objects.create(user=user, fullname=f'Player {i}'))
+
+        tomorrow = timezone.now().date() + timedelta(days=1)
+        slots = [
+            Jadwal(
+                lapangan=lapangan,
+                tanggal=tomorrow + timedelta(days=i // 16),
+                start_main=dtime(6 + i % 16),
+                end_main=dtime(7 + i % 16),
+            )
+            for i in range(options['slots'])
+        ]
+        Jadwal.objects.bulk_create(slots)
+        slot_ids = [s.id for s in slots]
+        per_booking = min(options['per_booking'], len(slot_ids))
+
+        def attempt(i):
+            try:
+                reserve_slots(players[i % len(players)], lapangan, rng.sample(slot_ids, per_booking))
+                return 'booked'
+            except SlotUnavailable:
+                return 'rejected'
+            except OperationalError:
+                # sqlite: "database is locked" kalau writer antre terlalu lama
+                return 'error'
+            finally:
+                connection.close()
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                results = list(pool.map(attempt, range(options['attempts'])))
+            elapsed = time.perf_counter() - started
+
+            through = Booking.jadwal.through.objects.filter(jadwallapangan__lapangan=lapangan)
+            double_booked = (
+                through.values('jadwallapangan')
+                .annotate(n=Count('booking'))
+                .filter(n__gt=1)
+                .count()
+            )
+            claimed = Jadwal.objects.filter(lapangan=lapangan, is_available=False).count()
+
+            self.stdout.write(f"attempts      : {len(results)} in {elapsed:.3f}s "
+                              f"({len(results) / elapsed:.1f} req/s)")
+            self.stdout.write(f"booked        : {results.count('booked')}")
+            self.stdout.write(f"rejected      : {results.count('rejected')}")
+            self.stdout.write(f"db errors     : {results.count('error')}")
+            self.stdout.write(f"slots claimed : {claimed}/{len(slot_ids)} "
+                              f"(linked: {through.count()})")
+
+            if double_booked or claimed != through.count():
+                self.stdout.write(self.style.ERROR(f"double bookings: {double_booked}"))
+            else:
+                self.stdout.write(self.style.SUCCESS("double bookings: 0"))
+        finally:
+            lapangan.delete()
+            User.objects.filter(username__startswith='bench_').filter(username__contains=tag).delete()
@@ -0,0 +1,119 @@
+import time
+import uuid
+from datetime import datetime, time as dtime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.utils import timezone
+
+from admin_lapangan.models import Lapangan, JadwalLapangan as Jadwal
+from authentication_user.models import UserProfile
+from booking.models import Booking
+from booking.services import expire_overdue_bookings
+from booking.views import show_json
+
+
+class QueryCounter:
+    def __init__(self):
+        self.queries = 0
+        self.writes = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        if sql.lstrip().upper().startswith('UPDATE'):
+            self.writes += 1
+        return execute(sql, params, many, context)
+
+
+def legacy_show_json(profile):
+    # versi lama show_json: is_expired() yang nge-save per booking + query per baris
+    data = []
+    bookings = Booking.objects.filter(lapangan_id__admin_lapangan=profile).order_by('-created_at')
+    for booking in bookings:
+        now = timezone.now()
+        expired = True
+        for j in booking.jadwal.all():
+            if timezone.make_aware(datetime.combine(j.tanggal, j.end_main)) > now:
+                expired = False
+                break
+        if expired and booking.status_book == 'pending':
+            booking.status_book = 'failed'
+            booking.save()
+        data.append({
+            'id': str(booking.id),
+            'lapangan': {'id': str(booking.lapangan_id.id), 'name': booking.lapangan_id.name},
+            'user': {'id': str(booking.user_id.id), 'fullname': booking.user_id.fullname},
+            'status_book': booking.status_book,
+            'total_price': booking.total_price(),
+            'jadwal': list(booking.jadwal.values('id', 'tanggal', 'start_main', 'end_main')),
+        })
+    return data
+
+
+class Command(BaseCommand):
+    help = "Benchmark show_json (admin) sebelum/sesudah di dataset booking sintetis. Data di-rollback."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=10000)
+        parser.add_argument('--courts', type=int, default=10)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            profile = self.seed(options['bookings'], options['courts'])
+            request = RequestFactory().get('/booking/show_json/')
+            request.user = profile.user
+
+            for label, run in (
+                ('legacy (per-row is_expired)', lambda: legacy_show_json(profile)),
+                ('show_json', lambda: show_json(request)),
+                ('expire_overdue_bookings', expire_overdue_bookings),
+            ):
+                # legacy nge-save status failed; reset biar kedua jalur dapat data yang sama
+                Booking.objects.update(status_book='pending')
+                counter = QueryCounter()
+                with connection.execute_wrapper(counter):
+                    started = time.perf_counter()
+                    run()
+                    elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{label:30} {elapsed * 1000:9.1f} ms  {counter.queries:6} queries  {counter.writes:6} writes"
+                )
+
+            transaction.set_rollback(True)
+
+    def seed(self, n_bookings, n_courts):
+        tag = uuid.uuid4().hex[:8]
+        admin = UserProfile.objects.create(
+            user=User.objects.create(username=f'bench_admin_{tag}'), fullname='Bench Admin', role='admin'
+        )
+        player = UserProfile.objects.create(
+            user=User.objects.create(username=f'bench_player_{tag}'), fullname='Bench Player'
+        )
+        courts = Lapangan.objects.bulk_create([
+            Lapangan(admin_lapangan=admin, name=f'Bench {tag} {i}', location='Bench', description='-', price=50000)
+            for i in range(n_courts)
+        ])
+
+        # separuh jadwal sudah lewat, separuh masih di depan
+        start_date = timezone.now().date() - timedelta(days=n_bookings // (n_courts * 32))
+        jadwals = []
+        for i in range(n_bookings):
+            jadwals.append(Jadwal(
+                lapangan=courts[i % n_courts],
+                tanggal=start_date + timedelta(days=i // (n_courts * 16)),
+                start_main=dtime(6 + (i // n_courts) % 16),
+                end_main=dtime(7 + (i // n_courts) % 16),
+                is_available=False,
+            ))
+        Jadwal.objects.bulk_create(jadwals, batch_size=1000)
+
+        bookings = Booking.objects.bulk_create([
+            Booking(lapangan_id=jadwals[i].lapangan, user_id=player) for i in range(n_bookings)
+        ], batch_size=1000)
+        Through = Booking.jadwal.through
+        Through.objects.bulk_create([
+            Through(booking_id=b.id, jadwallapangan_id=j.id) for b, j in zip(bookings, jadwals)
+        ], batch_size=1000)
+        return admin
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from booking.services import expire_overdue_bookings, release_expired_holds
+
+
+class Command(BaseCommand):
+    help = (
+        "Lepas hold booking pending yang sudah habis dan ubah booking pending yang "
+        "semua jadwalnya sudah lewat jadi 'failed'. "
+        "Jalankan berkala (cron / scheduler), misal tiap 5 menit."
+    )
+
+    def handle(self, *args, **options):
+        released = release_expired_holds()
+        expired = expire_overdue_bookings()
+        self.stdout.write(self.style.SUCCESS(f"{released} hold dilepas, {expired} booking lewat ditandai failed"))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_lapangan', '0008_hot_query_indexes'),
+        ('authentication_user', '0002_alter_userprofile_role'),
+        ('booking', '0002_booking_hold_expires_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['user_id', 'created_at', 'id'], name='booking_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['lapangan_id', 'created_at', 'id'], name='booking_lapangan_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('status_book', 'pending')), fields=['hold_expires_at'], name='booking_pending_hold_idx'),
+        ),
+    ]
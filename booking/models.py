@@ -11,6 +11,19 @@ from admin_lapangan.models import JadwalLapangan as Jadwal
 
 import uuid
 
+
+def jadwal_sudah_lewat(waktu_jadwal, now=None):
+    """
+    waktu_jadwal: list of (tanggal, end_main).
+    True kalau semua jadwal sudah selesai (booking tanpa jadwal juga dianggap lewat).
+    """
+    now = now or timezone.now()
+    for tanggal, end_main in waktu_jadwal:
+        waktu_selesai = timezone.make_aware(datetime.combine(tanggal, end_main))
+        if waktu_selesai > now:
+            return False  # masih ada jadwal yang belum lewat
+    return True
+
 # Create your models here.
 # asumsi setiap booking hanya untuk 1 lapangan dan bisa lebih dari 1 jadwal
 class Booking(models.Model):
@@ -20,6 +33,9 @@ class Booking(models.Model):
     jadwal = models.ManyToManyField(Jadwal)
     user_id = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
     status_book = models.CharField(max_length=20, choices=[('pending', 'Pending'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending')
+    # batas waktu pembayaran booking pending; lewat dari ini jadwalnya dilepas lagi.
+    # null = booking lama / sudah dikonfirmasi (tidak ada hold)
+    hold_expires_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -34,18 +50,35 @@ class Booking(models.Model):
     #j1.save()
     
     
-    def is_expired(self):
-        now = timezone.now()
-        for j in self.jadwal.all():
-            waktu_selesai = datetime.combine(j.tanggal, j.end_main)
-            #maksud make aware di sini yaitu 
-            waktu_selesai = timezone.make_aware(waktu_selesai)
-            if waktu_selesai > now:
-                return False  # masih ada jadwal yang belum lewat
-        if(self.status_book == 'pending'):
-            self.status_book = 'failed'
-            self.save()
-        return True  # semua jadwal sudah lewat
+    def is_expired(self, now=None):
+        # read-only: status 'failed' di-set massal oleh command expire_bookings,
+        # bukan dari endpoint GET
+        return jadwal_sudah_lewat(
+            [(j.tanggal, j.end_main) for j in self.jadwal.all()], now
+        )
+
+    def hold_expired(self, now=None):
+        return self.hold_expires_at is not None and self.hold_expires_at <= (now or timezone.now())
+
+    def display_status(self, now=None):
+        # booking pending yang hold-nya habis / semua jadwalnya sudah lewat ditampilkan
+        # sebagai failed walaupun sweeper belum sempat jalan
+        if self.status_book == 'pending' and (self.hold_expired(now) or self.is_expired(now)):
+            return 'failed'
+        return self.status_book
+
+    class Meta:
+        indexes = [
+            # riwayat booking per user / per lapangan (show_json), urut terbaru + id untuk keyset cursor
+            models.Index(fields=['user_id', 'created_at', 'id'], name='booking_user_created_idx'),
+            models.Index(fields=['lapangan_id', 'created_at', 'id'], name='booking_lapangan_created_idx'),
+            # sweeper hanya peduli booking pending, yang jumlahnya kecil dibanding semua booking
+            models.Index(
+                fields=['hold_expires_at'],
+                condition=models.Q(status_book='pending'),
+                name='booking_pending_hold_idx',
+            ),
+        ]
 
     def __str__(self):
         for j in self.jadwal.all():
@@ -0,0 +1,166 @@
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import Booking
+from admin_lapangan.models import JadwalLapangan as Jadwal
+from admin_lapangan.availability import invalidate_grid, invalidate_grid_for_jadwal
+from admin_lapangan.stats import invalidate_all_dashboard_stats
+
+
+def hold_duration():
+    # lama jadwal ditahan untuk booking pending sebelum dilepas lagi
+    return timedelta(minutes=getattr(settings, 'BOOKING_HOLD_MINUTES', 15))
+
+
+class SlotUnavailable(Exception):
+    """Dilempar kalau ada jadwal yang diminta sudah dibooking orang lain / tidak valid."""
+
+
+def reserve_slots(user_profile, lapangan, jadwal_ids):
+    """
+    Klaim semua jadwal yang diminta secara atomik lalu buat Booking pending.
+
+    Klaimnya pakai satu conditional UPDATE (is_available=True -> False).
+    Kalau jumlah baris yang berhasil diklaim != jumlah jadwal yang diminta,
+    berarti ada yang keduluan user lain -> seluruh transaksi di-rollback.
+
+    Jadwalnya cuma ditahan (hold) selama hold_duration(); hold yang sudah habis
+    di jadwal yang diminta dilepas dulu di transaksi yang sama, jadi tidak perlu
+    nunggu sweeper.
+    """
+    try:
+        jadwal_ids = {uuid.UUID(str(jid)) for jid in jadwal_ids if jid}
+    except ValueError:
+        raise SlotUnavailable()
+    if not jadwal_ids:
+        raise SlotUnavailable()
+
+    now = timezone.now()
+    with transaction.atomic():
+        release_expired_holds(now, jadwal_ids=jadwal_ids)
+
+        claimed = Jadwal.objects.filter(
+            id__in=jadwal_ids,
+            lapangan=lapangan,
+            is_available=True,
+        ).update(is_available=False)
+
+        if claimed != len(jadwal_ids):
+            # batalkan klaim parsial, jadwal yang sempat diklaim balik lagi
+            raise SlotUnavailable()
+
+        booking = Booking.objects.create(
+            lapangan_id=lapangan,
+            user_id=user_profile,
+            status_book='pending',
+            hold_expires_at=now + hold_duration(),
+        )
+        booking.jadwal.set(jadwal_ids)
+        invalidate_grid(lapangan.id, Jadwal.objects.filter(id__in=jadwal_ids).values_list('tanggal', flat=True))
+
+    return booking
+
+
+def _jadwal_belum_lewat(now):
+    """Jadwal booking OuterRef('pk') yang selesainya masih setelah now (waktu lokal)."""
+    return Jadwal.objects.filter(
+        booking=OuterRef('pk'),
+    ).filter(
+        Q(tanggal__gt=now.date()) | Q(tanggal=now.date(), end_main__gt=now.time())
+    )
+
+
+def expire_overdue_bookings(now=None):
+    """
+    Ubah semua booking pending yang seluruh jadwalnya sudah lewat jadi 'failed'.
+
+    Satu UPDATE set-based: booking dianggap lewat kalau max(tanggal + end_main)
+    dari jadwalnya <= now, alias tidak ada satu pun jadwal yang selesai setelah now.
+    Return jumlah booking yang diubah.
+    """
+    now = timezone.localtime(now or timezone.now())
+    expired = Booking.objects.filter(
+        status_book='pending',
+    ).exclude(
+        Exists(_jadwal_belum_lewat(now))
+    ).update(status_book='failed', updated_at=now)
+    if expired:
+        # bisa kena banyak admin sekaligus, semua stats dashboard dianggap basi
+        invalidate_all_dashboard_stats()
+    return expired
+
+
+def confirm_booking(booking, now=None):
+    """
+    Ubah hold jadi booking completed. Conditional UPDATE supaya tidak balapan
+    dengan sweeper: hanya berhasil kalau masih pending, hold-nya belum habis, dan
+    masih ada jadwal yang belum lewat (booking lama tanpa hold yang sudah lewat
+    semua tetap gagal, sama seperti expire_overdue_bookings).
+    """
+    now = timezone.localtime(now or timezone.now())
+    confirmed = Booking.objects.filter(
+        Exists(_jadwal_belum_lewat(now)),
+        id=booking.id,
+        status_book='pending',
+    ).filter(
+        Q(hold_expires_at__isnull=True) | Q(hold_expires_at__gt=now)
+    ).update(status_book='completed', hold_expires_at=None, updated_at=now)
+    if confirmed:
+        booking.status_book = 'completed'
+        booking.hold_expires_at = None
+        # grid masih nyimpan waktu hold-nya, dibuang supaya slot tidak "terbuka" lagi
+        invalidate_grid_for_jadwal(booking.jadwal.values_list('id', flat=True))
+    return bool(confirmed)
+
+
+def release_expired_holds(now=None, jadwal_ids=None):
+    """
+    Lepas semua hold yang sudah habis: booking pending-nya jadi 'failed' dan jadwal
+    yang belum lewat dibuka lagi, semuanya pakai UPDATE massal.
+    jadwal_ids (opsional) membatasi ke hold yang memegang jadwal tersebut.
+    Return jumlah booking yang dilepas.
+
+    Hold yang sama bisa dilepas reserve_slots lain di antara baca id dan UPDATE, lalu
+    slotnya langsung diklaim booking baru. Karena itu jadwal hanya dibuka kalau tidak
+    ada booking pending/completed yang memegangnya (dicek di UPDATE-nya sendiri), dan
+    tidak disentuh sama sekali kalau tidak ada booking yang berhasil kita lepas.
+    """
+    now = now or timezone.now()
+    expired = Booking.objects.filter(status_book='pending', hold_expires_at__lte=now)
+    if jadwal_ids is not None:
+        expired = expired.filter(jadwal__in=jadwal_ids)
+
+    with transaction.atomic():
+        booking_ids = list(expired.values_list('id', flat=True).distinct())
+        if not booking_ids:
+            return 0
+
+        released = Booking.objects.filter(
+            id__in=booking_ids, status_book='pending'
+        ).update(status_book='failed', updated_at=now)
+        if not released:
+            return 0
+
+        masih_dipegang = Booking.objects.filter(jadwal=OuterRef('pk'), status_book__in=('pending', 'completed'))
+        reopened = list(
+            Jadwal.objects.filter(
+                booking__in=booking_ids,
+                is_available=False,
+                tanggal__gte=timezone.localdate(now),
+            ).values_list('id', 'lapangan_id', 'tanggal').distinct()
+        )
+        Jadwal.objects.filter(
+            id__in=[row[0] for row in reopened], is_available=False
+        ).exclude(Exists(masih_dipegang)).update(is_available=True)
+
+    per_lapangan = {}
+    for _, lapangan_id, tanggal in reopened:
+        per_lapangan.setdefault(lapangan_id, set()).add(tanggal)
+    for lapangan_id, dates in per_lapangan.items():
+        invalidate_grid(lapangan_id, dates)
+    return released
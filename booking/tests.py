@@ -1,6 +1,14 @@
 # booking/tests.py
 
+import base64
 import json
+import re
+from io import StringIO
+from unittest.mock import patch
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import QuerySet
+from django.core.management import call_command
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth.models import User
@@ -10,7 +18,12 @@ from datetime import timedelta, date, time
 # --- ADJUST THESE IMPORTS based on your project structure ---
 from authentication_user.models import UserProfile
 from admin_lapangan.models import Lapangan, JadwalLapangan as Jadwal
+from admin_lapangan.availability import available_slots, grid_queryset
 from .models import Booking
+from .services import (
+    reserve_slots, confirm_booking, expire_overdue_bookings, release_expired_holds, SlotUnavailable
+)
+from .views import booking_list_queryset
 # ---------------------------------------------------------
 
 class BookingViewsTest(TestCase):
@@ -83,6 +96,8 @@ class BookingViewsTest(TestCase):
         Set up objects that might be modified by tests. Runs before EACH test.
         """
         self.client = Client()
+        # setUp di bawah pakai QuerySet.update() langsung (tanpa invalidasi), jadi grid cache dikosongkan
+        cache.clear()
 
         # --- Bookings (Create fresh for each test to avoid side-effects) ---
         # Booking pending by player2 on Lapangan A
@@ -132,18 +147,19 @@ class BookingViewsTest(TestCase):
         self.assertTemplateUsed(response, 'create_book.html')
         self.assertEqual(response.context['lapangan'], self.lapangan_a)
 
-        jadwals_in_context = response.context['jadwals']
+        # context berisi slot dari cache grid (dict), bandingkan lewat id
+        jadwals_in_context = [j['id'] for j in response.context['jadwals']]
         # Should contain ONLY jadwal_a_plus2_3pm (today's are booked or unavailable, others out of date range)
         # Note: We reset availability of jadwal_a_plus2_3pm in setUp
-        self.assertEqual(jadwals_in_context.count(), 1)
-        self.assertIn(self.jadwal_a_plus2_3pm, jadwals_in_context)
+        self.assertEqual(len(jadwals_in_context), 1)
+        self.assertIn(self.jadwal_a_plus2_3pm.id, jadwals_in_context)
 
         # Ensure others are NOT present
-        self.assertNotIn(self.jadwal_a_today_10am, jadwals_in_context) # Booked in setUp
-        self.assertNotIn(self.jadwal_a_today_11am, jadwals_in_context) # Booked in setUp
-        self.assertNotIn(self.jadwal_a_past, jadwals_in_context) # Wrong date
-        self.assertNotIn(self.jadwal_a_future_far, jadwals_in_context) # Wrong date
-        self.assertNotIn(self.jadwal_a_not_available, jadwals_in_context) # is_available=False
+        self.assertNotIn(self.jadwal_a_today_10am.id, jadwals_in_context) # Booked in setUp
+        self.assertNotIn(self.jadwal_a_today_11am.id, jadwals_in_context) # Booked in setUp
+        self.assertNotIn(self.jadwal_a_past.id, jadwals_in_context) # Wrong date
+        self.assertNotIn(self.jadwal_a_future_far.id, jadwals_in_context) # Wrong date
+        self.assertNotIn(self.jadwal_a_not_available.id, jadwals_in_context) # is_available=False
 
     def test_show_create_booking_404_invalid_lapangan(self):
         """Test view returns 404 for invalid lapangan UUID."""
@@ -310,6 +326,8 @@ class BookingViewsTest(TestCase):
     # -----------------------------------------------
     def test_complete_booking_success(self):
         """Test owner can complete their pending booking."""
+        # jadwal hari ini jam 10 bisa sudah lewat; booking yang semua jadwalnya lewat tidak bisa dikonfirmasi
+        self.booking_p2_lapA_pending.jadwal.add(self.jadwal_a_plus2_3pm)
         self.client.login(username='player2', password='password123')
         url = reverse('booking:complete_booking', kwargs={'booking_id': self.booking_p2_lapA_pending.id})
         response = self.client.post(url) # POST request
@@ -492,4 +510,606 @@ class BookingViewsTest(TestCase):
         invalid_uuid = '00000000-0000-0000-0000-000000000000'
         url = reverse('booking:delete_booking', kwargs={'booking_id': invalid_uuid})
         response = self.client.post(url)
-        self.assertEqual(response.status_code, 404) # View uses try/except DoesNotExist
\ No newline at end of file
+        self.assertEqual(response.status_code, 404) # View uses try/except DoesNotExist
+
+class ReserveSlotsTest(TestCase):
+    """Test untuk reservasi jadwal atomik (booking.services.reserve_slots)"""
+
+    def setUp(self):
+        self.client = Client()
+        self.user_admin = User.objects.create_user(username='admin_rs', password='password123')
+        self.profile_admin = UserProfile.objects.create(user=self.user_admin, fullname="Admin RS", role='admin')
+        self.user_player = User.objects.create_user(username='player_rs', password='password123')
+        self.profile_player = UserProfile.objects.create(user=self.user_player, fullname="Pemain RS", role='user')
+
+        self.lapangan = Lapangan.objects.create(
+            name="Lapangan RS", price=80000, admin_lapangan=self.profile_admin, location="Loc", description="Desc"
+        )
+        self.other_lapangan = Lapangan.objects.create(
+            name="Lapangan Lain", price=80000, admin_lapangan=self.profile_admin, location="Loc", description="Desc"
+        )
+        tomorrow = timezone.now().date() + timedelta(days=1)
+        self.free_1 = Jadwal.objects.create(lapangan=self.lapangan, tanggal=tomorrow, start_main=time(8, 0), end_main=time(9, 0))
+        self.free_2 = Jadwal.objects.create(lapangan=self.lapangan, tanggal=tomorrow, start_main=time(9, 0), end_main=time(10, 0))
+        self.taken = Jadwal.objects.create(lapangan=self.lapangan, tanggal=tomorrow, start_main=time(10, 0), end_main=time(11, 0), is_available=False)
+        self.foreign = Jadwal.objects.create(lapangan=self.other_lapangan, tanggal=tomorrow, start_main=time(8, 0), end_main=time(9, 0))
+
+    def test_reserve_all_slots(self):
+        booking = reserve_slots(self.profile_player, self.lapangan, [self.free_1.id, self.free_2.id])
+
+        self.assertEqual(booking.status_book, 'pending')
+        self.assertEqual(set(booking.jadwal.values_list('id', flat=True)), {self.free_1.id, self.free_2.id})
+        self.assertFalse(Jadwal.objects.filter(id__in=[self.free_1.id, self.free_2.id], is_available=True).exists())
+
+    def test_partial_claim_rolls_back(self):
+        """Kalau satu jadwal sudah diambil, jadwal lain tidak boleh ikut terkunci"""
+        with self.assertRaises(SlotUnavailable):
+            reserve_slots(self.profile_player, self.lapangan, [self.free_1.id, self.taken.id])
+
+        self.free_1.refresh_from_db()
+        self.assertTrue(self.free_1.is_available)
+        self.assertEqual(Booking.objects.count(), 0)
+
+    def test_slot_from_other_lapangan_rejected(self):
+        with self.assertRaises(SlotUnavailable):
+            reserve_slots(self.profile_player, self.lapangan, [self.free_1.id, self.foreign.id])
+        self.assertEqual(Booking.objects.count(), 0)
+
+    def test_second_reservation_of_same_slot_fails(self):
+        reserve_slots(self.profile_player, self.lapangan, [self.free_1.id])
+        with self.assertRaises(SlotUnavailable):
+            reserve_slots(self.profile_admin, self.lapangan, [self.free_1.id])
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_invalid_ids_rejected(self):
+        with self.assertRaises(SlotUnavailable):
+            reserve_slots(self.profile_player, self.lapangan, ['bukan-uuid'])
+
+    def test_create_booking_flutter_partial_conflict(self):
+        self.client.login(username='player_rs', password='password123')
+        response = self.client.post(
+            reverse('booking:create_booking_flutter'),
+            data=json.dumps({
+                'lapangan_id': str(self.lapangan.id),
+                'jadwal_id': [str(self.free_1.id), str(self.taken.id)],
+            }),
+            content_type='application/json',
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json()['success'])
+        self.free_1.refresh_from_db()
+        self.assertTrue(self.free_1.is_available)
+
+    def test_create_booking_flutter_success(self):
+        self.client.login(username='player_rs', password='password123')
+        response = self.client.post(
+            reverse('booking:create_booking_flutter'),
+            data=json.dumps({
+                'lapangan_id': str(self.lapangan.id),
+                'jadwal_id': [str(self.free_1.id), str(self.free_2.id)],
+            }),
+            content_type='application/json',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        booking = Booking.objects.get(id=response.json()['booking_id'])
+        self.assertEqual(booking.jadwal.count(), 2)
+
+
+class ExpireBookingsTest(TestCase):
+    """Test untuk sweeper booking expired (expire_overdue_bookings / command expire_bookings)"""
+
+    def setUp(self):
+        self.client = Client()
+        self.user_admin = User.objects.create_user(username='admin_ex', password='password123')
+        self.profile_admin = UserProfile.objects.create(user=self.user_admin, fullname="Admin EX", role='admin')
+        self.user_player = User.objects.create_user(username='player_ex', password='password123')
+        self.profile_player = UserProfile.objects.create(user=self.user_player, fullname="Pemain EX", role='user')
+        self.lapangan = Lapangan.objects.create(
+            name="Lapangan EX", price=50000, admin_lapangan=self.profile_admin, location="Loc", description="Desc"
+        )
+
+        today = timezone.now().date()
+        self.past = Jadwal.objects.create(lapangan=self.lapangan, tanggal=today - timedelta(days=2), start_main=time(8, 0), end_main=time(9, 0), is_available=False)
+        self.past_2 = Jadwal.objects.create(lapangan=self.lapangan, tanggal=today - timedelta(days=1), start_main=time(8, 0), end_main=time(9, 0), is_available=False)
+        self.future = Jadwal.objects.create(lapangan=self.lapangan, tanggal=today + timedelta(days=1), start_main=time(8, 0), end_main=time(9, 0), is_available=False)
+
+        self.overdue = self.make_booking('pending', self.past, self.past_2)
+        self.mixed = self.make_booking('pending', self.past, self.future)
+        self.completed = self.make_booking('completed', self.past)
+
+    def make_booking(self, status, *jadwals):
+        booking = Booking.objects.create(user_id=self.profile_player, lapangan_id=self.lapangan, status_book=status)
+        booking.jadwal.add(*jadwals)
+        return booking
+
+    def test_sweeper_only_fails_overdue_pending(self):
+        self.assertEqual(expire_overdue_bookings(), 1)
+
+        self.overdue.refresh_from_db()
+        self.mixed.refresh_from_db()
+        self.completed.refresh_from_db()
+        self.assertEqual(self.overdue.status_book, 'failed')
+        self.assertEqual(self.mixed.status_book, 'pending')  # masih ada jadwal besok
+        self.assertEqual(self.completed.status_book, 'completed')
+
+    def test_sweeper_uses_one_query(self):
+        with self.assertNumQueries(1):
+            expire_overdue_bookings()
+
+    def test_management_command(self):
+        call_command('expire_bookings', stdout=StringIO())
+        self.overdue.refresh_from_db()
+        self.assertEqual(self.overdue.status_book, 'failed')
+
+    def test_show_json_flags_expired_without_writing(self):
+        self.client.login(username='player_ex', password='password123')
+        response = self.client.get(reverse('booking:show_json'))
+
+        data = {b['id']: b for b in response.json()}
+        self.assertTrue(data[str(self.overdue.id)]['is_expired'])
+        self.assertEqual(data[str(self.overdue.id)]['status_book'], 'failed')
+        self.assertFalse(data[str(self.mixed.id)]['is_expired'])
+        self.assertEqual(data[str(self.mixed.id)]['status_book'], 'pending')
+
+        # GET tidak boleh mengubah status di DB
+        self.overdue.refresh_from_db()
+        self.assertEqual(self.overdue.status_book, 'pending')
+
+    def test_overdue_pending_cannot_be_completed(self):
+        # booking lama tanpa hold yang semua jadwalnya sudah lewat
+        self.assertFalse(confirm_booking(self.overdue))
+        self.client.login(username='player_ex', password='password123')
+        response = self.client.post(reverse('booking:complete_booking', kwargs={'booking_id': self.overdue.id}))
+
+        self.assertEqual(response.status_code, 400)
+        self.overdue.refresh_from_db()
+        self.assertEqual(self.overdue.status_book, 'pending')
+
+        self.assertTrue(confirm_booking(self.mixed))
+
+
+class BookingListQueryBudgetTest(TestCase):
+    """show_json harus pakai jumlah query yang tetap, tidak tergantung banyaknya booking"""
+
+    # session + user + profile + booking (join lapangan & user) + prefetch jadwal
+    QUERY_BUDGET = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user_admin = User.objects.create_user(username='admin_qb', password='password123')
+        cls.profile_admin = UserProfile.objects.create(user=cls.user_admin, fullname="Admin QB", role='admin')
+        cls.user_player = User.objects.create_user(username='player_qb', password='password123')
+        cls.profile_player = UserProfile.objects.create(user=cls.user_player, fullname="Pemain QB", role='user')
+        cls.lapangan = Lapangan.objects.create(
+            name="Lapangan QB", price=40000, admin_lapangan=cls.profile_admin, location="Loc", description="Desc"
+        )
+        start = timezone.now().date() + timedelta(days=1)
+        cls.jadwals = Jadwal.objects.bulk_create([
+            Jadwal(lapangan=cls.lapangan, tanggal=start + timedelta(days=i // 16),
+                   start_main=time(6 + i % 16), end_main=time(7 + i % 16), is_available=False)
+            for i in range(2000)
+        ])
+
+    def seed_bookings(self, n):
+        Booking.objects.all().delete()
+        bookings = Booking.objects.bulk_create([
+            Booking(user_id=self.profile_player, lapangan_id=self.lapangan) for _ in range(n)
+        ])
+        Through = Booking.jadwal.through
+        Through.objects.bulk_create([
+            Through(booking_id=b.id, jadwallapangan_id=self.jadwals[2 * i + k].id)
+            for i, b in enumerate(bookings) for k in range(2)
+        ])
+
+    def test_query_budget_constant(self):
+        for username in ('admin_qb', 'player_qb'):
+            self.client.login(username=username, password='password123')
+            for n in (1, 100, 1000):
+                with self.subTest(user=username, bookings=n):
+                    self.seed_bookings(n)
+                    with self.assertNumQueries(self.QUERY_BUDGET):
+                        response = self.client.get(reverse('booking:show_json'))
+                    data = response.json()
+                    self.assertEqual(len(data), n)
+                    self.assertEqual(len(data[0]['jadwal']), 2)
+                    self.assertEqual(float(data[0]['total_price']), 80000)
+
+
+class BookingCursorPaginationTest(TestCase):
+    """show_json mode keyset (?cursor=&limit=)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user_player = User.objects.create_user(username='player_cp', password='password123')
+        cls.profile_player = UserProfile.objects.create(user=cls.user_player, fullname="Pemain CP", role='user')
+        cls.user_admin = User.objects.create_user(username='admin_cp', password='password123')
+        cls.profile_admin = UserProfile.objects.create(user=cls.user_admin, fullname="Admin CP", role='admin')
+        cls.lapangan = Lapangan.objects.create(
+            name="Lapangan CP", price=40000, admin_lapangan=cls.profile_admin, location="Loc", description="Desc"
+        )
+        cls.bookings = [
+            Booking.objects.create(user_id=cls.profile_player, lapangan_id=cls.lapangan) for _ in range(7)
+        ]
+        # dua booking dengan created_at sama, urutannya harus tetap stabil lewat id
+        same_time = timezone.now() - timedelta(hours=1)
+        Booking.objects.filter(id__in=[cls.bookings[2].id, cls.bookings[3].id]).update(created_at=same_time)
+
+    def setUp(self):
+        self.client.login(username='player_cp', password='password123')
+
+    def test_walk_all_pages(self):
+        seen = []
+        cursor = None
+        while True:
+            params = {'limit': 3}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(reverse('booking:show_json'), params).json()
+            self.assertLessEqual(len(data['results']), 3)
+            seen.extend(b['id'] for b in data['results'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+
+        expected = [
+            str(pk) for pk in Booking.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        ]
+        self.assertEqual(seen, expected)
+
+    def test_legacy_mode_returns_array(self):
+        data = self.client.get(reverse('booking:show_json')).json()
+        self.assertIsInstance(data, list)
+        self.assertEqual(len(data), 7)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('booking:show_json'), {'cursor': 'ngasal'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_wrongly_typed_cursor(self):
+        # list dengan panjang benar tapi isinya bukan string
+        for payload in (b'[1, null]', b'[["2025-01-01"], {}]'):
+            cursor = base64.urlsafe_b64encode(payload).decode().rstrip('=')
+            response = self.client.get(reverse('booking:show_json'), {'cursor': cursor})
+            self.assertEqual(response.status_code, 400)
+
+    def test_limit_is_clamped(self):
+        data = self.client.get(reverse('booking:show_json'), {'limit': 'abc'}).json()
+        self.assertEqual(len(data['results']), 7)
+        self.assertIsNone(data['next_cursor'])
+
+
+class AvailabilityGridCacheTest(TestCase):
+    """Cache grid ketersediaan per (lapangan, tanggal) untuk get_booking_data_flutter / show_create_booking"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user_admin = User.objects.create_user(username='admin_gc', password='password123')
+        self.profile_admin = UserProfile.objects.create(user=self.user_admin, fullname="Admin GC", role='admin')
+        self.user_player = User.objects.create_user(username='player_gc', password='password123')
+        self.profile_player = UserProfile.objects.create(user=self.user_player, fullname="Pemain GC", role='user')
+        self.lapangan = Lapangan.objects.create(
+            name="Lapangan GC", price=60000, admin_lapangan=self.profile_admin, location="Loc", description="Desc"
+        )
+        self.tomorrow = timezone.now().date() + timedelta(days=1)
+        self.slot_8 = Jadwal.objects.create(lapangan=self.lapangan, tanggal=self.tomorrow, start_main=time(8, 0), end_main=time(9, 0))
+        self.slot_9 = Jadwal.objects.create(lapangan=self.lapangan, tanggal=self.tomorrow, start_main=time(9, 0), end_main=time(10, 30))
+        self.url = reverse('booking:get_booking_data_flutter', kwargs={'lapangan_id': self.lapangan.id})
+        self.client.login(username='player_gc', password='password123')
+
+    def slot_ids(self):
+        return [j['id'] for j in self.client.get(self.url).json()['jadwal_list']]
+
+    def test_response_shape(self):
+        jadwal_list = self.client.get(self.url).json()['jadwal_list']
+        self.assertEqual(jadwal_list[1], {
+            'id': str(self.slot_9.id),
+            'tanggal': self.tomorrow.strftime('%Y-%m-%d'),
+            'start_main': '09:00',
+            'end_main': '10:30',
+            'is_available': True,
+        })
+
+    def test_second_read_served_from_cache(self):
+        today = timezone.now().date()
+        available_slots(self.lapangan.id, today, today + timedelta(days=2))
+        with self.assertNumQueries(0):
+            slots = available_slots(self.lapangan.id, today, today + timedelta(days=2))
+        self.assertEqual([s['id'] for s in slots], [self.slot_8.id, self.slot_9.id])
+
+    def test_booking_invalidates_grid(self):
+        self.assertEqual(len(self.slot_ids()), 2)
+        reserve_slots(self.profile_player, self.lapangan, [self.slot_8.id])
+        self.assertEqual(self.slot_ids(), [str(self.slot_9.id)])
+
+    def test_delete_booking_invalidates_grid(self):
+        booking = reserve_slots(self.profile_player, self.lapangan, [self.slot_8.id])
+        self.assertEqual(len(self.slot_ids()), 1)
+        self.client.post(reverse('booking:delete_booking', kwargs={'booking_id': booking.id}))
+        self.assertEqual(len(self.slot_ids()), 2)
+
+    def test_admin_edit_invalidates_old_and_new_day(self):
+        self.assertEqual(len(self.slot_ids()), 2)
+        self.slot_9.tanggal = self.tomorrow + timedelta(days=1)
+        self.slot_9.save()
+        self.assertEqual(len(self.slot_ids()), 2)
+
+        self.slot_9.is_available = False
+        self.slot_9.save()
+        self.assertEqual(self.slot_ids(), [str(self.slot_8.id)])
+
+        self.slot_8.delete()
+        self.assertEqual(self.slot_ids(), [])
+
+
+class SlotHoldTest(TestCase):
+    """Hold (lease) jadwal untuk booking pending"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user_admin = User.objects.create_user(username='admin_hd', password='password123')
+        self.profile_admin = UserProfile.objects.create(user=self.user_admin, fullname="Admin HD", role='admin')
+        self.user_player = User.objects.create_user(username='player_hd', password='password123')
+        self.profile_player = UserProfile.objects.create(user=self.user_player, fullname="Pemain HD", role='user')
+        self.user_other = User.objects.create_user(username='other_hd', password='password123')
+        self.profile_other = UserProfile.objects.create(user=self.user_other, fullname="Pemain Lain", role='user')
+        self.lapangan = Lapangan.objects.create(
+            name="Lapangan HD", price=60000, admin_lapangan=self.profile_admin, location="Loc", description="Desc"
+        )
+        self.today = timezone.now().date()
+        self.tomorrow = self.today + timedelta(days=1)
+        self.slot = Jadwal.objects.create(lapangan=self.lapangan, tanggal=self.tomorrow, start_main=time(8, 0), end_main=time(9, 0))
+
+    def expire_hold(self, booking):
+        Booking.objects.filter(id=booking.id).update(hold_expires_at=timezone.now() - timedelta(minutes=1))
+
+    def test_reserve_sets_hold(self):
+        booking = reserve_slots(self.profile_player, self.lapangan, [self.slot.id])
+        self.assertIsNotNone(booking.hold_expires_at)
+        self.assertGreater(booking.hold_expires_at, timezone.now())
+
+    def test_expired_hold_is_available_before_sweeper(self):
+        booking = reserve_slots(self.profile_player, self.lapangan, [self.slot.id])
+        self.assertEqual(available_slots(self.lapangan.id, self.today, self.tomorrow), [])
+
+        # grid yang sudah di-cache tetap harus nganggap hold habis sebagai slot kosong
+        later = timezone.now() + timedelta(hours=1)
+        slots = available_slots(self.lapangan.id, self.today, self.tomorrow, now=later)
+        self.assertEqual([s['id'] for s in slots], [self.slot.id])
+
+        # dan booking baru bisa langsung klaim slot itu
+        self.expire_hold(booking)
+        second = reserve_slots(self.profile_other, self.lapangan, [self.slot.id])
+        booking.refresh_from_db()
+        self.assertEqual(booking.status_book, 'failed')
+        self.assertEqual(second.status_book, 'pending')
+
+    def test_complete_converts_hold(self):
+        booking = reserve_slots(self.profile_player, self.lapangan, [self.slot.id])
+        self.client.login(username='player_hd', password='password123')
+        response = self.client.post(reverse('booking:complete_booking', kwargs={'booking_id': booking.id}))
+
+        self.assertEqual(response.status_code, 200)
+        booking.refresh_from_db()
+        self.assertEqual(booking.status_book, 'completed')
+        self.assertIsNone(booking.hold_expires_at)
+        later = timezone.now() + timedelta(hours=1)
+        self.assertEqual(available_slots(self.lapangan.id, self.today, self.tomorrow, now=later), [])
+
+    def test_complete_after_hold_expired_fails(self):
+        booking = reserve_slots(self.profile_player, self.lapangan, [self.slot.id])
+        self.expire_hold(booking)
+        self.client.login(username='player_hd', password='password123')
+        response = self.client.post(reverse('booking:complete_booking', kwargs={'booking_id': booking.id}))
+
+        self.assertEqual(response.status_code, 400)
+        booking.refresh_from_db()
+        self.slot.refresh_from_db()
+        self.assertEqual(booking.status_book, 'failed')
+        self.assertTrue(self.slot.is_available)
+
+    def test_sweeper_releases_in_bulk(self):
+        slot_2 = Jadwal.objects.create(lapangan=self.lapangan, tanggal=self.tomorrow, start_main=time(9, 0), end_main=time(10, 0))
+        expired_1 = reserve_slots(self.profile_player, self.lapangan, [self.slot.id])
+        expired_2 = reserve_slots(self.profile_other, self.lapangan, [slot_2.id])
+        self.expire_hold(expired_1)
+        self.expire_hold(expired_2)
+
+        call_command('expire_bookings', stdout=StringIO())
+
+        self.assertEqual(Booking.objects.filter(status_book='failed').count(), 2)
+        self.assertEqual(Jadwal.objects.filter(lapangan=self.lapangan, is_available=True).count(), 2)
+        slots = available_slots(self.lapangan.id, self.today, self.tomorrow)
+        self.assertEqual(len(slots), 2)
+
+    def test_sweeper_keeps_slot_claimed_meanwhile(self):
+        booking = reserve_slots(self.profile_player, self.lapangan, [self.slot.id])
+        self.expire_hold(booking)
+        real_update = QuerySet.update
+        state = {}
+
+        def update(queryset, **kwargs):
+            if queryset.model is Booking and not state:
+                # reservasi lain melepas hold yang sama dan mengklaim slotnya duluan
+                state['busy'] = True
+                state['second'] = reserve_slots(self.profile_other, self.lapangan, [self.slot.id])
+            return real_update(queryset, **kwargs)
+
+        with patch.object(QuerySet, 'update', autospec=True, side_effect=update):
+            self.assertEqual(release_expired_holds(), 0)
+
+        self.slot.refresh_from_db()
+        self.assertFalse(self.slot.is_available)
+        state['second'].refresh_from_db()
+        self.assertEqual(state['second'].status_book, 'pending')
+
+    def test_show_json_reports_expired_hold_as_failed(self):
+        booking = reserve_slots(self.profile_player, self.lapangan, [self.slot.id])
+        self.expire_hold(booking)
+        self.client.login(username='player_hd', password='password123')
+        data = self.client.get(reverse('booking:show_json')).json()
+        self.assertEqual(data[0]['status_book'], 'failed')
+
+
+class IdempotencyKeyTest(TestCase):
+    """Retry create_booking_flutter dengan Idempotency-Key yang sama tidak bikin booking dobel"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user_admin = User.objects.create_user(username='admin_ik', password='password123')
+        self.profile_admin = UserProfile.objects.create(user=self.user_admin, fullname="Admin IK", role='admin')
+        self.user_player = User.objects.create_user(username='player_ik', password='password123')
+        self.profile_player = UserProfile.objects.create(user=self.user_player, fullname="Pemain IK", role='user')
+        self.lapangan = Lapangan.objects.create(
+            name="Lapangan IK", price=50000, admin_lapangan=self.profile_admin, location="Loc", description="Desc"
+        )
+        tomorrow = timezone.now().date() + timedelta(days=1)
+        self.slot_1 = Jadwal.objects.create(lapangan=self.lapangan, tanggal=tomorrow, start_main=time(8, 0), end_main=time(9, 0))
+        self.slot_2 = Jadwal.objects.create(lapangan=self.lapangan, tanggal=tomorrow, start_main=time(9, 0), end_main=time(10, 0))
+        self.client.login(username='player_ik', password='password123')
+
+    def post_booking(self, jadwal, key=None):
+        headers = {'Idempotency-Key': key} if key else {}
+        return self.client.post(
+            reverse('booking:create_booking_flutter'),
+            data=json.dumps({'lapangan_id': str(self.lapangan.id), 'jadwal_id': [str(j.id) for j in jadwal]}),
+            content_type='application/json',
+            headers=headers,
+        )
+
+    def test_retry_returns_stored_response(self):
+        first = self.post_booking([self.slot_1], key='retry-1')
+        second = self.post_booking([self.slot_1], key='retry-1')
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_retry_does_not_touch_database(self):
+        self.post_booking([self.slot_1], key='retry-2')
+        with self.assertNumQueries(2):  # session + user dari login_required
+            self.post_booking([self.slot_1], key='retry-2')
+
+    def test_same_key_different_body_rejected(self):
+        self.post_booking([self.slot_1], key='retry-3')
+        response = self.post_booking([self.slot_2], key='retry-3')
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_without_key_runs_normally(self):
+        self.post_booking([self.slot_1])
+        response = self.post_booking([self.slot_1])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_key_is_scoped_per_user(self):
+        self.post_booking([self.slot_1], key='shared')
+        self.client.login(username='admin_ik', password='password123')
+        response = self.post_booking([self.slot_2], key='shared')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Booking.objects.count(), 2)
+
+
+class HotQueryPlanTest(TestCase):
+    """
+    EXPLAIN query-query yang sering dipanggil terhadap data seed dan gagal kalau ada
+    yang jatuh ke scan penuh (SQLite: 'SCAN <tabel>' termasuk scan penuh lewat index,
+    Postgres: 'Seq Scan').
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        admin_user = User.objects.create_user(username='admin_qp', password='password123')
+        cls.profile_admin = UserProfile.objects.create(user=admin_user, fullname="Admin QP", role='admin')
+        player_user = User.objects.create_user(username='player_qp', password='password123')
+        cls.profile_player = UserProfile.objects.create(user=player_user, fullname="Pemain QP", role='user')
+        other_users = [User.objects.create_user(username=f'lain_qp_{i}') for i in range(5)]
+        cls.profiles = [cls.profile_player] + [
+            UserProfile.objects.create(user=u, fullname=u.username, role='user') for u in other_users
+        ]
+        admins = [cls.profile_admin] + [
+            UserProfile.objects.create(
+                user=User.objects.create_user(username=f'admin_lain_qp_{i}'), fullname="Admin Lain", role='admin'
+            )
+            for i in range(19)
+        ]
+
+        # 20 admin x 3 lapangan
+        cls.lapangans = Lapangan.objects.bulk_create([
+            Lapangan(
+                name=f"Lapangan QP {i}", price=50000, location="Loc", description="Desc",
+                admin_lapangan=admins[i % 20],
+            )
+            for i in range(60)
+        ])
+        today = timezone.now().date()
+        jadwals = Jadwal.objects.bulk_create([
+            Jadwal(
+                lapangan=lapangan, tanggal=today + timedelta(days=day), start_main=time(hour, 0),
+                end_main=time(hour + 1, 0), is_available=(hour % 3 != 0),
+            )
+            for lapangan in cls.lapangans for day in range(10) for hour in range(8, 20)
+        ])
+        now = timezone.now()
+        bookings = Booking.objects.bulk_create([
+            Booking(
+                lapangan_id=cls.lapangans[i % 60], user_id=cls.profiles[i % 6],
+                status_book='pending' if i % 10 == 0 else 'completed',
+                hold_expires_at=now + timedelta(minutes=i % 30 - 15) if i % 10 == 0 else None,
+            )
+            for i in range(2000)
+        ])
+        Booking.jadwal.through.objects.bulk_create([
+            Booking.jadwal.through(booking_id=booking.id, jadwallapangan_id=jadwals[i].id)
+            for i, booking in enumerate(bookings)
+        ])
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def assertNoFullScan(self, queryset):
+        if connection.vendor == 'postgresql':
+            # tabel test kecil, jadi Postgres akan selalu pilih Seq Scan kalau boleh.
+            # dimatikan dulu: kalau masih Seq Scan berarti memang tidak ada index yang bisa dipakai
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = queryset.explain()
+        for line in plan.splitlines():
+            self.assertFalse(
+                'Seq Scan' in line or re.search(r'\bSCAN (?!CONSTANT ROW)', line),
+                f"Full scan di query plan:\n{plan}"
+            )
+        return plan
+
+    def test_player_booking_list(self):
+        queryset = booking_list_queryset().filter(user_id=self.profile_player.id).order_by('-created_at', '-id')
+        self.assertNoFullScan(queryset[:21])
+
+    def test_admin_booking_list(self):
+        queryset = booking_list_queryset().filter(
+            lapangan_id__admin_lapangan=self.profile_admin
+        ).order_by('-created_at', '-id')
+        self.assertNoFullScan(queryset[:21])
+
+    def test_availability_grid_for_lapangan(self):
+        # query yang benar-benar dipakai halaman booking (lewat grid ketersediaan)
+        today = timezone.localdate()
+        dates = [today + timedelta(days=i) for i in range(3)]
+        self.assertNoFullScan(grid_queryset(self.lapangans[0].id, dates))
+
+    def test_expired_holds_sweep(self):
+        queryset = Booking.objects.filter(status_book='pending', hold_expires_at__lte=timezone.now())
+        self.assertNoFullScan(queryset)
+
+    def test_admin_lapangan_list(self):
+        queryset = Lapangan.objects.filter(admin_lapangan=self.profile_admin).order_by('-created_at')
+        self.assertNoFullScan(queryset)
@@ -2,16 +2,23 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.urls import reverse
-from .models import Booking
+from .models import Booking, jadwal_sudah_lewat
+from .services import reserve_slots, confirm_booking, release_expired_holds, SlotUnavailable
 from django.utils import timezone  
 from datetime import timedelta
 from admin_lapangan.models import JadwalLapangan, Lapangan
 from admin_lapangan.models import JadwalLapangan as Jadwal
+from admin_lapangan.availability import available_slots, invalidate_grid_for_jadwal
+from admin_lapangan.stats import invalidate_dashboard_stats
 from django.http import JsonResponse
+from django.db.models import Prefetch, Q
+from netly.pagination import encode_cursor, decode_cursor, parse_limit
+from netly.idempotency import idempotent
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 from datetime import datetime
+import uuid
 
 def test(request):
     
@@ -25,14 +32,11 @@ def show_create_booking(request, lapangan_id):
     # -----------------------------
 
     
-    jadwals = Jadwal.objects.filter(
-        lapangan_id=lapangan_id, 
-        is_available=True,
-        tanggal__gte=today,       # Filter 1: Tanggal >= hari ini
-        tanggal__lte=limit_date     # Filter 2: Tanggal <= hari ini + 2 hari
-    ).order_by('tanggal', 'start_main')
+    lapangan = get_object_or_404(Lapangan, id=lapangan_id)
+    # jadwal tersedia hari ini s/d +2 hari, diambil dari cache grid per hari
+    jadwals = available_slots(lapangan.id, today, limit_date)
     context = {
-        'lapangan': get_object_or_404(Lapangan, id=lapangan_id),
+        'lapangan': lapangan,
         'jadwals': jadwals
     }
     return render(request, 'create_book.html', context)
@@ -45,22 +49,16 @@ def create_booking(request):
         jadwal_ids = request.POST.getlist('jadwal_id')
 
         lapangan = get_object_or_404(Lapangan, id=lapangan_id)
-        jadwals = Jadwal.objects.filter(id__in=jadwal_ids, is_available=True)
 
-        if not jadwals.exists():
+        # klaim semua jadwal sekaligus (atomik), gagal semua kalau ada yang keduluan
+        try:
+            booking = reserve_slots(request.user.profile, lapangan, jadwal_ids)
+        except SlotUnavailable:
             return JsonResponse({'success': False, 
                                  'message': 'Selected schedules are already booked or invalid.'}, 
                                 status=400,
                                 )
-        
-        #kalo berhasil
-        booking = Booking.objects.create(
-            lapangan_id=lapangan,
-            user_id=request.user.profile,  # Asumsi ada relasi OneToOne antara User dan UserProfile
-            status_book='pending'
-        )
-        booking.jadwal.set(jadwals)
-        jadwals.update(is_available=False)
+
         payment_url = reverse('booking:booking_detail', kwargs={'booking_id': booking.id})
 
         return JsonResponse({
@@ -72,67 +70,105 @@ def create_booking(request):
 
     return JsonResponse({'success': False, 'message': 'Invalid request method.'}, status=405)
 
-def show_json_by_id(request, booking_id):
-    booking = get_object_or_404(Booking, id=booking_id)
-    booking.is_expired()  # cek apakah booking sudah expired
-    jadwal_list = list(booking.jadwal.values('id','tanggal', 'start_main', 'end_main', 'is_available'))
-    data = {
+def booking_list_queryset():
+    """
+    Queryset booking yang siap diserialisasi tanpa N+1:
+    lapangan & user di-join, jadwal di-prefetch (1 query untuk semua booking).
+    Jumlah jadwal buat total_price diambil dari hasil prefetch, bukan annotate Count,
+    supaya query utamanya tidak kena GROUP BY dan tetap bisa pakai index
+    (user_id/lapangan_id, created_at) untuk urutan + LIMIT.
+    """
+    return Booking.objects.select_related('lapangan_id', 'user_id').prefetch_related(
+        Prefetch(
+            'jadwal',
+            queryset=Jadwal.objects.only('id', 'tanggal', 'start_main', 'end_main', 'is_available'),
+        )
+    )
+
+
+def serialize_booking(booking, now=None):
+    """Booking (dari booking_list_queryset) -> dict JSON. Tidak ada query tambahan."""
+    jadwal_list = [
+        {
+            'id': j.id,
+            'tanggal': j.tanggal,
+            'start_main': j.start_main,
+            'end_main': j.end_main,
+            'is_available': j.is_available,
+        }
+        for j in booking.jadwal.all()
+    ]
+    # read-only, status failed-nya di-update oleh command expire_bookings
+    is_expired = jadwal_sudah_lewat([(j['tanggal'], j['end_main']) for j in jadwal_list], now)
+
+    return {
         'id': str(booking.id),
         'lapangan': {
-            'id': booking.lapangan_id.id,
-            'name': booking.lapangan_id.name,
+            'id': str(booking.lapangan_id.id),
+            'name': booking.lapangan_id.name, # Gunakan 'name' agar sesuai dengan JS di list page
             'price': booking.lapangan_id.price,
         },
         'user': {
-            'id': booking.user_id.id,
+            'id': str(booking.user_id.id),
             'fullname': booking.user_id.fullname,
         },
-        'created_at': booking.created_at,
-        'status_book': booking.status_book,
-        'total_price': booking.total_price(),
+        'status_book': booking.display_status(now),
+        'is_expired': is_expired,
+        'hold_expires_at': booking.hold_expires_at,
+        'total_price': booking.lapangan_id.price * len(jadwal_list),
         'jadwal': jadwal_list,
+        'created_at': booking.created_at,
     }
+
+
+def show_json_by_id(request, booking_id):
+    booking = get_object_or_404(booking_list_queryset(), id=booking_id)
     # headers: { 'Accept': 'application/json' },
-    return JsonResponse(data)
+    return JsonResponse(serialize_booking(booking))
 
 
 
 def show_json(request):
-    if request.user.profile.role == 'admin':
-        all_bookings = Booking.objects.filter(lapangan_id__admin_lapangan=request.user.profile).order_by('-created_at')
+    profile = request.user.profile
+    if profile.role == 'admin':
+        all_bookings = booking_list_queryset().filter(lapangan_id__admin_lapangan=profile)
     else:
         # Ambil semua booking milik user yang sedang login
-        all_bookings = Booking.objects.filter(user_id=request.user.profile.id).order_by('-created_at')
-
-    data = []
-    for booking in all_bookings:
-        # Cek dan update status expired sebelum disajikan
-        booking.is_expired() 
-
-        # Ambil jadwal
-        jadwal_list = list(booking.jadwal.values('id','tanggal', 'start_main', 'end_main'))
-
-        # 2. Susun data untuk setiap booking
-        data.append({
-            'id': str(booking.id),
-            'lapangan': {
-                'id': str(booking.lapangan_id.id),
-                'name': booking.lapangan_id.name, # Gunakan 'name' agar sesuai dengan JS di list page
-                'price': booking.lapangan_id.price,
-            },
-            'user': {
-                'id': str(booking.user_id.id),
-                'fullname': booking.user_id.fullname,
-            },
-            
-            'status_book': booking.status_book,
-            'total_price': booking.total_price(),
-            'jadwal': jadwal_list,
-            'created_at': booking.created_at
-        })
+        all_bookings = booking_list_queryset().filter(user_id=profile.id)
+
+    # id ikut di-order supaya urutan stabil kalau created_at-nya sama (dipakai keyset cursor)
+    all_bookings = all_bookings.order_by('-created_at', '-id')
+    now = timezone.now()
+
+    # mode lama: tanpa cursor/limit -> array semua booking
+    if 'cursor' not in request.GET and 'limit' not in request.GET:
+        # jumlah query tetap (booking + prefetch jadwal), berapapun banyaknya booking
+        data = [serialize_booking(booking, now) for booking in all_bookings]
+        return JsonResponse(data, safe=False)
+
+    # mode keyset: ?cursor=<opaque>&limit=<n>, posisi halaman diambil dari (created_at, id)
+    # booking terakhir, jadi kerja DB-nya tetap walaupun history makin panjang
+    limit = parse_limit(request.GET.get('limit'))
+    cursor = request.GET.get('cursor')
+    if cursor:
+        try:
+            created_at, last_id = decode_cursor(cursor, 2)
+            created_at = datetime.fromisoformat(created_at)
+            last_id = uuid.UUID(last_id)
+        except ValueError:
+            return JsonResponse({'status': 'error', 'message': 'Cursor tidak valid'}, status=400)
+        all_bookings = all_bookings.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=last_id)
+        )
 
-    
-    return JsonResponse(data, safe=False)
+    page = list(all_bookings[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    return JsonResponse({
+        'results': [serialize_booking(booking, now) for booking in page],
+        'next_cursor': encode_cursor(page[-1].created_at.isoformat(), page[-1].id) if has_more else None,
+    })
 
 @csrf_exempt
 @login_required(login_url='authentication_user:login')
@@ -146,9 +182,11 @@ def complete_booking(request, booking_id):
 
     # Cek status sebelum update
     if booking.status_book == 'pending':
-        booking.status_book = 'completed'
-        booking.save()
-        return JsonResponse({'message': 'Booking status updated to Completed', 'status': 'Completed'}, status=200)
+        # hold -> booking terkonfirmasi, gagal kalau hold-nya sudah habis / semua jadwalnya lewat
+        if booking.display_status() != 'failed' and confirm_booking(booking):
+            return JsonResponse({'message': 'Booking status updated to Completed', 'status': 'Completed'}, status=200)
+        release_expired_holds(jadwal_ids=booking.jadwal.values_list('id', flat=True))
+        return JsonResponse({'message': 'Booking has expired and cannot be completed'}, status=400)
 
     elif booking.status_book == 'failed' or booking.is_expired():
         return JsonResponse({'message': 'Booking has expired and cannot be completed'}, status=400)
@@ -159,7 +197,6 @@ def complete_booking(request, booking_id):
 # flownya jadi dari create_booking di redirect ke booking_detail
 def booking_detail(request, booking_id):
     booking = get_object_or_404(Booking, id=booking_id)
-    booking.is_expired()
     return render(request, 'booking_detail.html', {
         'booking_id': str(booking.id), # Kirim ID ke template agar JS bisa membacanya
         'lapangan_nama': booking.lapangan_id.name # Kirim data minimal untuk header
@@ -229,10 +266,12 @@ def delete_booking(request, booking_id):
 
         # 6. Hapus booking-nya
         booking.delete()
+        invalidate_dashboard_stats([booking.lapangan_id_id])
         
         # 7. Buka kembali semua jadwal yang belum expired (jika ada)
         if jadwal_ids_to_reopen:
             Jadwal.objects.filter(id__in=jadwal_ids_to_reopen).update(is_available=True)
+            invalidate_grid_for_jadwal(jadwal_ids_to_reopen)
             
         return JsonResponse({
             'success': True, 
@@ -257,23 +296,18 @@ def get_booking_data_flutter(request, lapangan_id):
     except Lapangan.DoesNotExist:
         return JsonResponse({'status': 'error', 'message': 'Lapangan not found'}, status=404)
 
-    # 3. Ambil Jadwal Available
-    jadwals = Jadwal.objects.filter(
-        lapangan_id=lapangan_id, 
-        is_available=True,
-        tanggal__gte=today,
-        tanggal__lte=limit_date
-    ).order_by('tanggal', 'start_main')
+    # 3. Ambil Jadwal Available (dari cache grid per hari, tidak query ulang kalau masih valid)
+    jadwals = available_slots(lapangan.id, today, limit_date)
 
     # 4. Serialize Data Jadwal
     jadwal_data = []
     for j in jadwals:
         jadwal_data.append({
-            "id": str(j.id),
-            "tanggal": j.tanggal.strftime("%Y-%m-%d"),
-            "start_main": j.start_main.strftime("%H:%M"),
-            "end_main": j.end_main.strftime("%H:%M"),
-            "is_available": j.is_available,
+            "id": str(j['id']),
+            "tanggal": j['tanggal'].isoformat(),
+            "start_main": j['start_main'].strftime("%H:%M"),
+            "end_main": j['end_main'].strftime("%H:%M"),
+            "is_available": j['is_available'],
         })
 
     # 5. Return JSON
@@ -317,6 +351,7 @@ import json
 
 @csrf_exempt
 @login_required(login_url='authentication_user:login')
+@idempotent
 def create_booking_flutter(request):
     if request.method == 'POST':
         
@@ -327,23 +362,15 @@ def create_booking_flutter(request):
         jadwal_ids = data.get('jadwal_id', [])  # <-- ini LIST, BENER!
 
         lapangan = get_object_or_404(Lapangan, id=lapangan_id)
-        jadwals = Jadwal.objects.filter(id__in=jadwal_ids, is_available=True)
 
-        if not jadwals.exists():
+        try:
+            booking = reserve_slots(request.user.profile, lapangan, jadwal_ids)
+        except SlotUnavailable:
             return JsonResponse({
                 'success': False,
                 'message': 'Selected schedules are already booked or invalid.'
             }, status=400)
 
-        booking = Booking.objects.create(
-            lapangan_id=lapangan,
-            user_id=request.user.profile,
-            status_book='pending'
-        )
-
-        booking.jadwal.set(jadwals)
-        jadwals.update(is_available=False)
-
         payment_url = reverse('booking:booking_detail', kwargs={'booking_id': booking.id})
 
         return JsonResponse({
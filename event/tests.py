@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.test import TestCase, TransactionTestCase, Client
 from django.urls import reverse
 from django.contrib.auth.models import User
@@ -333,4 +334,17 @@ class EventViewTest(TransactionTestCase):
         response = self.client.post(url)
         self.assertEqual(response.status_code, 400) # 400 = Bad Request
         self.assertEqual(response.json()['status'], 'fail')
-        self.assertEqual(response.json()['message'], 'Maaf, event sudah penuh.')
\ No newline at end of file
+        self.assertEqual(response.json()['message'], 'Maaf, event sudah penuh.')
+
+    def test_join_event_flutter_retry_with_idempotency_key(self):
+        # retry dengan key yang sama tidak boleh bikin user keluar lagi dari event
+        cache.clear()
+        self.client.login(username='userbiasa', password='123')
+        url = reverse('event:join_event_flutter', args=[self.event1.id])
+
+        first = self.client.post(url, headers={'Idempotency-Key': 'join-1'})
+        retry = self.client.post(url, headers={'Idempotency-Key': 'join-1'})
+
+        self.assertEqual(first.json()['action'], 'join')
+        self.assertEqual(retry.json()['action'], 'join')
+        self.assertTrue(self.event1.participant.filter(id=self.normal_profile.id).exists())
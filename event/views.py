@@ -10,6 +10,7 @@ from django.views.decorators.http import require_POST
 from django.forms.models import model_to_dict
 import json
 from django.views.decorators.csrf import csrf_exempt
+from netly.idempotency import idempotent
 
 def is_admin(user):
     return hasattr(user, 'profile') and user.profile.role == 'admin'
@@ -314,6 +315,7 @@ def edit_event_flutter(request, pk):
 
 @csrf_exempt
 @require_POST
+@idempotent
 def join_event_flutter(request, pk):
     try:
         event = Event.objects.get(pk=pk)
@@ -1,6 +1,28 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_started
+from django.db.models.signals import post_migrate
+
+
+def pasang_ulang_trigger_pencarian(using, **kwargs):
+    from django.db import connections
+    from .search import ensure_sqlite_triggers
+    ensure_sqlite_triggers(connections[using])
+
+
+def bangun_index_trigram(**kwargs):
+    from .live_index import warm_up_live_indexes
+    request_started.disconnect(bangun_index_trigram)
+    warm_up_live_indexes()
 
 
 class HomepageConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'homepage'
+
+    def ready(self):
+        # migrasi SQLite yang membangun ulang tabel lapangan ikut menghapus trigger FTS
+        post_migrate.connect(pasang_ulang_trigger_pencarian, sender=self)
+        from . import signals  # noqa: F401
+        if settings.COURT_TRIGRAM_WARMUP:
+            request_started.connect(bangun_index_trigram)
@@ -0,0 +1,100 @@
+"""
+Halaman katalog lapangan (grid homepage & Flutter) dengan keyset pagination.
+
+Setiap pilihan sort punya index (kolom, id) sendiri di Lapangan, jadi halaman ke-N sama
+murahnya dengan halaman pertama: posisi diambil dari nilai kolom + id baris terakhir,
+bukan OFFSET. Urutan relevansi (ada ?q= tanpa ?sort=) tidak punya kolom untuk keyset,
+jadi cursor-nya berisi offset; hasil fuzzy (typo) paling banyak 50 dan dikirim sekaligus.
+
+Total hanya dihitung di halaman pertama: pasti sampai COUNT_EXACT_MAX, di atas itu
+perkiraan (lihat netly.pagination.count_with_estimate).
+"""
+import uuid
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Q
+
+from netly.pagination import InvalidCursor, count_with_estimate, decode_cursor, encode_cursor, parse_limit
+
+from .search import find_courts, search_courts
+
+PAGE_SIZE = 24
+PAGE_MAX = 100
+COUNT_EXACT_MAX = 1000
+RELEVANCE = 'relevance'
+# sort -> (kolom, turun?)
+SORTS = {
+    'newest': ('created_at', True),
+    'price': ('price', False),
+    '-price': ('price', True),
+    'popular': ('favorite_count', True),
+}
+_PARSE = {'created_at': datetime.fromisoformat, 'price': Decimal, 'favorite_count': int}
+
+
+def _cursor_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def court_page(params, qs, q='', filtered=False):
+    """
+    Satu halaman lapangan dari `qs` (sudah difilter lokasi/harga) menurut ?sort=, ?limit=,
+    ?cursor=. Return dict {courts, next_cursor, total, total_exact, fuzzy, sort}.
+    ValueError untuk sort tidak dikenal, InvalidCursor untuk cursor rusak.
+    """
+    sort = params.get('sort') or (RELEVANCE if q else 'newest')
+    if sort != RELEVANCE and sort not in SORTS:
+        raise ValueError(f'sort tidak dikenal: {sort}')
+    limit = parse_limit(params.get('limit'), PAGE_SIZE, PAGE_MAX)
+    cursor = params.get('cursor')
+
+    base = qs
+    if q:
+        qs = search_courts(qs, q)
+
+    if sort == RELEVANCE:
+        offset = 0
+        if cursor:
+            cursor_sort, offset, _ = decode_cursor(cursor, 3)
+            if cursor_sort != RELEVANCE or not offset.isdigit():
+                raise InvalidCursor('Cursor tidak valid')
+            offset = int(offset)
+        page = list(qs[offset:offset + limit + 1])
+        more = len(page) > limit
+        next_cursor = encode_cursor(RELEVANCE, offset + limit, '') if more else None
+    else:
+        field, descending = SORTS[sort]
+        if cursor:
+            cursor_sort, value, last_id = decode_cursor(cursor, 3)
+            if cursor_sort != sort:
+                raise InvalidCursor('Cursor tidak valid')
+            try:
+                value, last_id = _PARSE[field](value), uuid.UUID(last_id)
+            except (ValueError, InvalidOperation):
+                raise InvalidCursor('Cursor tidak valid')
+            op = 'lt' if descending else 'gt'
+            qs = qs.filter(Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'id__{op}': last_id}))
+        order = [f'-{field}', '-id'] if descending else [field, 'id']
+        page = list(qs.order_by(*order)[:limit + 1])
+        more = len(page) > limit
+        last = page[limit - 1] if more else None
+        next_cursor = encode_cursor(sort, _cursor_value(getattr(last, field)), last.id) if more else None
+    page = page[:limit]
+
+    result = {'courts': page, 'next_cursor': next_cursor, 'total': None, 'total_exact': None,
+              'fuzzy': False, 'sort': sort}
+    if cursor:
+        return result
+
+    if q and not page:
+        # tidak ada yang cocok persis (biasanya typo): kandidat dari index trigram
+        courts, fuzzy = find_courts(base, q)
+        result.update(courts=courts[:limit], next_cursor=None, total=len(courts[:limit]),
+                      total_exact=True, fuzzy=fuzzy)
+        return result
+
+    result['total'], result['total_exact'] = count_with_estimate(
+        qs, COUNT_EXACT_MAX, unfiltered=not (q or filtered)
+    )
+    return result
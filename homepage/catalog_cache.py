@@ -0,0 +1,141 @@
+"""
+Cache response katalog lapangan publik (api_get_all_courts & grid homepage).
+
+Key = hash parameter filter yang sudah dinormalisasi (q, location, min/max price, sort,
+limit, cursor), jadi "?q=Futsal&limit=24" dan "?limit=24&q=futsal " memakai entri yang
+sama. Setiap entri mencatat generasi katalog waktu dibangun. Generasi dinaikkan setiap
+ada tulisan ke Lapangan (signal, setelah commit), jadi semua entri lama otomatis basi
+tanpa perlu tahu key mana yang terpengaruh. Favorit cuma mengubah urutan sort=popular
+(favorite_count tidak ikut di response), jadi punya generasi sendiri yang hanya dicatat
+di entri sort=popular; entri lain tidak ikut dibuang setiap ada yang klik favorit.
+
+Stale-while-revalidate: entri basi (generasinya lama atau umurnya lewat FRESH_FOR) tetap
+langsung dikirim, lalu satu request saja (lock cache.add) membangun ulang di background
+thread. Request hanya menunggu query kalau entrinya belum ada sama sekali atau sudah
+dibuang cache (COURT_CATALOG_CACHE_TTL).
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+
+from netly.pagination import parse_limit
+
+from .catalog import PAGE_MAX, PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+_GENERATION_KEY = 'court_catalog:gen'
+_POPULAR_GENERATION_KEY = 'court_catalog:popular_gen'
+# jaring pengaman untuk tulisan yang tidak lewat signal (update() langsung, incr file cache)
+FRESH_FOR = 60 * 5
+LOCK_TIMEOUT = 30
+
+
+def _ttl():
+    return getattr(settings, 'COURT_CATALOG_CACHE_TTL', 60 * 60)
+
+
+def catalog_filters(params, paged):
+    """
+    Parameter katalog yang dinormalisasi jadi dict (sekaligus bahan key cache). Harga
+    yang bukan angka diabaikan seperti sebelumnya; limit dijepit ke 1..PAGE_MAX.
+    """
+    filters = {
+        'q': (params.get('q') or '').strip().lower(),
+        'location': (params.get('location') or '').strip().lower(),
+        'min_price': None,
+        'max_price': None,
+        'paged': paged,
+    }
+    try:
+        if params.get('min_price') not in (None, ''):
+            filters['min_price'] = int(params['min_price'])
+        if params.get('max_price') not in (None, ''):
+            filters['max_price'] = int(params['max_price'])
+    except ValueError:
+        pass
+    if paged:
+        filters.update(
+            sort=params.get('sort') or '',
+            limit=parse_limit(params.get('limit'), PAGE_SIZE, PAGE_MAX),
+            cursor=params.get('cursor') or '',
+        )
+    return filters
+
+
+def catalog_generation(filters=None):
+    generation = cache.get_or_set(_GENERATION_KEY, 1, None)
+    if filters and filters.get('sort') == 'popular':
+        return generation, cache.get_or_set(_POPULAR_GENERATION_KEY, 1, None)
+    return generation
+
+
+def _key(filters):
+    digest = hashlib.sha256(json.dumps(filters, sort_keys=True).encode()).hexdigest()
+    return f'court_catalog:{digest}'
+
+
+def _store(key, generation, data):
+    cache.set(key, {'generation': generation, 'built_at': time.time(), 'data': data}, _ttl())
+    return data
+
+
+def _refresh(key, filters, build):
+    try:
+        # generasi dibaca sebelum build: tulisan selama build membuat entri ini basi lagi
+        _store(key, catalog_generation(filters), build())
+    except Exception:
+        logger.exception('Refresh cache katalog lapangan gagal')
+    finally:
+        cache.delete(f'{key}:lock')
+
+
+def _refresh_in_thread(key, filters, build):
+    try:
+        _refresh(key, filters, build)
+    finally:
+        # koneksi DB milik thread ini tidak dipakai lagi
+        connections.close_all()
+
+
+def cached_catalog(filters, build):
+    """
+    Hasil build() untuk `filters` (dari catalog_filters) lewat cache. Error dari build()
+    (cursor/sort tidak valid) diteruskan ke pemanggil dan tidak disimpan.
+    """
+    key = _key(filters)
+    generation = catalog_generation(filters)
+    entry = cache.get(key)
+    if entry is None:
+        return _store(key, generation, build())
+
+    if entry['generation'] != generation or time.time() - entry['built_at'] > FRESH_FOR:
+        if cache.add(f'{key}:lock', 1, LOCK_TIMEOUT):
+            if getattr(settings, 'COURT_CATALOG_REFRESH_ASYNC', True):
+                threading.Thread(target=_refresh_in_thread, args=(key, filters, build), daemon=True).start()
+            else:
+                _refresh(key, filters, build)
+    return entry['data']
+
+
+def _bump_generation(key=_GENERATION_KEY):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 2, None)
+
+
+def catalog_changed():
+    """Tandai semua entri katalog basi setelah transaksi yang sedang jalan di-commit."""
+    transaction.on_commit(_bump_generation)
+
+
+def popularity_changed():
+    """Seperti catalog_changed, tapi hanya untuk entri sort=popular (favorite_count berubah)."""
+    transaction.on_commit(lambda: _bump_generation(_POPULAR_GENERATION_KEY))
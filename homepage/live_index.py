@@ -0,0 +1,177 @@
+"""
+Index lapangan yang hidup di memori tiap proses (trigram, autocomplete).
+
+Index dibangun di background thread saat pertama dipakai (atau saat request pertama
+kalau COURT_TRIGRAM_WARMUP aktif), lalu diperbarui per lapangan. Karena tiap worker
+punya salinan sendiri, perubahan dicatat ke log di cache: courts_changed() (dipanggil
+dari signal Lapangan, setelah commit) menaikkan nomor versi dan menyimpan id lapangan
+di key versi itu. Setiap search() membandingkan versi cache dengan versi yang sudah
+diterapkan, lalu membaca ulang lapangan yang berubah saja. Kalau log tertinggal
+terlalu jauh, sudah kedaluwarsa, atau ada perubahan massal, index dibangun ulang.
+
+Request tidak pernah menunggu build penuh: build jalan di satu background thread per
+index sementara request tetap memakai index lama (atau hasil kosong kalau belum ada),
+lalu hasilnya dipasang di bawah lock. Semua baca/tulis index (replay, search yang ikut
+merapikan struktur internal) juga di bawah lock yang sama.
+
+Kelas index cukup punya add_court(id, name, location), remove(id), search() dan __len__.
+"""
+import logging
+import random
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_CHANGE_KEY = 'court_index:change:{}'
+_VERSION_KEY = 'court_index:version'
+_REBUILD = '*'
+_CHANGE_TTL = 60 * 60 * 24
+# lebih dari ini perubahan tertinggal -> bangun ulang saja
+_MAX_REPLAY = 500
+# jaring pengaman kalau ada perubahan yang terlewat (incr di file cache tidak atomik);
+# ditambah jitter per proses supaya semua worker tidak membangun ulang bersamaan
+REBUILD_AFTER = 60 * 30
+REBUILD_JITTER = 0.2
+
+live_indexes = []
+
+
+def max_courts():
+    return getattr(settings, 'COURT_TRIGRAM_MAX_COURTS', 200_000)
+
+
+def _rebuild_after():
+    return REBUILD_AFTER * random.uniform(1, 1 + REBUILD_JITTER)
+
+
+class LiveCourtIndex:
+    def __init__(self, index_class):
+        self.index_class = index_class
+        # reentrant: build sinkron (COURT_INDEX_BUILD_ASYNC=False) memasang hasilnya dari dalam search()
+        self.lock = threading.RLock()
+        self.reset()
+        live_indexes.append(self)
+
+    def reset(self):
+        self.index, self.version, self.built_at, self.building = None, 0, None, False
+        self.rebuild_after = _rebuild_after()
+
+    def build(self):
+        """Index semua lapangan, atau None kalau jumlahnya di atas batas memori."""
+        from admin_lapangan.models import Lapangan
+
+        if Lapangan.objects.count() > max_courts():
+            return None
+        index = self.index_class()
+        rows = Lapangan.objects.values_list('id', 'name', 'location').order_by()
+        for doc_id, name, location in rows.iterator(chunk_size=2000):
+            index.add_court(doc_id, name, location)
+        return index
+
+    def replay(self, doc_ids):
+        from admin_lapangan.models import Lapangan
+
+        found = set()
+        rows = Lapangan.objects.filter(id__in=doc_ids).values_list('id', 'name', 'location')
+        for doc_id, name, location in rows:
+            self.index.add_court(doc_id, name, location)
+            found.add(doc_id)
+        for doc_id in set(doc_ids) - found:
+            self.index.remove(doc_id)
+
+    def _build_and_swap(self):
+        try:
+            # versi dibaca sebelum build: perubahan selama build di-replay setelah dipasang
+            version = cache.get(_VERSION_KEY, 0)
+            index = self.build()
+            with self.lock:
+                # None (di atas batas) juga dicatat, supaya tidak dicoba lagi setiap request
+                self.index, self.version = index, version
+                self.built_at, self.rebuild_after = time.monotonic(), _rebuild_after()
+        except Exception:
+            logger.exception('Build index lapangan %s gagal', self.index_class.__name__)
+        finally:
+            with self.lock:
+                self.building = False
+
+    def _build_in_thread(self):
+        try:
+            self._build_and_swap()
+        finally:
+            connections.close_all()
+
+    def schedule_build(self):
+        """Mulai build penuh kalau belum ada yang jalan; hasilnya dipasang begitu selesai."""
+        with self.lock:
+            if self.building:
+                return
+            self.building = True
+        if getattr(settings, 'COURT_INDEX_BUILD_ASYNC', True):
+            name = f'court-index-{self.index_class.__name__}'
+            threading.Thread(target=self._build_in_thread, name=name, daemon=True).start()
+        else:
+            self._build_and_swap()
+
+    def _sync(self):
+        """Susulkan log perubahan ke index; build penuh dijadwalkan, tidak ditunggu. Di bawah lock."""
+        if self.built_at is None or time.monotonic() - self.built_at > self.rebuild_after:
+            # index lama tetap dipakai (dan disusulkan) sampai build baru terpasang
+            self.schedule_build()
+        version = cache.get(_VERSION_KEY, 0)
+        if version == self.version or self.index is None:
+            return
+        missing = version - self.version
+        changes = {}
+        if 0 < missing <= _MAX_REPLAY:
+            changes = cache.get_many([_CHANGE_KEY.format(v) for v in range(self.version + 1, version + 1)])
+        if len(changes) == missing and _REBUILD not in changes.values():
+            self.replay([uuid.UUID(doc_id) for doc_id in changes.values()])
+            self.version = version
+        else:
+            # log sudah kedaluwarsa/terpotong, atau ada perubahan massal
+            self.schedule_build()
+
+    def search(self, *args, **kwargs):
+        """index.search(...) setelah menyusul log perubahan; [] kalau index belum ada atau dimatikan."""
+        with self.lock:
+            self._sync()
+            if self.index is None:
+                return []
+            return self.index.search(*args, **kwargs)
+
+
+def warm_up_live_indexes():
+    """Mulai build semua index di background (COURT_TRIGRAM_WARMUP)."""
+    for live in live_indexes:
+        live.schedule_build()
+
+
+def reset_live_indexes():
+    for live in live_indexes:
+        with live.lock:
+            live.reset()
+
+
+def _log_changes(changes):
+    for change in changes:
+        try:
+            version = cache.incr(_VERSION_KEY)
+        except ValueError:
+            cache.add(_VERSION_KEY, 0, None)
+            version = cache.incr(_VERSION_KEY)
+        cache.set(_CHANGE_KEY.format(version), change, _CHANGE_TTL)
+
+
+def courts_changed(doc_ids=None):
+    """
+    Catat lapangan yang berubah (None = perubahan massal, bangun ulang) ke log di cache
+    setelah commit, supaya semua proses menyusul di get() berikutnya.
+    """
+    changes = [_REBUILD] if doc_ids is None else [str(doc_id) for doc_id in doc_ids]
+    transaction.on_commit(lambda: _log_changes(changes))
@@ -0,0 +1,86 @@
+import random
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from admin_lapangan.models import Lapangan
+from authentication_user.models import UserProfile
+from homepage.search import icontains_search, search_courts
+
+KOTA = ['Jakarta', 'Bandung', 'Depok', 'Bogor', 'Bekasi', 'Tangerang', 'Surabaya', 'Yogyakarta', 'Malang', 'Semarang']
+OLAHRAGA = ['Futsal', 'Badminton', 'Basket', 'Tenis', 'Voli', 'Padel', 'Mini Soccer', 'Squash']
+NAMA = ['Arena', 'GOR', 'Sport Center', 'Lapangan', 'Hall', 'Stadion', 'Court', 'Gelanggang']
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark pencarian lapangan: full-text index (FTS5/GIN) vs icontains, "
+        "pada data sintetis. Data di-rollback."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--courts', type=int, default=100_000)
+        parser.add_argument('--queries', type=int, default=20, help='Jumlah query per jenis')
+        parser.add_argument('--limit', type=int, default=0, help='Jumlah hasil per query (0 = semua, seperti API homepage)')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options['courts'])
+            with connection.cursor() as cursor:
+                if connection.vendor in ('sqlite', 'postgresql'):
+                    cursor.execute('ANALYZE')
+
+            rng = random.Random(42)
+            n_courts = options['courts']
+            kinds = {
+                'olahraga': lambda: rng.choice(OLAHRAGA),
+                'kota': lambda: rng.choice(KOTA),
+                'olahraga+kota': lambda: f'{rng.choice(OLAHRAGA)} {rng.choice(KOTA)}',
+                'prefix': lambda: rng.choice(OLAHRAGA)[:4].lower(),
+                # nama spesifik, cuma satu lapangan yang cocok
+                'spesifik': lambda: f'{rng.choice(OLAHRAGA)} {rng.randrange(n_courts)}',
+            }
+            limit = options['limit']
+
+            self.stdout.write(f"{connection.vendor}, {n_courts} lapangan, {options['queries']} query/jenis, limit {limit or '-'}")
+            self.stdout.write(f"{'jenis':14} {'icontains':>12} {'full-text':>12} {'rata2 hasil':>16}")
+            for kind, make in kinds.items():
+                queries = [make() for _ in range(options['queries'])]
+                timings, found = [], []
+                for search in (icontains_search, search_courts):
+                    started = time.perf_counter()
+                    total = 0
+                    for q in queries:
+                        ids = search(Lapangan.objects.all(), q).values_list('id', flat=True)
+                        total += len(ids[:limit] if limit else ids)
+                    timings.append((time.perf_counter() - started) / len(queries) * 1000)
+                    found.append(total / len(queries))
+                self.stdout.write(
+                    f"{kind:14} {timings[0]:9.2f} ms {timings[1]:9.2f} ms {found[0]:>7.1f} / {found[1]:<7.1f}"
+                )
+
+            transaction.set_rollback(True)
+
+    def seed(self, n_courts):
+        tag = uuid.uuid4().hex[:8]
+        admin = UserProfile.objects.create(
+            user=User.objects.create(username=f'bench_admin_{tag}'), fullname='Bench Admin', role='admin'
+        )
+        rng = random.Random(7)
+        batch = []
+        for i in range(n_courts):
+            kota = rng.choice(KOTA)
+            batch.append(Lapangan(
+                admin_lapangan=admin,
+                name=f'{rng.choice(NAMA)} {rng.choice(OLAHRAGA)} {kota} {i}',
+                location=f'{kota} {rng.choice(["Utara", "Selatan", "Barat", "Timur", "Pusat"])}',
+                description='-',
+                price=rng.randrange(50, 300) * 1000,
+            ))
+            if len(batch) >= 5000:
+                Lapangan.objects.bulk_create(batch, batch_size=1000)
+                batch = []
+        Lapangan.objects.bulk_create(batch, batch_size=1000)
@@ -0,0 +1,79 @@
+import random
+import time
+import tracemalloc
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from admin_lapangan.importer import DEFAULT_SOURCE, iter_records
+from homepage.trigram import TrigramIndex
+
+
+def typo(rng, word):
+    """Satu huruf dihapus/ditukar/diganti, seperti salah ketik biasa."""
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return word[:i] + word[i + 1:]
+    if kind == 1:
+        return word[:i - 1] + word[i] + word[i - 1] + word[i + 1:]
+    return word[:i] + rng.choice('aeiou') + word[i + 1:]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark index trigram lapangan di memori: waktu build, memori, dan latency pencarian "
+        "dengan typo. Nama & lokasi diambil acak dari badminton_final.json sampai --courts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--courts', type=int, default=100_000)
+        parser.add_argument('--queries', type=int, default=200)
+
+    def handle(self, *args, **options):
+        with open(DEFAULT_SOURCE, encoding='utf-8') as file:
+            source = [(r['nama_tempat'], r['lokasi_tempat']) for r in iter_records(file)]
+        rng = random.Random(7)
+        docs = []
+        for i in range(options['courts']):
+            name, _ = rng.choice(source)
+            _, location = rng.choice(source)
+            docs.append((uuid.uuid4(), f'{name} {i} {location}'))
+
+        started = time.perf_counter()
+        index = self.build(docs)
+        build = time.perf_counter() - started
+        tracemalloc.start()
+        traced_index = self.build(docs)
+        traced, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del traced_index
+
+        self.stdout.write(f"{len(index)} lapangan, {len(index.postings)} trigram, build {build:.2f}s")
+        self.stdout.write(
+            f"memori: {index.memory_bytes() / 1024 / 1024:.1f} MiB (memory_bytes), "
+            f"{traced / 1024 / 1024:.1f} MiB (tracemalloc)"
+        )
+
+        queries = {
+            'nama': lambda: ' '.join(typo(rng, w) for w in rng.choice(source)[0].split()),
+            'nama+lokasi': lambda: ' '.join(
+                typo(rng, w) for w in (rng.choice(source)[0].split()[:2] + rng.choice(source)[1].split()[:1])
+            ),
+            'satu kata': lambda: typo(rng, max(rng.choice(source)[0].split(), key=len)),
+        }
+        for label, make in queries.items():
+            batch = [make() for _ in range(options['queries'])]
+            started = time.perf_counter()
+            hits = sum(len(index.search(q, limit=20)) for q in batch)
+            elapsed = (time.perf_counter() - started) / len(batch) * 1000
+            self.stdout.write(f"{label:12} {elapsed:8.2f} ms/query  ({hits / len(batch):.1f} hasil)")
+
+    @staticmethod
+    def build(docs):
+        index = TrigramIndex()
+        for doc_id, text in docs:
+            index.add(doc_id, text)
+        return index
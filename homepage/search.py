@@ -0,0 +1,173 @@
+"""
+Pencarian lapangan (nama + lokasi) pakai full-text index, hasil urut relevansi.
+
+- PostgreSQL: GIN index di atas to_tsvector('simple', name || location) (dibuat di
+  migrasi 0002), nama diberi bobot lebih tinggi dari lokasi waktu ranking.
+- SQLite: virtual table FTS5 homepage_lapangan_fts yang diisi trigger di tabel
+  lapangan, jadi ikut sinkron juga untuk bulk_create/update massal, bukan cuma save().
+  Migrasi SQLite yang mengubah tabel lapangan membangun ulang tabelnya (trigger ikut
+  hilang), jadi setiap selesai migrate trigger dicek dan dipasang ulang.
+
+Setiap kata di query dicocokkan sebagai prefix ("futs" -> "futsal"). Backend lain, atau
+query yang tidak punya kata sama sekali, jatuh ke icontains seperti sebelumnya.
+"""
+import re
+
+from django.db import OperationalError, connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .trigram import fuzzy_court_ids
+
+LAPANGAN_TABLE = 'admin_lapangan_lapangan'
+FTS_TABLE = 'homepage_lapangan_fts'
+GIN_INDEX = 'lapangan_search_gin'
+
+SQLITE_TRIGGERS = {
+    'lapangan_fts_insert': f"""
+        CREATE TRIGGER lapangan_fts_insert AFTER INSERT ON {LAPANGAN_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE} (lapangan_id, name, location) VALUES (new.id, new.name, new.location);
+        END""",
+    'lapangan_fts_delete': f"""
+        CREATE TRIGGER lapangan_fts_delete AFTER DELETE ON {LAPANGAN_TABLE} BEGIN
+            DELETE FROM {FTS_TABLE} WHERE lapangan_id = old.id;
+        END""",
+    # save() menulis ulang semua kolom; index cukup disentuh kalau nama/lokasi berubah
+    'lapangan_fts_update': f"""
+        CREATE TRIGGER lapangan_fts_update AFTER UPDATE OF id, name, location ON {LAPANGAN_TABLE}
+        WHEN old.id IS NOT new.id OR old.name IS NOT new.name OR old.location IS NOT new.location BEGIN
+            DELETE FROM {FTS_TABLE} WHERE lapangan_id = old.id;
+            INSERT INTO {FTS_TABLE} (lapangan_id, name, location) VALUES (new.id, new.name, new.location);
+        END""",
+}
+
+# harus sama persis dengan ekspresi index supaya planner Postgres memakai GIN-nya
+PG_DOCUMENT = "to_tsvector('simple', coalesce({table}.name, '') || ' ' || coalesce({table}.location, ''))"
+PG_RANKED_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce({table}.name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce({table}.location, '')), 'B')"
+)
+
+_fts_ready = {}
+
+
+def install_search_index(connection):
+    """Buat index pencarian untuk vendor DB ini. Dipanggil dari migrasi homepage 0002."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {GIN_INDEX} ON {LAPANGAN_TABLE} USING GIN "
+                f"(to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(location, '')))"
+            )
+        elif connection.vendor == 'sqlite':
+            try:
+                cursor.execute(f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(lapangan_id UNINDEXED, name, location)')
+            except OperationalError:
+                # SQLite tanpa FTS5: pencarian tetap pakai icontains
+                return
+            ensure_sqlite_triggers(connection)
+    _fts_ready.pop(connection.alias, None)
+
+
+def uninstall_search_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'DROP INDEX IF EXISTS {GIN_INDEX}')
+        elif connection.vendor == 'sqlite':
+            for name in SQLITE_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    _fts_ready.pop(connection.alias, None)
+
+
+def ensure_sqlite_triggers(connection):
+    """Pasang trigger yang hilang lalu isi ulang tabel FTS. Tidak melakukan apa-apa kalau lengkap."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        if cursor.fetchone() is None:
+            return
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s", [LAPANGAN_TABLE])
+        missing = set(SQLITE_TRIGGERS) - {row[0] for row in cursor.fetchall()}
+        if not missing:
+            return
+        for name in missing:
+            cursor.execute(SQLITE_TRIGGERS[name])
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (lapangan_id, name, location) SELECT id, name, location FROM {LAPANGAN_TABLE}'
+        )
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query.lower())
+
+
+def fts_available(alias='default'):
+    """Tabel FTS5 ada (SQLite yang tidak di-compile dengan FTS5 dilewati di migrasi)."""
+    if alias not in _fts_ready:
+        connection = connections[alias]
+        _fts_ready[alias] = FTS_TABLE in connection.introspection.table_names()
+    return _fts_ready[alias]
+
+
+def icontains_search(qs, query):
+    return qs.filter(Q(name__icontains=query) | Q(location__icontains=query))
+
+
+def search_courts(qs, query):
+    """Filter queryset Lapangan dengan query pencarian, urut dari yang paling relevan."""
+    terms = search_terms(query)
+    vendor = connections[qs.db].vendor
+    table = qs.model._meta.db_table
+
+    if terms and vendor == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        return qs.filter(
+            # ditulis apa adanya (bukan SearchVector) supaya ekspresinya sama dengan GIN index
+            RawSQL(f"{PG_DOCUMENT.format(table=table)} @@ to_tsquery('simple', %s)", [tsquery],
+                   output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(
+                f"ts_rank({PG_RANKED_DOCUMENT.format(table=table)}, to_tsquery('simple', %s))", [tsquery],
+                output_field=FloatField(),
+            )
+        ).order_by('-search_rank')
+
+    if terms and vendor == 'sqlite' and fts_available(qs.db):
+        match = ' '.join(f'"{term}"*' for term in terms)
+        # kolom FTS: lapangan_id (tidak diindeks), name, location; bm25 makin kecil makin relevan.
+        # Skor dihitung sekali lewat CTE yang di-materialize (SQLite memberinya index otomatis
+        # per lapangan_id); MATCH langsung di subquery berkorelasi menjalankan pencarian
+        # full-text ulang untuk setiap baris hasil.
+        materialized = 'MATERIALIZED ' if connections[qs.db].Database.sqlite_version_info >= (3, 35) else ''
+        return qs.filter(
+            id__in=RawSQL(f'SELECT lapangan_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        ).annotate(
+            search_rank=RawSQL(
+                f'WITH hits AS {materialized}(SELECT lapangan_id, bm25({FTS_TABLE}, 0.0, 10.0, 5.0) AS rank '
+                f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s) '
+                f'SELECT rank FROM hits WHERE hits.lapangan_id = {table}.id',
+                [match], output_field=FloatField(),
+            )
+        ).order_by('search_rank')
+
+    return icontains_search(qs, query)
+
+
+def find_courts(qs, query):
+    """
+    (daftar lapangan, fuzzy). Hasil full-text dulu; kalau kosong (biasanya karena typo),
+    diambil dari index trigram di memori dan diurutkan menurut kemiripan.
+    """
+    courts = list(search_courts(qs, query))
+    if courts or not search_terms(query):
+        return courts, False
+
+    ranked = [doc_id for doc_id, _ in fuzzy_court_ids(query)]
+    if not ranked:
+        return [], False
+    # filter lain (lokasi, harga) tetap berlaku
+    by_id = {court.id: court for court in qs.filter(id__in=ranked)}
+    return [by_id[doc_id] for doc_id in ranked if doc_id in by_id], True
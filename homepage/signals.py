@@ -0,0 +1,43 @@
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from admin_lapangan.models import Lapangan
+from admin_lapangan.signals import lapangan_bulk_changed
+from .catalog_cache import catalog_changed, popularity_changed
+from .live_index import courts_changed
+from .models import LapanganFavorit
+
+
+@receiver(post_save, sender=Lapangan)
+@receiver(post_delete, sender=Lapangan)
+def update_index_trigram(sender, instance, **kwargs):
+    courts_changed([instance.id])
+
+
+@receiver(lapangan_bulk_changed)
+def rebuild_index_trigram(sender, **kwargs):
+    courts_changed()
+
+
+@receiver(post_save, sender=Lapangan)
+@receiver(post_delete, sender=Lapangan)
+@receiver(lapangan_bulk_changed)
+def buang_cache_katalog(sender, **kwargs):
+    catalog_changed()
+
+
+@receiver(post_save, sender=LapanganFavorit)
+def tambah_favorite_count(sender, instance, created, **kwargs):
+    if created:
+        Lapangan.objects.filter(pk=instance.lapangan_id).update(favorite_count=F('favorite_count') + 1)
+        # cuma urutan sort=popular yang berubah
+        popularity_changed()
+
+
+@receiver(post_delete, sender=LapanganFavorit)
+def kurangi_favorite_count(sender, instance, **kwargs):
+    Lapangan.objects.filter(pk=instance.lapangan_id, favorite_count__gt=0).update(
+        favorite_count=F('favorite_count') - 1
+    )
+    popularity_changed()
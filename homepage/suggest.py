@@ -0,0 +1,148 @@
+"""
+Autocomplete search box: saran nama lapangan dan lokasi berdasarkan awalan kata.
+
+Semua teks (nama lapangan, lokasi unik) dinormalisasi lalu disimpan sekali di
+`texts`. Yang diurutkan hanya pointer 8 byte (slot << 8 | offset awal kata), urut
+menurut texts[slot][offset:], jadi satu array itu bekerja seperti suffix array per awal
+kata: "bad" ketemu "Jifi Badminton Arena" lewat bisect tanpa menyimpan potongan string.
+Lokasi disimpan sekali per teks dengan jumlah lapangannya.
+
+Dipakai per proses lewat LiveCourtIndex (live_index.py).
+"""
+import sys
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+
+from .live_index import LiveCourtIndex
+from .trigram import normalize
+
+MAX_TEXT = 255
+# saat membangun, pointer dikumpulkan dulu lalu diurutkan sekali
+_INSORT_MAX = 64
+# jumlah pointer yang dicek per pencarian sebelum diranking
+SCAN_LIMIT = 400
+
+
+def _word_starts(text):
+    return [i for i, ch in enumerate(text) if ch != ' ' and (i == 0 or text[i - 1] == ' ')]
+
+
+class SuggestIndex:
+    def __init__(self):
+        self.texts = []
+        self.labels = []
+        self.pointers = array('Q')
+        self.pending = array('Q')
+        self.court_slot = {}
+        self.court_location = {}
+        self.location_slot = {}
+        self.location_count = Counter()
+
+    def __len__(self):
+        return len(self.court_slot)
+
+    def _suffix(self, pointer):
+        return self.texts[pointer >> 8][pointer & 0xFF:]
+
+    def _merge(self):
+        if len(self.pending) <= _INSORT_MAX:
+            for pointer in self.pending:
+                insort(self.pointers, pointer, key=self._suffix)
+        else:
+            self.pointers = array('Q', sorted(self.pointers + self.pending, key=self._suffix))
+        self.pending = array('Q')
+
+    def _add_text(self, text, label):
+        slot = len(self.texts)
+        self.texts.append(text)
+        self.labels.append(label)
+        self.pending.extend((slot << 8) | offset for offset in _word_starts(text))
+        return slot
+
+    def _remove_text(self, slot):
+        self._merge()
+        text = self.texts[slot]
+        for offset in _word_starts(text):
+            pointer = (slot << 8) | offset
+            i = bisect_left(self.pointers, text[offset:], key=self._suffix)
+            while self.pointers[i] != pointer:
+                i += 1
+            self.pointers.pop(i)
+        # slot tidak dipakai ulang; dibersihkan saat index dibangun ulang
+        self.texts[slot] = self.labels[slot] = None
+
+    def add_court(self, doc_id, name, location):
+        self.remove(doc_id)
+        text = normalize(name)[:MAX_TEXT]
+        if text:
+            self.court_slot[doc_id] = self._add_text(text, ('court', name, doc_id))
+
+        key = normalize(location)[:MAX_TEXT]
+        if key:
+            if key not in self.location_slot:
+                self.location_slot[key] = self._add_text(key, ('location', location, None))
+            self.location_count[key] += 1
+            self.court_location[doc_id] = key
+
+    def remove(self, doc_id):
+        slot = self.court_slot.pop(doc_id, None)
+        if slot is not None:
+            self._remove_text(slot)
+        key = self.court_location.pop(doc_id, None)
+        if key is not None:
+            self.location_count[key] -= 1
+            if not self.location_count[key]:
+                del self.location_count[key]
+                self._remove_text(self.location_slot.pop(key))
+
+    def search(self, prefix, limit=8):
+        """
+        Saran untuk awalan `prefix`: yang cocok dari awal teks dulu, lalu lokasi dengan
+        lapangan terbanyak, lalu teks terpendek.
+        """
+        if self.pending:
+            self._merge()
+        key = normalize(prefix)
+        if not key:
+            return []
+
+        best = {}
+        i = bisect_left(self.pointers, key, key=self._suffix)
+        for pointer in self.pointers[i:i + SCAN_LIMIT]:
+            if not self._suffix(pointer).startswith(key):
+                break
+            slot, offset = pointer >> 8, pointer & 0xFF
+            best[slot] = min(best.get(slot, offset), offset)
+
+        ranked = sorted(best, key=lambda slot: (
+            best[slot] > 0,
+            -self.location_count.get(self.texts[slot], 1) if self.labels[slot][0] == 'location' else -1,
+            len(self.texts[slot]),
+        ))
+        results = []
+        for slot in ranked[:limit]:
+            kind, label, doc_id = self.labels[slot]
+            if kind == 'court':
+                results.append({'type': kind, 'label': label, 'id': str(doc_id)})
+            else:
+                results.append({'type': kind, 'label': label, 'count': self.location_count[self.texts[slot]]})
+        return results
+
+    def memory_bytes(self):
+        """Perkiraan memori index (struktur Python + buffer array)."""
+        total = sum(map(sys.getsizeof, (
+            self.texts, self.labels, self.pointers, self.pending,
+            self.court_slot, self.court_location, self.location_slot, self.location_count,
+        )))
+        total += sum(sys.getsizeof(text) for text in self.texts if text is not None)
+        total += sum(sys.getsizeof(label) + sys.getsizeof(label[1]) for label in self.labels if label is not None)
+        total += sum(sys.getsizeof(doc_id) for doc_id in self.court_slot)
+        return total
+
+
+court_suggestions = LiveCourtIndex(SuggestIndex)
+
+
+def suggest_courts(prefix, limit=8):
+    return court_suggestions.search(prefix, limit)
@@ -1,12 +1,23 @@
+import base64
+import json
 import uuid
+from unittest.mock import patch
 from datetime import date, time, timedelta
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 
 from authentication_user.models import UserProfile
 from admin_lapangan.models import Lapangan, JadwalLapangan
 from event.models import Event
+from .models import LapanganFavorit
+from .catalog_cache import catalog_filters
+from . import live_index
+from .live_index import courts_changed, reset_live_indexes
+from netly.pagination import count_with_estimate
+from .suggest import SuggestIndex, court_suggestions
+from .trigram import TrigramIndex, court_trigrams, fuzzy_court_ids
 
 User = get_user_model()
 
@@ -14,6 +25,8 @@ class HomepageBaseTest(TestCase):
 
     def setUp(self):
         self.client = Client()
+        # cache katalog tidak ikut di-rollback antar test
+        cache.clear()
 
 
         self.admin_user = User.objects.create_user(username='testadmin', password='password123')
@@ -167,4 +180,398 @@ class AjaxViewsTest(HomepageBaseTest):
         self.assertEqual(response.status_code, 200)
         results = response.json()['results']
         self.assertEqual(len(results), 1)
-        self.assertEqual(results[0]['name'], 'Lapangan Futsal Jakarta Pusat')
\ No newline at end of file
+        self.assertEqual(results[0]['name'], 'Lapangan Futsal Jakarta Pusat')
+
+
+class ToggleFavoriteIdempotencyTest(HomepageBaseTest):
+
+    def test_retry_with_same_key_does_not_flip_back(self):
+        cache.clear()
+        self.client.login(username='testplayer', password='password123')
+        url = reverse('homepage:api-toggle-favorite', args=[self.lapangan_futsal.id])
+
+        first = self.client.post(url, headers={'Idempotency-Key': 'fav-1'})
+        retry = self.client.post(url, headers={'Idempotency-Key': 'fav-1'})
+
+        self.assertEqual(first.json()['status'], 'added')
+        self.assertEqual(retry.json()['status'], 'added')
+        self.assertTrue(LapanganFavorit.objects.filter(user=self.regular_user, lapangan=self.lapangan_futsal).exists())
+
+        # key baru = aksi baru
+        self.assertEqual(self.client.post(url, headers={'Idempotency-Key': 'fav-2'}).json()['status'], 'removed')
+
+    def test_result_stored_between_lookup_and_lock_is_replayed(self):
+        self.client.login(username='testplayer', password='password123')
+        url = reverse('homepage:api-toggle-favorite', args=[self.lapangan_futsal.id])
+        self.assertEqual(self.client.post(url, headers={'Idempotency-Key': 'fav-1'}).json()['status'], 'added')
+
+        # retry membaca cache sebelum request pertama selesai menyimpan hasil & melepas lock
+        real_get = cache.get
+        reads = []
+
+        def stale_first_read(key, *args, **kwargs):
+            reads.append(key)
+            return None if len(reads) == 1 else real_get(key, *args, **kwargs)
+
+        with patch('netly.idempotency.cache.get', side_effect=stale_first_read):
+            retry = self.client.post(url, headers={'Idempotency-Key': 'fav-1'})
+
+        self.assertEqual(retry.json()['status'], 'added')
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertTrue(LapanganFavorit.objects.filter(user=self.regular_user, lapangan=self.lapangan_futsal).exists())
+
+
+# yang dites index pencariannya, bukan cache katalog
+@override_settings(COURT_CATALOG_CACHE_TTL=0, COURT_INDEX_BUILD_ASYNC=False)
+class CourtSearchTest(HomepageBaseTest):
+
+    def search(self, q):
+        return [c['name'] for c in self.client.get(reverse('homepage:search-courts-ajax'), {'q': q}).json()['results']]
+
+    def test_ranked_prefix_search(self):
+        Lapangan.objects.create(
+            admin_lapangan=self.admin_profile, name="GOR Serbaguna", location="Futsal Center Depok",
+            description="-", price=50000
+        )
+        # cocok di nama lebih relevan daripada cocok di lokasi
+        self.assertEqual(self.search('futs'), ['Lapangan Futsal Jakarta Pusat', 'GOR Serbaguna'])
+        self.assertEqual(self.search('badminton bandung'), ['Arena Badminton Bandung'])
+        self.assertEqual(self.search('tenis'), [])
+
+    def test_index_follows_writes(self):
+        self.lapangan_badminton.name = "Arena Tenis Bandung"
+        self.lapangan_badminton.save()
+        self.assertEqual(self.search('tenis'), ['Arena Tenis Bandung'])
+        self.assertEqual(self.search('badminton'), [])
+
+        Lapangan.objects.bulk_create([Lapangan(
+            admin_lapangan=self.admin_profile, name="Tenis Indoor", location="Bogor", description="-", price=1
+        )])
+        self.assertEqual(len(self.search('tenis')), 2)
+
+        self.lapangan_badminton.delete()
+        self.assertEqual(self.search('tenis'), ['Tenis Indoor'])
+
+    def test_sqlite_triggers_reinstalled(self):
+        from django.db import connection
+        from .search import SQLITE_TRIGGERS, ensure_sqlite_triggers
+        if connection.vendor != 'sqlite':
+            self.skipTest('trigger FTS hanya dipakai di SQLite')
+
+        # seperti habis migrasi yang membangun ulang tabel lapangan
+        with connection.cursor() as cursor:
+            for name in SQLITE_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER {name}')
+        Lapangan.objects.filter(pk=self.lapangan_futsal.pk).update(name="Lapangan Voli")
+        ensure_sqlite_triggers(connection)
+
+        self.assertEqual(self.search('voli'), ['Lapangan Voli'])
+        self.assertEqual(self.search('futsal'), [])
+
+
+class TrigramIndexTest(TestCase):
+
+    def test_typo_ranked_lookup(self):
+        index = TrigramIndex()
+        index.add('a', 'Jifi Badminton Arena Tebet Jakarta Selatan')
+        index.add('b', 'Senayan Badminton Hall Jakarta Pusat')
+        index.add('c', 'Futsal Senayan Jakarta Pusat')
+
+        ids = [doc_id for doc_id, _ in index.search('badmintn senayan')]
+        self.assertEqual(ids[0], 'b')
+        self.assertNotIn('a', ids[:1])
+        self.assertEqual(index.search('tenis meja'), [])
+
+    def test_update_remove_and_compact(self):
+        index = TrigramIndex()
+        for i in range(20):
+            index.add(i, f'Lapangan Tenis {i}')
+        index.add(3, 'GOR Voli Depok')
+        index.remove(4)
+        self.assertEqual([doc_id for doc_id, _ in index.search('voli depok')], [3])
+        self.assertNotIn(4, [doc_id for doc_id, _ in index.search('lapangan tenis 4', limit=50)])
+
+        index.compact()
+        self.assertEqual(len(index), 19)
+        self.assertEqual(len(index.ids), 19)
+        self.assertEqual([doc_id for doc_id, _ in index.search('voly depok')], [3])
+        self.assertGreater(index.memory_bytes(), 0)
+
+
+@override_settings(COURT_CATALOG_CACHE_TTL=0, COURT_INDEX_BUILD_ASYNC=False)
+class FuzzyCourtSearchTest(HomepageBaseTest):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        reset_live_indexes()
+
+    def search(self, q):
+        return self.client.get(reverse('homepage:search-courts-ajax'), {'q': q}).json()
+
+    def test_typo_falls_back_to_trigram(self):
+        result = self.search('badmintn bandng')
+        self.assertTrue(result['fuzzy'])
+        self.assertEqual([c['name'] for c in result['results']], ['Arena Badminton Bandung'])
+
+        result = self.search('badminton')
+        self.assertFalse(result['fuzzy'])
+
+    def test_index_follows_committed_writes(self):
+        self.search('voli')  # index dibangun
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lapangan_futsal.name = 'GOR Voli Senayan'
+            self.lapangan_futsal.save()
+        self.assertEqual([c['name'] for c in self.search('voly senayn')['results']], ['GOR Voli Senayan'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lapangan_futsal.delete()
+        self.assertEqual(self.search('voly senayn')['results'], [])
+
+
+class LiveCourtIndexTest(HomepageBaseTest):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        reset_live_indexes()
+
+    def names(self, query):
+        return [Lapangan.objects.get(id=doc_id).name for doc_id, _ in fuzzy_court_ids(query)]
+
+    def test_rebuild_runs_in_background_and_old_index_keeps_serving(self):
+        with override_settings(COURT_INDEX_BUILD_ASYNC=False):
+            self.assertEqual(self.names('badmintn'), ['Arena Badminton Bandung'])
+        court_trigrams.built_at -= live_index.REBUILD_AFTER * 2
+
+        with patch.object(live_index.threading, 'Thread') as thread:
+            # index lama dipakai, build penuh cuma dijadwalkan sekali
+            with self.assertNumQueries(0):
+                self.assertEqual(len(fuzzy_court_ids('badmintn')), 1)
+                self.assertEqual(len(fuzzy_court_ids('badmintn')), 1)
+        thread.assert_called_once()
+        self.assertTrue(court_trigrams.building)
+
+        Lapangan.objects.create(
+            admin_lapangan=self.admin_profile, name="Arena Badminton Bogor", location="Bogor",
+            description="-", price=50000
+        )
+        court_trigrams._build_and_swap()
+        self.assertFalse(court_trigrams.building)
+        self.assertEqual(len(fuzzy_court_ids('badmintn')), 2)
+
+    @override_settings(COURT_INDEX_BUILD_ASYNC=False, COURT_TRIGRAM_MAX_COURTS=1)
+    def test_disabled_index_is_not_rebuilt_every_request(self):
+        self.assertEqual(fuzzy_court_ids('badmintn'), [])
+        with self.assertNumQueries(0):
+            self.assertEqual(fuzzy_court_ids('badmintn'), [])
+
+
+@override_settings(COURT_INDEX_BUILD_ASYNC=False)
+class SuggestCourtsTest(HomepageBaseTest):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        reset_live_indexes()
+        self.url = reverse('homepage:api-suggest-courts')
+
+    def suggest(self, q, **params):
+        return self.client.get(self.url, {'q': q, **params}).json()['results']
+
+    def test_prefix_on_any_word(self):
+        Lapangan.objects.create(
+            admin_lapangan=self.admin_profile, name="GOR Jaya", location="Jakarta",
+            description="-", price=50000
+        )
+        self.suggest('')  # tidak membangun index
+        self.suggest('x')  # index dibangun di sini
+        with self.assertNumQueries(0):
+            results = self.suggest('ja')
+
+        # lokasi dengan lapangan terbanyak dulu, lalu teks yang diawali "ja"
+        self.assertEqual(results[0], {'type': 'location', 'label': 'Jakarta', 'count': 2})
+        self.assertEqual(results[1], {'type': 'court', 'label': 'GOR Jaya', 'id': str(Lapangan.objects.get(name='GOR Jaya').id)})
+        self.assertEqual(results[2]['label'], 'Lapangan Futsal Jakarta Pusat')
+        self.assertEqual([r['label'] for r in self.suggest('badm')], ['Arena Badminton Bandung'])
+        self.assertEqual(len(self.suggest('ja', limit=1)), 1)
+        self.assertEqual(self.suggest('zz'), [])
+
+    def test_follows_committed_writes(self):
+        self.suggest('x')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lapangan_badminton.name = 'Arena Tenis Bandung'
+            self.lapangan_badminton.save()
+        self.assertEqual([r['label'] for r in self.suggest('ten')], ['Arena Tenis Bandung'])
+        self.assertEqual(self.suggest('badm'), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lapangan_badminton.delete()
+        self.assertEqual(self.suggest('ban'), [])
+
+    @override_settings(COURT_INDEX_BUILD_ASYNC=True)
+    def test_requests_never_build_inline(self):
+        with patch.object(live_index.threading, 'Thread') as thread:
+            # index belum ada: jawab kosong tanpa query, build dijadwalkan sekali saja
+            with self.assertNumQueries(0):
+                self.assertEqual(self.suggest('ba'), [])
+                response = self.client.get(self.url, {'q': 'bad'})
+            self.assertEqual(response['Cache-Control'], 'no-store')
+            thread.assert_called_once()
+            court_suggestions._build_and_swap()
+            self.assertEqual([r['label'] for r in self.suggest('badm')], ['Arena Badminton Bandung'])
+
+            # perubahan massal: index lama tetap dipakai sampai build baru selesai
+            with self.captureOnCommitCallbacks(execute=True):
+                courts_changed()
+            with self.assertNumQueries(0):
+                self.assertEqual([r['label'] for r in self.suggest('badm')], ['Arena Badminton Bandung'])
+            self.assertEqual(thread.call_count, 2)
+
+
+class SuggestIndexTest(TestCase):
+
+    def test_remove_keeps_pointers_sorted(self):
+        index = SuggestIndex()
+        for i in range(100):
+            index.add_court(i, f'Lapangan {i}', 'Depok' if i % 2 else 'Bogor')
+        for i in range(0, 100, 3):
+            index.remove(i)
+
+        suffixes = [index._suffix(p) for p in index.pointers]
+        self.assertEqual(suffixes, sorted(suffixes))
+        self.assertEqual(index.location_count['depok'], 33)
+        self.assertEqual(index.search('lapangan 3', limit=3)[0]['label'], 'Lapangan 31')
+
+
+class CourtPaginationTest(HomepageBaseTest):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        for i in range(13):
+            Lapangan.objects.create(
+                admin_lapangan=self.admin_profile, name=f"GOR Tenis {i}", location="Depok",
+                description="-", price=100000 + (i % 3) * 10000
+            )
+        self.url = reverse('homepage:api-all-courts')
+
+    def pages(self, **params):
+        names, cursor = [], None
+        while True:
+            query = {**params, **({'cursor': cursor} if cursor else {})}
+            data = self.client.get(self.url, query).json()
+            names += [c['name'] for c in data['results']]
+            cursor = data['next_cursor']
+            if not cursor:
+                return names, data
+
+    def test_keyset_pages_cover_all_without_duplicates(self):
+        first = self.client.get(self.url, {'limit': 5}).json()
+        self.assertEqual(len(first['results']), 5)
+        self.assertEqual((first['total'], first['total_exact'], first['sort']), (15, True, 'newest'))
+
+        names, last = self.pages(limit=5)
+        self.assertEqual(len(names), 15)
+        self.assertEqual(len(set(names)), 15)
+        self.assertEqual(names[0], 'GOR Tenis 12')
+        self.assertIsNone(last['total'])  # total cuma di halaman pertama
+
+        names, _ = self.pages(limit=4, sort='price')
+        prices = [Lapangan.objects.get(name=n).price for n in names]
+        self.assertEqual(len(set(names)), 15)
+        self.assertEqual(prices, sorted(prices))
+
+        names, _ = self.pages(limit=4, sort='-price', location='Depok')
+        self.assertEqual(len(names), 13)
+
+    def test_popular_uses_favorite_count(self):
+        LapanganFavorit.objects.create(user=self.regular_user, lapangan=self.lapangan_badminton)
+        LapanganFavorit.objects.create(user=self.admin_user, lapangan=self.lapangan_badminton)
+        fav = LapanganFavorit.objects.create(user=self.regular_user, lapangan=self.lapangan_futsal)
+        self.lapangan_badminton.refresh_from_db()
+        self.assertEqual(self.lapangan_badminton.favorite_count, 2)
+
+        names = [c['name'] for c in self.client.get(self.url, {'sort': 'popular', 'limit': 2}).json()['results']]
+        self.assertEqual(names, ['Arena Badminton Bandung', 'Lapangan Futsal Jakarta Pusat'])
+
+        fav.delete()
+        self.lapangan_futsal.refresh_from_db()
+        self.assertEqual(self.lapangan_futsal.favorite_count, 0)
+
+    def test_relevance_pages_and_bad_params(self):
+        names, _ = self.pages(q='tenis', limit=5)
+        self.assertEqual(len(set(names)), 13)
+
+        self.assertEqual(self.client.get(self.url, {'sort': 'cheapest'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'cursor': 'bukan-cursor'}).status_code, 400)
+        price_cursor = self.client.get(self.url, {'sort': 'price', 'limit': 1}).json()['next_cursor']
+        response = self.client.get(self.url, {'sort': 'newest', 'cursor': price_cursor})
+        self.assertEqual(response.status_code, 400)
+
+    def test_wrongly_typed_cursor(self):
+        # JSON valid tapi isinya bukan string: 400, bukan 500
+        for params, values in (
+            ({'q': 'tenis'}, ['relevance', 5, '']),
+            ({'sort': 'price'}, ['price', None, 1]),
+        ):
+            cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+            response = self.client.get(self.url, {**params, 'cursor': cursor})
+            self.assertEqual(response.status_code, 400)
+
+    def test_estimated_total(self):
+        total, exact = count_with_estimate(Lapangan.objects.filter(location='Depok'), exact_max=10)
+        self.assertEqual((total, exact), (11, False))
+        # tabel tanpa statistik planner -> COUNT penuh
+        total, exact = count_with_estimate(Lapangan.objects.all(), exact_max=10, unfiltered=True)
+        self.assertEqual(total, 15)
+
+
+@override_settings(COURT_CATALOG_REFRESH_ASYNC=False)
+class CatalogCacheTest(HomepageBaseTest):
+
+    def courts(self, **params):
+        return self.client.get(reverse('homepage:api-all-courts'), params).json()
+
+    def test_normalized_filters_share_entry(self):
+        self.assertEqual(
+            catalog_filters({'q': ' Futsal', 'location': 'JAKARTA ', 'min_price': 'x'}, paged=True),
+            catalog_filters({'location': 'jakarta', 'q': 'futsal', 'limit': '24'}, paged=True),
+        )
+        first = self.courts(q='Futsal ', limit=24)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.courts(q='futsal', limit=24), first)
+
+    def test_write_serves_stale_then_refreshes(self):
+        self.assertEqual(len(self.courts(sort='price')['results']), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lapangan_badminton.price = 200000
+            self.lapangan_badminton.save()
+
+        # entri lama dikirim langsung, build ulang jalan di belakang
+        stale = [c['name'] for c in self.courts(sort='price')['results']]
+        self.assertEqual(stale, ['Arena Badminton Bandung', 'Lapangan Futsal Jakarta Pusat'])
+        with self.assertNumQueries(0):
+            fresh = [c['name'] for c in self.courts(sort='price')['results']]
+        self.assertEqual(fresh, ['Lapangan Futsal Jakarta Pusat', 'Arena Badminton Bandung'])
+
+    def test_favorite_only_refreshes_popular(self):
+        newest = self.courts(sort='newest')
+        # favorite_count masih sama-sama 0, urutannya ditentukan id
+        first, second = [c['name'] for c in self.courts(sort='popular')['results']]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            LapanganFavorit.objects.create(user=self.regular_user, lapangan=Lapangan.objects.get(name=second))
+
+        # sort lain tidak basi karena favorit
+        with self.assertNumQueries(0):
+            self.assertEqual(self.courts(sort='newest'), newest)
+        self.courts(sort='popular')  # basi: dikirim lalu dibangun ulang
+        with self.assertNumQueries(0):
+            popular = [c['name'] for c in self.courts(sort='popular')['results']]
+        self.assertEqual(popular, [second, first])
+
+    def test_errors_are_not_cached(self):
+        url = reverse('homepage:api-all-courts')
+        for _ in range(2):
+            self.assertEqual(self.client.get(url, {'cursor': 'rusak'}).status_code, 400)
@@ -0,0 +1,150 @@
+"""
+Index trigram di memori untuk pencarian lapangan yang tahan typo ("badmintn senayan").
+
+Setiap lapangan dipecah jadi trigram nama + lokasi (gaya pg_trgm: per kata, diberi
+padding spasi). Posting list per trigram disimpan sebagai array('I') berisi nomor
+slot dokumen yang urut naik, jadi satu entri cuma 4 byte dan keanggotaan bisa dicek
+dengan bisect. Dokumen yang diubah/dihapus cukup ditandai mati (tombstone); kalau
+slot mati sudah banyak, posting list dipadatkan ulang.
+
+Skor = bagian trigram query yang ada di dokumen. Kandidat hanya diambil dari posting
+list paling jarang (prefix filtering): dokumen yang tidak ada di
+(jumlah trigram - minimal cocok + 1) list terjarang tidak mungkin lolos ambang, jadi
+trigram umum seperti "  j" (Jakarta) tidak pernah di-scan penuh.
+
+Index per proses dibangun dan disinkronkan lewat LiveCourtIndex (live_index.py).
+"""
+import heapq
+import math
+import re
+import sys
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from .live_index import LiveCourtIndex
+
+MAX_TEXT = 160
+MIN_SCORE = 0.5
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode()
+    return ' '.join(_WORD.findall(text.lower()))
+
+
+def trigrams(text):
+    grams = set()
+    for word in normalize(text)[:MAX_TEXT].split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    def __init__(self):
+        self.postings = {}
+        self.ids = []
+        self.sizes = array('H')
+        self.slot_of = {}
+        self.dead = 0
+
+    def __len__(self):
+        return len(self.slot_of)
+
+    def add_court(self, doc_id, name, location):
+        self.add(doc_id, f'{name} {location}')
+
+    def add(self, doc_id, text):
+        """Tambah atau ganti dokumen doc_id (uuid)."""
+        self.remove(doc_id)
+        grams = trigrams(text)
+        slot = len(self.ids)
+        self.ids.append(doc_id)
+        self.sizes.append(len(grams))
+        self.slot_of[doc_id] = slot
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array('I')
+            posting.append(slot)
+
+    def remove(self, doc_id):
+        slot = self.slot_of.pop(doc_id, None)
+        if slot is None:
+            return
+        self.ids[slot] = None
+        self.dead += 1
+        if self.dead > 1000 and self.dead > len(self.slot_of) // 4:
+            self.compact()
+
+    def compact(self):
+        """Buang slot mati dan nomori ulang; urutan slot tetap naik jadi list tetap urut."""
+        renumber = array('i', [-1]) * len(self.ids)
+        ids, sizes = [], array('H')
+        for slot, doc_id in enumerate(self.ids):
+            if doc_id is not None:
+                renumber[slot] = len(ids)
+                ids.append(doc_id)
+                sizes.append(self.sizes[slot])
+        postings = {}
+        for gram, posting in self.postings.items():
+            kept = array('I', (renumber[slot] for slot in posting if renumber[slot] >= 0))
+            if kept:
+                postings[gram] = kept
+        self.postings, self.ids, self.sizes, self.dead = postings, ids, sizes, 0
+        self.slot_of = {doc_id: slot for slot, doc_id in enumerate(ids)}
+
+    def search(self, query, limit=20, min_score=MIN_SCORE):
+        """[(doc_id, skor)] urut skor turun; seri dipecah dengan dokumen yang lebih pendek."""
+        grams = trigrams(query)
+        if not grams:
+            return []
+        need = max(1, math.ceil(min_score * len(grams)))
+        lists = sorted((self.postings.get(gram, array('I')) for gram in grams), key=len)
+
+        # dokumen yang lolos pasti muncul di salah satu list terjarang ini
+        candidates = Counter()
+        head = len(lists) - need + 1
+        for posting in lists[:head]:
+            candidates.update(posting)
+
+        tail = lists[head:]
+        if len(candidates) * len(tail) * 8 < sum(map(len, tail)):
+            # kandidat sedikit: cek list sisanya dengan bisect
+            for slot in candidates:
+                for posting in tail:
+                    i = bisect_left(posting, slot)
+                    if i < len(posting) and posting[i] == slot:
+                        candidates[slot] += 1
+        else:
+            # kandidat banyak: menghitung seluruh list (di C) lebih murah daripada bisect per kandidat
+            for posting in tail:
+                candidates.update(posting)
+
+        ids, sizes = self.ids, self.sizes
+        best = heapq.nlargest(
+            limit,
+            ((count, -sizes[slot], slot) for slot, count in candidates.items()
+             if count >= need and ids[slot] is not None),
+        )
+        return [(ids[slot], round(count / len(grams), 4)) for count, _, slot in best]
+
+    def memory_bytes(self):
+        """Perkiraan memori yang dipakai index (struktur Python + buffer array)."""
+        total = sys.getsizeof(self.postings) + sys.getsizeof(self.ids) + sys.getsizeof(self.sizes)
+        total += sys.getsizeof(self.slot_of)
+        for gram, posting in self.postings.items():
+            total += sys.getsizeof(gram) + sys.getsizeof(posting)
+        total += sum(sys.getsizeof(doc_id) for doc_id in self.slot_of)
+        return total
+
+
+court_trigrams = LiveCourtIndex(TrigramIndex)
+
+
+def fuzzy_court_ids(query, limit=50):
+    """[(lapangan_id, skor)] yang mirip query, kosong kalau index dimatikan."""
+    return court_trigrams.search(query, limit=limit)
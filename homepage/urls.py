@@ -13,6 +13,7 @@ urlpatterns = [
     path('web/favorites/add/<uuid:court_id>/', views.web_add_favorite, name='web-add-favorite'),
 
     path('api/courts/', views.api_get_all_courts, name='api-all-courts'),
+    path('api/courts/suggest/', views.api_suggest_courts, name='api-suggest-courts'),
     path('api/court/<uuid:court_id>/', views.api_get_court_detail, name='api-court-detail'),
     
     path('api/favorites/', views.api_get_favorites, name='api-favorites-list'),
@@ -1,16 +1,22 @@
 import json
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse
-from django.db.models import Q
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
+from netly.idempotency import idempotent
 import requests
 from django.http import HttpResponse
 
 from .models import LapanganFavorit
+from .search import find_courts
+from .suggest import court_suggestions, suggest_courts
+from .catalog import court_page
+from .catalog_cache import cached_catalog, catalog_filters
+from netly.pagination import InvalidCursor, parse_limit
 from admin_lapangan.models import Lapangan
+from admin_lapangan.stats import dashboard_stats
 
 def serialize_lapangan(obj):
     """Mengubah object Lapangan jadi Dictionary untuk JSON"""
@@ -55,20 +61,30 @@ def index(request):
         context = {
             "recent_lapangan": recent_lapangan,
             "user_profile": profile,
+            "stats": dashboard_stats(profile),
         }
         return render(request, "dashboard.html", context)
 
     # Logic awal render HTML biasa (biar SEO bagus / load awal cepat)
     q = request.GET.get("q", "").strip()
     city = request.GET.get("city", "").strip()
-    
-    courts_qs = Lapangan.objects.all()
-    if q: courts_qs = courts_qs.filter(Q(name__icontains=q) | Q(location__icontains=q))
-    if city: courts_qs = courts_qs.filter(location__icontains=city)
 
-    court_list = [serialize_lapangan(c) for c in courts_qs]
+    # cukup halaman pertama, sisanya lewat tombol "Load more" (api_get_all_courts + cursor);
+    # entri cache-nya sama dengan halaman pertama API untuk filter yang sama
+    params = {"q": q, "location": city}
+    paging = {key: request.GET.get(key) for key in ("sort", "limit", "cursor")}
+    try:
+        filters = catalog_filters({**params, **paging}, paged=True)
+        page = cached_catalog(filters, lambda: courts_payload(filters))
+    except ValueError:
+        filters = catalog_filters(params, paged=True)
+        page = cached_catalog(filters, lambda: courts_payload(filters))
     
-    return render(request, "homepage/index.html", {"court_list": court_list})
+    return render(request, "homepage/index.html", {
+        "court_list": page["results"],
+        "next_cursor": page["next_cursor"],
+        "total": page["total"],
+    })
 
 def court_detail(request, court_id):
     """Detail Page HTML"""
@@ -115,41 +131,71 @@ def web_add_favorite(request, court_id):
             messages.success(request, "Added to favorites!")
     return redirect('homepage:court-detail', court_id=court_id)
 
+def courts_payload(filters):
+    """Isi response katalog untuk filter hasil catalog_filters (dipanggil lewat cache)."""
+    qs = Lapangan.objects.all()
+    if filters["location"]:
+        qs = qs.filter(location__icontains=filters["location"])
+    if filters["min_price"] is not None:
+        qs = qs.filter(price__gte=filters["min_price"])
+    if filters["max_price"] is not None:
+        qs = qs.filter(price__lte=filters["max_price"])
+    q = filters["q"]
+
+    # mode halaman: ?limit=/?cursor=/?sort= (keyset, lihat catalog.py)
+    if filters["paged"]:
+        filtered = bool(filters["location"]) or filters["min_price"] is not None or filters["max_price"] is not None
+        page = court_page(filters, qs, q, filtered=filtered)
+        return {
+            "status": "success",
+            "results": [serialize_lapangan(c) for c in page["courts"]],
+            "next_cursor": page["next_cursor"],
+            "total": page["total"],
+            "total_exact": page["total_exact"],
+            "sort": page["sort"],
+            "fuzzy": page["fuzzy"],
+        }
+
+    # mode lama: semua hasil sekaligus
+    # full-text index urut relevansi, fallback ke pencarian trigram kalau ada typo
+    fuzzy = False
+    if q:
+        qs, fuzzy = find_courts(qs, q)
+    return {"status": "success", "results": [serialize_lapangan(c) for c in qs], "fuzzy": fuzzy}
+
 @csrf_exempt
 def api_get_all_courts(request):
     """
     API Utama untuk mengambil data lapangan dengan SEMUA Filter.
     Menghandle: Search (q), Location, Min Price, Max Price.
+    Response di-cache per kombinasi filter (lihat catalog_cache.py).
     """
-    # 1. Ambil parameter
-    q = request.GET.get("q", "").strip()
-    location = request.GET.get("location", "").strip()
-    min_price = request.GET.get("min_price")
-    max_price = request.GET.get("max_price")
-    
-    # 2. Queryset Awal
-    qs = Lapangan.objects.all()
-
-    # 3. Filter
-    if q:
-        qs = qs.filter(Q(name__icontains=q) | Q(location__icontains=q))
-    
-    if location:
-        qs = qs.filter(location__icontains=location)
-        
+    paged = any(key in request.GET for key in ("limit", "cursor", "sort"))
+    filters = catalog_filters(request.GET, paged)
     try:
-        if min_price not in (None, ""):
-            qs = qs.filter(price__gte=int(min_price))
-        if max_price not in (None, ""):
-            qs = qs.filter(price__lte=int(max_price))
-    except ValueError:
-        pass 
+        payload = cached_catalog(filters, lambda: courts_payload(filters))
+    except InvalidCursor:
+        return JsonResponse({"status": "error", "message": "Cursor tidak valid"}, status=400)
+    except ValueError as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
 
-    # 4. Serialize
-    data = [serialize_lapangan(c) for c in qs]
-    
-    # 5. Return Dictionary results (Penting buat JS di template & Flutter)
-    return JsonResponse({"status": "success", "results": data})
+    # Return Dictionary results (Penting buat JS di template & Flutter)
+    return JsonResponse(payload)
+
+def api_suggest_courts(request):
+    """
+    Autocomplete search box: saran nama lapangan/lokasi untuk awalan ?q= dari index
+    di memori (tanpa query DB). Index tidak pernah dibangun di request ini; kalau belum
+    siap atau sedang dibangun ulang, hasilnya kosong/versi lama dulu.
+    Pencarian lengkapnya tetap lewat api_get_all_courts.
+    """
+    q = request.GET.get("q", "").strip()
+    limit = parse_limit(request.GET.get("limit"), default=8, maximum=20)
+    results = suggest_courts(q, limit) if q else []
+    response = JsonResponse({"status": "success", "results": results})
+    # hasil kosong karena index belum siap jangan sampai di-cache browser
+    response["Cache-Control"] = "max-age=60" if court_suggestions.index is not None else "no-store"
+    return response
 
 @csrf_exempt
 def api_get_court_detail(request, court_id):
@@ -195,6 +241,7 @@ def api_add_favorite(request, court_id):
 @csrf_exempt
 @require_POST
 @login_required
+@idempotent
 def api_toggle_favorite(request, court_id):
     """
     API Cerdas: Kalau belum ada -> Add. Kalau sudah ada -> Remove.
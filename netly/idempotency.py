@@ -0,0 +1,65 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+LOCK_TIMEOUT = 30
+
+
+def _ttl():
+    return getattr(settings, 'IDEMPOTENCY_TTL', 60 * 60 * 24)
+
+
+def idempotent(view_func):
+    """
+    Dukung header `Idempotency-Key` di endpoint POST yang dipanggil ulang sama client
+    mobile waktu koneksi putus-putus. Request pertama dengan key tertentu dijalankan
+    biasa dan response-nya disimpan di cache (TTL IDEMPOTENCY_TTL); retry dengan key
+    yang sama dapat response simpanan itu tanpa ngejalanin view lagi.
+
+    Key di-scope per user dan per path. Kalau key dipakai ulang dengan body berbeda
+    -> 422, kalau request pertama masih jalan -> 409. Tanpa header, view jalan seperti biasa.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        key = request.META.get(HEADER, '').strip()
+        if not key or request.method != 'POST' or not request.user.is_authenticated:
+            return view_func(request, *args, **kwargs)
+
+        scope = hashlib.sha256(f'{request.user.pk}:{request.path}:{key}'.encode()).hexdigest()
+        result_key = f'idempotency:{scope}'
+        lock_key = f'idempotency:{scope}:lock'
+        fingerprint = hashlib.sha256(request.body).hexdigest()
+
+        stored = cache.get(result_key)
+        if stored is None:
+            if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+                return JsonResponse({'status': 'error', 'message': 'Request dengan Idempotency-Key ini masih diproses'}, status=409)
+            try:
+                # request pertama bisa saja menyimpan hasil dan melepas lock di antara
+                # cache.get dan cache.add di atas, jadi dicek ulang setelah pegang lock
+                stored = cache.get(result_key)
+                if stored is None:
+                    response = view_func(request, *args, **kwargs)
+                    # error server tidak disimpan supaya client masih bisa retry
+                    if response.status_code < 500 and not getattr(response, 'streaming', False):
+                        cache.set(result_key, {
+                            'fingerprint': fingerprint,
+                            'status': response.status_code,
+                            'content': response.content,
+                            'content_type': response.get('Content-Type'),
+                        }, _ttl())
+                    return response
+            finally:
+                cache.delete(lock_key)
+
+        if stored['fingerprint'] != fingerprint:
+            return JsonResponse({'status': 'error', 'message': 'Idempotency-Key sudah dipakai untuk request lain'}, status=422)
+        response = HttpResponse(stored['content'], status=stored['status'], content_type=stored['content_type'])
+        response['Idempotent-Replayed'] = 'true'
+        return response
+
+    return wrapper
@@ -0,0 +1,76 @@
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(*values):
+    """Bungkus nilai kolom keyset (misal created_at & id) jadi string opaque untuk client."""
+    raw = json.dumps([str(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Kebalikan encode_cursor. Return list of string sepanjang `size`, atau InvalidCursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeError):
+        raise InvalidCursor('Cursor tidak valid')
+    # cursor buatan client bisa berisi angka/null; pemanggil selalu menerima string
+    if not isinstance(values, list) or len(values) != size or not all(isinstance(v, str) for v in values):
+        raise InvalidCursor('Cursor tidak valid')
+    return values
+
+
+def parse_limit(value, default=20, maximum=100):
+    """?limit= dari query string, dijepit ke 1..maximum. Nilai ngaco -> default."""
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, maximum))
+
+
+def table_row_estimate(model, using='default'):
+    """
+    Perkiraan jumlah baris tabel dari statistik planner (pg_class.reltuples / sqlite_stat1),
+    tanpa COUNT(*). None kalau statistiknya belum ada (belum ANALYZE).
+    """
+    from django.db import DatabaseError, connections
+
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)', [table])
+                row = cursor.fetchone()
+                return int(row[0]) if row and row[0] >= 0 else None
+            if connection.vendor == 'sqlite':
+                # angka pertama di stat = jumlah baris tabel (baris index juga mencatatnya)
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+                row = cursor.fetchone()
+                return int(row[0].split()[0]) if row else None
+    except DatabaseError:
+        return None
+    return None
+
+
+def count_with_estimate(qs, exact_max=1000, unfiltered=False):
+    """
+    (total, exact). Dihitung pasti sampai exact_max baris (COUNT atas LIMIT exact_max + 1);
+    di atas itu tabel tanpa filter pakai perkiraan planner (COUNT penuh kalau belum ada
+    statistik), yang terfilter cukup dilaporkan sebagai exact_max + 1 ("lebih dari").
+    """
+    counted = qs.order_by().values('pk')[:exact_max + 1].count()
+    if counted <= exact_max:
+        return counted, True
+    if unfiltered:
+        estimate = table_row_estimate(qs.model, qs.db)
+        if estimate is None:
+            return qs.count(), True
+        return max(estimate, counted), False
+    return counted, False
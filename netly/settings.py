@@ -135,6 +135,73 @@ else:
         }
     }
 
+# Cache
+# Dipakai untuk grid jadwal, stats dashboard, katalog lapangan, log perubahan index
+# lapangan, dan lock/response Idempotency-Key. Lock dan counter itu butuh add()/incr()
+# yang atomik antar worker gunicorn, jadi production memakai Redis (REDIS_URL).
+# Cache file hanya fallback kalau Redis belum ada: add()/incr()-nya baca-tulis file biasa
+# (tidak atomik), jadi aman untuk satu worker saja. MAX_ENTRIES dinaikkan dari default
+# 300 supaya entri tidak dibuang acak (cull) selagi masih dipakai.
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 50000))
+
+if PRODUCTION and os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            # Redis tidak pakai MAX_ENTRIES; batas memori diatur maxmemory di server Redis
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+elif PRODUCTION:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR', '/tmp/netly_cache'),
+            'OPTIONS': {'MAX_ENTRIES': CACHE_MAX_ENTRIES},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': CACHE_MAX_ENTRIES},
+        }
+    }
+
+# Lama jadwal ditahan untuk booking pending sebelum dilepas lagi (menit)
+BOOKING_HOLD_MINUTES = int(os.getenv('BOOKING_HOLD_MINUTES', 15))
+
+# Berapa lama response untuk satu Idempotency-Key disimpan (detik)
+IDEMPOTENCY_TTL = int(os.getenv('IDEMPOTENCY_TTL', 60 * 60 * 24))
+
+# Jumlah hari ke depan yang jadwalnya selalu di-generate oleh materialize_jadwal
+JADWAL_WINDOW_DAYS = int(os.getenv('JADWAL_WINDOW_DAYS', 30))
+
+# Jadwal lewat yang tidak pernah dibooking dihapus materialize_jadwal setelah sekian hari (0 = sebelum hari ini)
+JADWAL_RETAIN_DAYS = int(os.getenv('JADWAL_RETAIN_DAYS', 0))
+
+# Penyimpanan grid jadwal: 'rows' (baca langsung dari JadwalLapangan) atau 'bitmap'
+# (baca dari salinan satu DaySchedule per lapangan per hari, lihat admin_lapangan/bitmap.py).
+# Mode bitmap butuh `manage.py pack_jadwal` berkala (cron) untuk mengisi ulang hari yang berubah.
+JADWAL_STORAGE = os.getenv('JADWAL_STORAGE', 'rows')
+
+# Index lapangan di memori per worker: trigram (pencarian tahan typo, homepage/trigram.py)
+# dan autocomplete (homepage/suggest.py). Di atas batas ini index tidak dibangun
+# (trigram ~27 MiB + autocomplete ~40 MiB per 100k lapangan). WARMUP: bangun di background
+# begitu worker menerima request pertama, bukan menunggu pencarian pertama.
+# BUILD_ASYNC: build penuh di background thread (False = langsung di request, untuk test)
+COURT_TRIGRAM_MAX_COURTS = int(os.getenv('COURT_TRIGRAM_MAX_COURTS', '200000'))
+COURT_TRIGRAM_WARMUP = os.getenv('COURT_TRIGRAM_WARMUP', str(PRODUCTION)).lower() == 'true'
+COURT_INDEX_BUILD_ASYNC = os.getenv('COURT_INDEX_BUILD_ASYNC', 'True').lower() == 'true'
+
+# Cache response katalog lapangan (homepage/catalog_cache.py): berapa lama entri disimpan
+# (detik) dan apakah entri basi dibangun ulang di background thread (False = langsung, untuk test)
+COURT_CATALOG_CACHE_TTL = int(os.getenv('COURT_CATALOG_CACHE_TTL', 60 * 60))
+COURT_CATALOG_REFRESH_ASYNC = os.getenv('COURT_CATALOG_REFRESH_ASYNC', 'True').lower() == 'true'
+
+# Import data lapangan dijalankan di background thread (False = langsung di request, untuk test)
+IMPORT_RUN_ASYNC = os.getenv('IMPORT_RUN_ASYNC', 'True').lower() == 'true'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators